@@ -0,0 +1,267 @@
+import argparse
+import json
+import logging
+import os
+import platform
+import shutil
+import sys
+import tempfile
+import time
+
+# Use the local nuke and OCIO stand-ins, and the package from this checkout.
+BENCH_DIR = os.path.dirname(os.path.abspath(__file__))
+sys.path.insert(0, os.path.join(BENCH_DIR, "stubs"))
+sys.path.insert(1, os.path.dirname(BENCH_DIR))
+
+import nuke  # noqa: E402
+from nuke_panel_setup_lanh import preset_store_lanh  # noqa: E402
+from nuke_panel_setup_lanh import sequence_index_lanh  # noqa: E402
+from nuke_panel_setup_lanh import setup_log_lanh  # noqa: E402
+from nuke_panel_setup_lanh import shot_setup_nuke_lanh  # noqa: E402
+
+BENCH_PRESET = {
+    "aspect_ratio": "HD_1080",
+    "color_space": "sRGB",
+    "frame_range": "1001-1100",
+    "viewer": "sRGB",
+    "screen_color": "texture_paint",
+    "workspace_color": "scene_linear",
+    "exr_name": "final.####.exr",
+    "mov_name": "final.mov",
+    "fps": "24",
+}
+
+
+def make_show(root, shots, frames, first_frame=1001):
+    """
+    Description:
+    Generates a synthetic show, with a preset and a plate sequence of empty
+    frames per shot. The plate probe falls back to the preset format on them.
+
+    Input:
+    root(str): The folder to create the show in.
+    shots(int): The number of shots.
+    frames(int): The number of frames of every plate.
+    first_frame(int): The first frame of the plates.
+
+    Output:
+    show_root(str): The show folder.
+    shot_paths(list): The shot folders.
+    """
+    show_root = os.path.join(root, "benchshow")
+    preset_store_lanh.save_preset(
+        preset_store_lanh.get_preset_path(show_root), BENCH_PRESET
+    )
+
+    shot_paths = []
+    for shot in range(shots):
+        shot_path = os.path.join(show_root, f"sh{(shot + 1) * 10:04d}")
+        plate_folder = os.path.join(shot_path, "comp", "02_footage", "01_plate")
+        os.makedirs(plate_folder)
+        for frame in range(first_frame, first_frame + frames):
+            open(os.path.join(plate_folder, f"plate.{frame:04d}.exr"), "w").close()
+        shot_paths.append(shot_path)
+
+    return show_root, shot_paths
+
+
+def time_stage(function, items):
+    """
+    Description:
+    Times a function called once per item.
+
+    Input:
+    function(function): The function to time.
+    items(list): The items to call it with.
+
+    Output:
+    seconds(float): The total time.
+    """
+    start = time.perf_counter()
+    for item in items:
+        function(item)
+    return time.perf_counter() - start
+
+
+def run_benchmark(shots, frames, repeat):
+    """
+    Description:
+    Times every stage of the shot setup on a synthetic show, with the nuke
+    stand-in recording the nodes. Each stage keeps its best time of the repeats.
+
+    Input:
+    shots(int): The number of shots.
+    frames(int): The number of frames of every plate.
+    repeat(int): How many times every stage runs.
+
+    Output:
+    report(dict): The settings and the seconds of every stage.
+    """
+    # The synthetic frames are empty, hide the warnings of the plate probe.
+    setup_log_lanh.LOGGER.setLevel(logging.ERROR)
+
+    temp_root = tempfile.mkdtemp(prefix="lanh_bench_")
+    os.environ["LANH_CACHE_DIR"] = os.path.join(temp_root, "cache")
+
+    try:
+        show_root, shot_paths = make_show(temp_root, shots, frames)
+        preset = preset_store_lanh.load_preset(
+            preset_store_lanh.get_preset_path(show_root)
+        )
+
+        def plate_folder(shot_path):
+            return os.path.join(shot_path, "comp", "02_footage", "01_plate")
+
+        def read_plate(shot_path):
+            nuke.scriptClear()
+            shot_setup_nuke_lanh.read_files(
+                {"comp": {"02_footage": {"01_plate": plate_folder(shot_path)}}}
+            )
+
+        def setup_shot(shot_path, backend="nuke"):
+            specs = shot_setup_nuke_lanh.build_shot_specs(shot_path, "bench", preset)
+            shot_setup_nuke_lanh.setup_new_script(shot_path, specs, backend=backend)
+
+        def transfer_data(shot_path):
+            # The non UI part of ShowPresetsUI.transfer_data.
+            specs = preset_store_lanh.resolve_preset(
+                shot_path,
+                preset_store_lanh.get_show_root(shot_path, show_root),
+                base=preset,
+            )
+            specs = shot_setup_nuke_lanh.build_shot_specs(shot_path, "bench", specs)
+            shot_setup_nuke_lanh.setup_new_script(shot_path, specs)
+
+        stages = {}
+
+        # Cold stages only run once, the first call builds what the rest reuse.
+        stages["folders_create"] = [
+            time_stage(shot_setup_nuke_lanh.create_folder_structure, shot_paths)
+        ]
+        stages["plate_scan_cold"] = [
+            time_stage(
+                lambda shot_path: sequence_index_lanh.index_sequences(
+                    plate_folder(shot_path)
+                ),
+                shot_paths,
+            )
+        ]
+
+        warm_stages = [
+            ("folders_existing", shot_setup_nuke_lanh.create_folder_structure),
+            (
+                "plate_scan_warm",
+                lambda shot_path: sequence_index_lanh.index_sequences(
+                    plate_folder(shot_path)
+                ),
+            ),
+            ("read_files", read_plate),
+            ("setup_new_script_nuke", setup_shot),
+            ("setup_new_script_nk", lambda shot_path: setup_shot(shot_path, "nk")),
+            ("transfer_data", transfer_data),
+        ]
+        for name, function in warm_stages:
+            stages[name] = []
+            for _ in range(repeat):
+                del nuke.RECORD[:]
+                stages[name].append(time_stage(function, shot_paths))
+
+        results = {}
+        for name, times in stages.items():
+            best = min(times)
+            results[name] = {
+                "seconds": best,
+                "per_shot_ms": best / len(shot_paths) * 1000.0,
+            }
+
+        return {
+            "meta": {
+                "shots": shots,
+                "frames": frames,
+                "repeat": repeat,
+                "python": platform.python_version(),
+                "platform": platform.platform(),
+            },
+            "stages": results,
+        }
+    finally:
+        shutil.rmtree(temp_root, ignore_errors=True)
+
+
+def print_table(report, baseline=None):
+    """
+    Description:
+    Prints the stage times as a table, with the change against a baseline report.
+
+    Input:
+    report(dict): The report of run_benchmark.
+    baseline(dict): Optional earlier report to compare with.
+
+    Output:
+    None
+    """
+    meta = report["meta"]
+    print(f"{meta['shots']} shots, {meta['frames']} frames, best of {meta['repeat']}")
+
+    header = f"{'stage':<24}{'total s':>10}{'per shot ms':>14}"
+    if baseline:
+        header += f"{'baseline ms':>14}{'change':>10}"
+    print(header)
+    print("-" * len(header))
+
+    for name, stage in report["stages"].items():
+        line = f"{name:<24}{stage['seconds']:>10.3f}{stage['per_shot_ms']:>14.3f}"
+        if baseline:
+            before = baseline.get("stages", {}).get(name)
+            if before:
+                change = (
+                    stage["per_shot_ms"] / before["per_shot_ms"]
+                    if before["per_shot_ms"]
+                    else 0.0
+                )
+                line += f"{before['per_shot_ms']:>14.3f}{change:>9.2f}x"
+            else:
+                line += f"{'-':>14}{'-':>10}"
+        print(line)
+
+
+def main(argv=None):
+    """
+    Description:
+    Command line entry point of the setup benchmark.
+
+    Input:
+    argv(list): Optional list of arguments, sys.argv by default.
+
+    Output:
+    exit_code(int): Always 0.
+    """
+    parser = argparse.ArgumentParser(description="Benchmark the shot setup stages.")
+    parser.add_argument("--shots", type=int, default=20)
+    parser.add_argument("--frames", type=int, default=1000)
+    parser.add_argument("--repeat", type=int, default=3)
+    parser.add_argument("--json", action="store_true", help="Print the report as json.")
+    parser.add_argument("--output", help="Also save the json report to this file.")
+    parser.add_argument("--compare", help="A json report to compare against.")
+    args = parser.parse_args(argv)
+
+    report = run_benchmark(args.shots, args.frames, args.repeat)
+
+    if args.output:
+        with open(args.output, "w") as f:
+            json.dump(report, f, indent=4)
+
+    if args.json:
+        print(json.dumps(report, indent=4))
+    else:
+        baseline = None
+        if args.compare:
+            with open(args.compare, "r") as f:
+                baseline = json.load(f)
+        print_table(report, baseline)
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,46 @@
+# Local stand-in for the PyOpenColorIO bindings, for benchmarks on machines
+# without OCIO. It serves a small fixed config.
+
+COLOR_SPACES = ["scene_linear", "texture_paint", "sRGB", "rec709", "ACEScg"]
+DISPLAYS = {"sRGB": ["Film", "Raw"], "rec709": ["Film", "Raw"]}
+
+
+class ColorSpace(object):
+    def __init__(self, name):
+        self._name = name
+
+    def getName(self):
+        return self._name
+
+
+class Processor(object):
+    def __init__(self, source, destination):
+        self.source = source
+        self.destination = destination
+
+
+class Config(object):
+    def getColorSpaces(self):
+        return [ColorSpace(name) for name in COLOR_SPACES]
+
+    def getColorSpace(self, name):
+        return ColorSpace(name) if name in COLOR_SPACES else None
+
+    def getDisplays(self):
+        return list(DISPLAYS)
+
+    def getViews(self, display):
+        return list(DISPLAYS.get(display, []))
+
+    def getCacheID(self):
+        return "stub-config"
+
+    def getProcessor(self, source, destination):
+        return Processor(source, destination)
+
+
+_CONFIG = Config()
+
+
+def GetCurrentConfig():
+    return _CONFIG
@@ -0,0 +1,219 @@
+# Local stand-in for the nuke module, for benchmarks on machines without
+# nuke. It records the nodes created and the knobs set instead of running them.
+
+# Every createNode and setValue call, as tuples.
+RECORD = []
+
+# Knobs that list values, like the viewerProcess of a viewer.
+VIEWER_PROCESSES = ["None", "sRGB", "rec709"]
+
+
+class Knob(object):
+    def __init__(self, node, name):
+        self._node = node
+        self._name = name
+        self._value = None
+
+    def name(self):
+        return self._name
+
+    def setValue(self, value):
+        self._value = value
+        RECORD.append(("setValue", self._node.name(), self._name, value))
+        return True
+
+    def value(self):
+        return self._value
+
+    def getValue(self):
+        return self._value
+
+    def values(self):
+        return list(VIEWER_PROCESSES)
+
+    def execute(self):
+        RECORD.append(("execute", self._node.name(), self._name))
+
+
+class Node(object):
+    def __init__(self, node_class, name):
+        self._class = node_class
+        self._knobs = {}
+        self._inputs = {}
+        self._xpos = 0
+        self._ypos = 0
+        self["name"]._value = name
+
+    def __getitem__(self, knob_name):
+        if knob_name not in self._knobs:
+            self._knobs[knob_name] = Knob(self, knob_name)
+        return self._knobs[knob_name]
+
+    def knobs(self):
+        return dict(self._knobs)
+
+    def Class(self):
+        return self._class
+
+    def name(self):
+        return self._knobs["name"]._value
+
+    def setName(self, name):
+        self["name"].setValue(name)
+
+    def xpos(self):
+        return self._xpos
+
+    def ypos(self):
+        return self._ypos
+
+    def setXpos(self, xpos):
+        self._xpos = xpos
+
+    def setYpos(self, ypos):
+        self._ypos = ypos
+
+    def setInput(self, index, node):
+        self._inputs[index] = node
+        return True
+
+    def input(self, index):
+        return self._inputs.get(index)
+
+    def hideControlPanel(self):
+        pass
+
+    def setModified(self, modified):
+        pass
+
+
+class Format(object):
+    def __init__(self, width, height, pixel_aspect, name):
+        self._width = width
+        self._height = height
+        self._pixel_aspect = pixel_aspect
+        self._name = name
+
+    def name(self):
+        return self._name
+
+    def width(self):
+        return self._width
+
+    def height(self):
+        return self._height
+
+    def pixelAspect(self):
+        return self._pixel_aspect
+
+
+class Menu(object):
+    def __init__(self, name):
+        self._name = name
+        self.items = {}
+
+    def addMenu(self, name, index=-1):
+        return self.items.setdefault(name, Menu(name))
+
+    def addCommand(self, name, command=None, *args, **kwargs):
+        self.items[name] = command
+        return command
+
+
+_FORMATS = [
+    Format(1920, 1080, 1.0, "HD_1080"),
+    Format(1280, 720, 1.0, "HD_720"),
+    Format(3840, 2160, 1.0, "UHD_4K"),
+    Format(2048, 1080, 1.0, "2K_DCP"),
+    Format(4096, 2160, 1.0, "4K_DCP"),
+]
+_MENUS = {}
+_STATE = {"nodes": [], "root": Node("Root", "root"), "counters": {}}
+
+
+def createNode(node_class, knobs="", inpanel=True):
+    counters = _STATE["counters"]
+    counters[node_class] = counters.get(node_class, 0) + 1
+    node = Node(node_class, f"{node_class}{counters[node_class]}")
+    _STATE["nodes"].append(node)
+    RECORD.append(("createNode", node_class, node.name()))
+    return node
+
+
+def root():
+    return _STATE["root"]
+
+
+def allNodes(filter=None):
+    return [
+        node for node in _STATE["nodes"] if filter is None or node.Class() == filter
+    ]
+
+
+def scriptClear():
+    _STATE["nodes"] = []
+    _STATE["root"] = Node("Root", "root")
+    _STATE["counters"] = {}
+
+
+def activeViewer():
+    return None
+
+
+def formats():
+    return list(_FORMATS)
+
+
+def addFormat(format_text):
+    parts = format_text.split()
+    width, height = int(parts[0]), int(parts[1])
+    pixel_aspect = float(parts[-2]) if len(parts) > 3 else 1.0
+    format_obj = Format(width, height, pixel_aspect, parts[-1])
+    _FORMATS.append(format_obj)
+    return format_obj
+
+
+def _write_script(file_path):
+    lines = []
+    for node in _STATE["nodes"]:
+        lines.append(f"{node.Class()} {{")
+        for knob_name, knob in node._knobs.items():
+            lines.append(f" {knob_name} {knob.value()}")
+        lines.append("}")
+    with open(file_path, "w") as f:
+        f.write("\n".join(lines) + "\n")
+
+
+def scriptSaveAs(filename=None, overwrite=-1):
+    _write_script(filename)
+    _STATE["root"]["name"].setValue(filename)
+
+
+def scriptSaveToTemp(filename):
+    _write_script(filename)
+    return True
+
+
+def getFileNameList(folder_path, *args):
+    # Same grouping nuke does, through the indexer of the package.
+    from nuke_panel_setup_lanh import sequence_index_lanh
+
+    names = []
+    for sequence in sequence_index_lanh.scan_sequences(folder_path):
+        if sequence["is_sequence"]:
+            names.append(f"{sequence['name']} {sequence['first']}-{sequence['last']}")
+        else:
+            names.append(sequence["name"])
+    return names
+
+
+def menu(name):
+    return _MENUS.setdefault(name, Menu(name))
+
+
+def executeInMainThread(function, args=(), kwargs=None):
+    return function(*args, **(kwargs or {}))
+
+
+def executeInMainThreadWithResult(function, args=(), kwargs=None):
+    return function(*args, **(kwargs or {}))
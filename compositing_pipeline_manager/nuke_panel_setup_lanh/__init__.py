@@ -1 +1,79 @@
-from . import nuke_panel_setup_lanh, shot_setup_nuke_lanh
+import importlib
+
+# Sub modules load on first use, so importing the package at nuke startup stays
+# cheap and doesn't pull in Qt or the OCIO bindings.
+_SUBMODULES = (
+    "batch_setup_lanh",
+    "cache_lanh",
+    "colorspace_lanh",
+    "exr_probe_lanh",
+    "footage_lanh",
+    "folder_template_lanh",
+    "frameset_lanh",
+    "import_time_lanh",
+    "nk_parser_lanh",
+    "nk_writer_lanh",
+    "nuke_panel_setup_lanh",
+    "option_catalog_lanh",
+    "preset_store_lanh",
+    "proxy_lanh",
+    "publish_lanh",
+    "render_check_lanh",
+    "render_jobs_lanh",
+    "script_index_lanh",
+    "script_patch_lanh",
+    "sequence_index_lanh",
+    "setup_log_lanh",
+    "setup_plan_lanh",
+    "shot_index_lanh",
+    "shot_setup_nuke_lanh",
+    "thumbnail_lanh",
+    "version_index_lanh",
+    "watch_lanh",
+)
+
+
+def __getattr__(name):
+    if name in _SUBMODULES:
+        return importlib.import_module(f".{name}", __name__)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+
+
+def main():
+    """
+    Description:
+    Opens the Shot Presets Manager, loading the UI on first use.
+
+    Input:
+    None
+
+    Output:
+    ui(class): The Shot Presets Manager window.
+    """
+    from . import nuke_panel_setup_lanh
+
+    return nuke_panel_setup_lanh.show_presets_manager()
+
+
+def register_menu(menu_name="AN Tools", index=1000):
+    """
+    Description:
+    Adds the Shot setup command to the Nuke menu without importing the UI.
+
+    Input:
+    menu_name(str): The name of the menu to add the command to.
+    index(int): The position of the menu in the Nuke menu bar.
+
+    Output:
+    my_menu(object): The nuke menu with the command.
+    """
+    import nuke
+
+    # Create a menu item to launch the plugin
+    toolbar = nuke.menu("Nuke")
+    my_menu = toolbar.addMenu(menu_name, index=index)
+
+    # The command only imports the UI when it's clicked.
+    my_menu.addCommand("Shot setup", main)
+
+    return my_menu
@@ -0,0 +1,383 @@
+import argparse
+import csv
+import json
+import multiprocessing
+import os
+import sys
+import time
+from concurrent import futures
+from concurrent.futures.process import BrokenProcessPool
+
+from . import preset_store_lanh
+
+# Error of a setup whose worker process died, e.g. nuke crashing or running
+# out of memory.
+CRASH_ERROR = "BrokenProcessPool: the worker process died during the setup"
+
+
+def load_manifest(manifest_path):
+    """
+    Description:
+    Reads a manifest of shots to set up. It can be a json list of entries or a
+    csv file with a header, each entry with a shot_path and a compositor.
+
+    Input:
+    manifest_path(str): Path to the .json or .csv manifest.
+
+    Output:
+    shots(list): List of dictionaries with the shot_path and compositor keys.
+    """
+    with open(manifest_path, "r", newline="") as f:
+        if manifest_path.lower().endswith(".csv"):
+            entries = list(csv.DictReader(f))
+        else:
+            entries = json.load(f)
+
+    # Allow a json manifest with the shots under a "shots" key.
+    if isinstance(entries, dict):
+        entries = entries.get("shots", [])
+
+    shots = []
+    for entry in entries:
+        shot_path = (entry.get("shot_path") or "").strip()
+        compositor = (entry.get("compositor") or "").strip()
+        if not shot_path or not compositor:
+            raise ValueError(
+                f"Manifest entry needs a shot_path and compositor: {entry}"
+            )
+        shots.append({"shot_path": shot_path, "compositor": compositor})
+
+    return shots
+
+
+def load_preset(preset_path):
+    """
+    Description:
+    Loads a show preset json, as saved by the Shot Presets Manager.
+
+    Input:
+    preset_path(str): Path to the preset json file.
+
+    Output:
+    preset(dict): The show specifications.
+    """
+    return preset_store_lanh.load_preset(preset_path)
+
+
+def init_worker(proxy_workers):
+    """
+    Description:
+    Sets up a worker process of a setup pool. Only the worker environment
+    changes, so the calling session keeps its own.
+
+    Input:
+    proxy_workers(int): Number of proxy workers of the worker, so the proxy
+    pools of all the workers share the cores. LANH_PROXY_WORKERS wins if set.
+
+    Output:
+    None
+    """
+    os.environ.setdefault("LANH_PROXY_WORKERS", str(max(1, proxy_workers)))
+
+
+def setup_shot(shot_path, compositor, preset, backend="nuke"):
+    """
+    Description:
+    Sets up a single shot. It runs inside a worker process, so every worker
+    loads its own headless nuke session.
+
+    Input:
+    shot_path(str): Full path of the shot folder.
+    compositor(str): The name of the compositor for the file name.
+    preset(dict): The show specifications.
+    backend(str): "nuke" for a headless nuke session, or "nk" to write the text.
+
+    Output:
+    result(dict): The shot path, nuke file, success state, error and seconds taken.
+    """
+    # Imported here so only the workers load nuke.
+    from . import shot_setup_nuke_lanh as nkfile
+
+    start = time.perf_counter()
+    result = {
+        "shot_path": shot_path,
+        "compositor": compositor,
+        "nuke_file": "",
+        "success": False,
+        "error": "",
+    }
+
+    try:
+        specs = nkfile.build_shot_specs(shot_path, compositor, preset)
+        result["nuke_file"] = specs["nuke_file"]
+        nkfile.setup_new_script(shot_path, specs, backend=backend)
+        result["success"] = True
+    except Exception as error:
+        result["error"] = f"{type(error).__name__}: {error}"
+
+    result["seconds"] = time.perf_counter() - start
+
+    return result
+
+
+def get_crash_result(shot_path, compositor):
+    """
+    Description:
+    Gets the result of a setup whose worker process died.
+
+    Input:
+    shot_path(str): Full path of the shot folder.
+    compositor(str): The name of the compositor for the file name.
+
+    Output:
+    result(dict): A failed result, like the ones setup_shot returns.
+    """
+    return {
+        "shot_path": shot_path,
+        "compositor": compositor,
+        "nuke_file": "",
+        "success": False,
+        "error": CRASH_ERROR,
+        "seconds": 0.0,
+    }
+
+
+def create_pool(workers):
+    """
+    Description:
+    Creates a pool of setup worker processes.
+
+    Input:
+    workers(int): Number of worker processes.
+
+    Output:
+    pool(class): The ProcessPoolExecutor.
+    """
+    # Spawn fresh processes, a forked nuke session is not safe to reuse.
+    context = multiprocessing.get_context("spawn")
+    # Share the cores between the proxy pools of the workers.
+    return futures.ProcessPoolExecutor(
+        max_workers=workers,
+        mp_context=context,
+        initializer=init_worker,
+        initargs=((os.cpu_count() or 1) // workers,),
+    )
+
+
+def run_batch(
+    shots,
+    preset,
+    workers=None,
+    callback=None,
+    backend="nuke",
+    show_root=None,
+    make_proxies=False,
+):
+    """
+    Description:
+    Sets up every shot in the list across a pool of headless worker processes.
+    A worker that dies takes the pool down with it, the shots that were
+    running then are set up again one at a time to find the one that
+    crashed, which fails, and the rest go on in a new pool.
+
+    Input:
+    shots(list): List of dictionaries with the shot_path and compositor keys.
+    preset(dict): The show specifications applied to every shot. With a
+    show_root it can be None, to use the show level preset file.
+    workers(int): Number of worker processes, one per core by default.
+    callback(function): Optional function called with each result as it finishes.
+    backend(str): "nuke" for headless nuke workers, or "nk" to write the .nk
+    text without a nuke licence.
+    show_root(str): Optional show folder, the sequence and shot presets below
+    it override the preset of each shot.
+    make_proxies(bool): If True, every shot gets the proxies of its plate,
+    whatever its preset says.
+
+    Output:
+    report(dict): The per shot results, the totals and the throughput.
+    """
+    if workers is None:
+        workers = os.cpu_count() or 1
+    workers = max(1, min(workers, len(shots) or 1))
+
+    # Resolve every shot preset up front, the show files are read once.
+    shot_paths = [shot["shot_path"] for shot in shots]
+    if show_root:
+        presets = preset_store_lanh.resolve_presets(shot_paths, show_root, base=preset)
+    else:
+        preset_store_lanh.validate_preset(preset)
+        presets = {shot_path: preset for shot_path in shot_paths}
+    if make_proxies:
+        presets = {
+            shot_path: dict(shot_preset, make_proxies=True)
+            for shot_path, shot_preset in presets.items()
+        }
+
+    start = time.perf_counter()
+    results = []
+
+    def add_result(result):
+        results.append(result)
+        if callback:
+            callback(result)
+
+    def run_round(round_shots, round_workers):
+        # Returns the shots that didn't finish because the pool broke, in the
+        # order they were submitted.
+        with create_pool(round_workers) as pool:
+            jobs = {
+                pool.submit(
+                    setup_shot,
+                    shot["shot_path"],
+                    shot["compositor"],
+                    presets[shot["shot_path"]],
+                    backend,
+                ): index
+                for index, shot in enumerate(round_shots)
+            }
+            unfinished = []
+            for job in futures.as_completed(jobs):
+                try:
+                    result = job.result()
+                except BrokenProcessPool:
+                    unfinished.append(jobs[job])
+                    continue
+                add_result(result)
+
+        return [round_shots[index] for index in sorted(unfinished)]
+
+    remaining = list(shots)
+    suspects = []
+    while remaining or suspects:
+        if not suspects:
+            unfinished = run_round(remaining, workers)
+            # The pool starts the shots in order and queues one more than it
+            # has workers, so the shot that crashed is among the first ones.
+            suspects = unfinished[: workers + 1]
+            remaining = unfinished[workers + 1 :]
+            continue
+
+        # One worker runs the suspects in order, the first one left crashed it.
+        unfinished = run_round(suspects, 1)
+        suspects = []
+        if unfinished:
+            add_result(
+                get_crash_result(
+                    unfinished[0]["shot_path"], unfinished[0]["compositor"]
+                )
+            )
+            suspects = unfinished[1:]
+
+    elapsed = time.perf_counter() - start
+    succeeded = sum(1 for result in results if result["success"])
+
+    report = {
+        "results": results,
+        "total": len(results),
+        "succeeded": succeeded,
+        "failed": len(results) - succeeded,
+        "workers": workers,
+        "seconds": elapsed,
+        "shots_per_minute": (len(results) / elapsed * 60.0) if elapsed else 0.0,
+    }
+
+    return report
+
+
+def print_result(result):
+    """
+    Description:
+    Prints a single line for a finished shot.
+
+    Input:
+    result(dict): A result returned by setup_shot.
+
+    Output:
+    None
+    """
+    state = "OK  " if result["success"] else "FAIL"
+    line = f"[{state}] {result['shot_path']} ({result['seconds']:.2f}s)"
+    if result["error"]:
+        line = f"{line} {result['error']}"
+    print(line)
+
+
+def main(argv=None):
+    """
+    Description:
+    Command line entry point for the batch shot setup.
+
+    Input:
+    argv(list): Optional list of arguments, sys.argv by default.
+
+    Output:
+    exit_code(int): 0 if every shot was set up, 1 otherwise.
+    """
+    parser = argparse.ArgumentParser(
+        description="Set up new nuke scripts for a list of shots in batch."
+    )
+    parser.add_argument(
+        "manifest", help="A .json or .csv list of shot_path and compositor."
+    )
+    parser.add_argument("--preset", help="The show preset json file.")
+    parser.add_argument(
+        "--show-root",
+        help="The show folder, its show, sequence and shot presets are resolved per shot.",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="Number of headless nuke workers, one per core by default.",
+    )
+    parser.add_argument(
+        "--backend",
+        choices=["nuke", "nk"],
+        default="nuke",
+        help="Build the scripts in headless nuke, or write the .nk text without nuke.",
+    )
+    parser.add_argument(
+        "--proxies",
+        action="store_true",
+        help="Make the half and quarter resolution proxies of every plate.",
+    )
+    parser.add_argument("--json", action="store_true", help="Print the report as json.")
+    parser.add_argument(
+        "--verbose", action="store_true", help="Log every step of every setup."
+    )
+    args = parser.parse_args(argv)
+
+    # The workers read it from the environment they inherit.
+    if args.verbose:
+        os.environ["LANH_SETUP_VERBOSE"] = "1"
+
+    shots = load_manifest(args.manifest)
+    if not args.preset and not args.show_root:
+        parser.error("a --preset or a --show-root is needed")
+    preset = load_preset(args.preset) if args.preset else None
+
+    callback = None if args.json else print_result
+    report = run_batch(
+        shots,
+        preset,
+        workers=args.workers,
+        callback=callback,
+        backend=args.backend,
+        show_root=args.show_root,
+        make_proxies=args.proxies,
+    )
+
+    if args.json:
+        print(json.dumps(report, indent=4))
+    else:
+        print(
+            f"{report['succeeded']}/{report['total']} shots set up in "
+            f"{report['seconds']:.1f}s with {report['workers']} workers "
+            f"({report['shots_per_minute']:.1f} shots/min)"
+        )
+
+    return 0 if report["failed"] == 0 else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
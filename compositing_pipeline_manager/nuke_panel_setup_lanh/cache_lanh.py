@@ -0,0 +1,23 @@
+import os
+
+
+def get_cache_dir(name):
+    """
+    Description:
+    Gets a local cache folder for the tool, and creates it if it doesn't exist.
+    The root can be moved with the LANH_CACHE_DIR environment variable.
+
+    Input:
+    name(str): The name of the cache sub folder.
+
+    Output:
+    cache_dir(str): The path of the cache folder.
+    """
+    cache_root = os.environ.get("LANH_CACHE_DIR")
+    if not cache_root:
+        cache_root = os.path.join(os.path.expanduser("~"), ".nuke", "lanh_cache")
+
+    cache_dir = os.path.join(cache_root, name)
+    os.makedirs(cache_dir, exist_ok=True)
+
+    return cache_dir
@@ -0,0 +1,381 @@
+import difflib
+import hashlib
+import os
+import re
+import shutil
+
+from . import cache_lanh, folder_template_lanh, publish_lanh, setup_log_lanh
+
+# Spec keys holding colorspace names of the OCIO config.
+COLORSPACE_KEYS = ("screen_color", "workspace_color")
+
+# Folder of the baked LUTs, inside the LUT folder of the shot. The footage
+# scan only reads the files of the LUT folder itself, so they aren't loaded
+# as show LUTs.
+BAKED_FOLDER = "baked"
+
+# Format and size of the baked LUTs, a .cube every OCIOFileTransform reads.
+BAKE_FORMAT = "resolve_cube"
+BAKE_EXTENSION = ".cube"
+CUBE_SIZE = 33
+
+# Role of the log colorspace the LUT of the scene-linear workspace is shaped
+# with, a cube alone only covers 0 to 1 and clamps the highlights.
+SHAPER_ROLE = "compositing_log"
+
+# Processors built for the session, keyed by config and colorspace pair.
+_PROCESSORS = {}
+
+
+class ColorspaceError(ValueError):
+    """
+    Description:
+    Raised when a colorspace name isn't in the OCIO config.
+    """
+
+
+def get_ocio():
+    """
+    Description:
+    Imports the OCIO bindings, they are slow to import and optional for the
+    nk backend.
+
+    Input:
+    None
+
+    Output:
+    ocio(module): The PyOpenColorIO module, or None if it isn't installed.
+    """
+    try:
+        import PyOpenColorIO as ocio
+    except ImportError:
+        return None
+
+    return ocio
+
+
+def get_config():
+    """
+    Description:
+    Gets the OCIO config in use.
+
+    Input:
+    None
+
+    Output:
+    config(object): The current OCIO config, or None without the bindings.
+    """
+    ocio = get_ocio()
+    if ocio is None:
+        return None
+
+    return ocio.GetCurrentConfig()
+
+
+def get_shaper_space(config):
+    """
+    Description:
+    Gets the log colorspace of the config that shapes the baked LUTs of
+    scene-linear input.
+
+    Input:
+    config(object): The OCIO config.
+
+    Output:
+    shaper_space(str): The colorspace of the compositing_log role, or None if
+    the config doesn't have it.
+    """
+    colorspace = config.getColorSpace(SHAPER_ROLE)
+    if colorspace is None:
+        return None
+
+    return colorspace.getName()
+
+
+def get_config_id(config):
+    """
+    Description:
+    Gets the identity of a config, it changes with any change of the config.
+
+    Input:
+    config(object): The OCIO config.
+
+    Output:
+    config_id(str): The cache id of the config.
+    """
+    return config.getCacheID()
+
+
+def validate_colorspaces(show_specifications, config):
+    """
+    Description:
+    Checks that the colorspaces of the specs exist in the config, so a wrong
+    name fails the setup before any folder or script is made.
+
+    Input:
+    show_specifications(dict): The specs with the colorspace names.
+    config(object): The OCIO config.
+
+    Output:
+    None
+    """
+    names = [cs.getName() for cs in config.getColorSpaces()]
+
+    errors = []
+    for key in COLORSPACE_KEYS:
+        name = show_specifications.get(key)
+        if not name or config.getColorSpace(name) is not None:
+            continue
+        message = f"{key} {name!r} is not a colorspace of the OCIO config"
+        matches = difflib.get_close_matches(name, names, n=3)
+        if matches:
+            message += f", did you mean {', '.join(matches)}?"
+        errors.append(message)
+
+    if errors:
+        raise ColorspaceError("; ".join(errors))
+
+
+def get_processor(config, source, destination):
+    """
+    Description:
+    Gets the processor of a colorspace conversion, built once per session.
+
+    Input:
+    config(object): The OCIO config.
+    source(str): The colorspace to convert from.
+    destination(str): The colorspace to convert to.
+
+    Output:
+    processor(object): The OCIO processor.
+    """
+    key = (get_config_id(config), source, destination)
+    if key not in _PROCESSORS:
+        _PROCESSORS[key] = config.getProcessor(source, destination)
+
+    return _PROCESSORS[key]
+
+
+def get_lut_key(config, source, destination, shaper_space=None):
+    """
+    Description:
+    Gets the cache key of a baked LUT, from the config, the colorspace pair
+    and the shaper.
+
+    Input:
+    config(object): The OCIO config.
+    source(str): The colorspace to convert from.
+    destination(str): The colorspace to convert to.
+    shaper_space(str): Optional colorspace the LUT is shaped with.
+
+    Output:
+    lut_key(str): A short hash of the conversion.
+    """
+    text = "|".join(
+        [
+            get_config_id(config),
+            source,
+            destination,
+            BAKE_FORMAT,
+            str(CUBE_SIZE),
+            shaper_space or "",
+        ]
+    )
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()[:12]
+
+
+def get_lut_name(config, source, destination, shaper_space=None):
+    """
+    Description:
+    Names the baked LUT of a conversion, e.g. sRGB_to_scene_linear_1a2b3c4d5e6f.cube.
+
+    Input:
+    config(object): The OCIO config.
+    source(str): The colorspace to convert from.
+    destination(str): The colorspace to convert to.
+    shaper_space(str): Optional colorspace the LUT is shaped with.
+
+    Output:
+    lut_name(str): The file name of the LUT.
+    """
+    safe_source = re.sub(r"[^\w.-]+", "_", source)
+    safe_destination = re.sub(r"[^\w.-]+", "_", destination)
+    lut_key = get_lut_key(config, source, destination, shaper_space)
+
+    return f"{safe_source}_to_{safe_destination}_{lut_key}{BAKE_EXTENSION}"
+
+
+def bake_lut(config, source, destination, shaper_space=None):
+    """
+    Description:
+    Bakes a colorspace conversion to a LUT in the local cache. A conversion is
+    only baked once per config, later calls get the cached file.
+
+    Input:
+    config(object): The OCIO config.
+    source(str): The colorspace to convert from.
+    destination(str): The colorspace to convert to.
+    shaper_space(str): Optional log colorspace the input goes through before
+    the cube, for scene-linear input.
+
+    Output:
+    lut_path(str): The baked LUT in the local cache.
+    """
+    lut_path = os.path.join(
+        cache_lanh.get_cache_dir("baked_luts"),
+        get_lut_name(config, source, destination, shaper_space),
+    )
+    if os.path.exists(lut_path):
+        return lut_path
+
+    ocio = get_ocio()
+    baker = ocio.Baker()
+    baker.setConfig(config)
+    baker.setFormat(BAKE_FORMAT)
+    baker.setInputSpace(source)
+    baker.setTargetSpace(destination)
+    baker.setCubeSize(CUBE_SIZE)
+    if shaper_space:
+        baker.setShaperSpace(shaper_space)
+
+    # Renamed into place, parallel setups may bake the same LUT.
+    publish_lanh.write_text(lut_path, baker.bake())
+    setup_log_lanh.LOGGER.debug(f"Baked {source} to {destination} in {lut_path}")
+
+    return lut_path
+
+
+def publish_lut(config, source, destination, lut_folder, shaper_space=None):
+    """
+    Description:
+    Puts the baked LUT of a conversion in a shot, baking it if needed. Shots
+    that already have it keep their file.
+
+    Input:
+    config(object): The OCIO config.
+    source(str): The colorspace to convert from.
+    destination(str): The colorspace to convert to.
+    lut_folder(str): The LUT folder of the shot.
+    shaper_space(str): Optional colorspace the LUT is shaped with.
+
+    Output:
+    lut_path(str): The LUT in the shot.
+    """
+    lut_path = os.path.join(
+        lut_folder,
+        BAKED_FOLDER,
+        get_lut_name(config, source, destination, shaper_space),
+    )
+    if os.path.exists(lut_path):
+        return lut_path
+
+    cached_path = bake_lut(config, source, destination, shaper_space)
+    with publish_lanh.Publisher() as publisher:
+        shutil.copyfile(cached_path, publisher.stage(lut_path))
+
+    return lut_path
+
+
+def check_colorspaces(show_specifications):
+    """
+    Description:
+    Validates the colorspaces of the specs against the OCIO config in use.
+    Without the OCIO bindings, e.g. the nk backend on a farm machine, there is
+    nothing to check against.
+
+    Input:
+    show_specifications(dict): The specs with the colorspace names.
+
+    Output:
+    config(object): The checked OCIO config, or None without the bindings.
+    """
+    config = get_config()
+    if config is None:
+        setup_log_lanh.LOGGER.debug("No OCIO bindings, colorspaces not checked")
+        return None
+
+    validate_colorspaces(show_specifications, config)
+
+    return config
+
+
+def bake_colorspaces(show_specifications, config, lut_folder):
+    """
+    Description:
+    Bakes the screen to workspace conversion and back in the shot, when the
+    preset turns use_baked_luts on. The workspace to screen LUT takes
+    scene-linear values, so it's shaped with the compositing_log role, and a
+    config without it keeps the OCIOColorSpace nodes.
+
+    Input:
+    show_specifications(dict): The specs with the colorspace names.
+    config(object): The OCIO config the colorspaces were checked against.
+    lut_folder(str): The LUT folder of the shot.
+
+    Output:
+    baked_luts(dict): The "input" and "output" LUTs of the shot, or None if
+    the OCIOColorSpace nodes are used.
+    """
+    if config is None or not show_specifications.get("use_baked_luts"):
+        return None
+
+    shaper_space = get_shaper_space(config)
+    if shaper_space is None:
+        setup_log_lanh.LOGGER.warning(
+            f"The OCIO config has no {SHAPER_ROLE} role to shape the scene-linear "
+            "LUT with, the colorspaces aren't baked"
+        )
+        return None
+
+    screen_color = show_specifications["screen_color"]
+    workspace_color = show_specifications["workspace_color"]
+
+    # Build the processors once, so a broken conversion fails here too.
+    get_processor(config, screen_color, workspace_color)
+    get_processor(config, workspace_color, screen_color)
+
+    baked_luts = {
+        "input": publish_lut(config, screen_color, workspace_color, lut_folder),
+        "output": publish_lut(
+            config, workspace_color, screen_color, lut_folder, shaper_space
+        ),
+    }
+
+    return baked_luts
+
+
+def get_lut_folder(shot_path, folder_structure):
+    """
+    Description:
+    Gets the LUT folder of a shot, templates without one get the default path.
+
+    Input:
+    shot_path(str): The shot folder.
+    folder_structure(dict): Directory of all the folders of the shot.
+
+    Output:
+    lut_folder(str): The LUT folder.
+    """
+    footage_folders = dict(
+        folder_template_lanh.get_sub_folders(folder_structure, "comp", "02_footage")
+    )
+    lut_folder = footage_folders.get("04_LUT")
+    if lut_folder is None:
+        lut_folder = os.path.join(shot_path, "comp", "02_footage", "04_LUT")
+
+    return lut_folder
+
+
+def clear_cache():
+    """
+    Description:
+    Forgets the processors of the session. The baked LUTs stay on disk, their
+    names change with the config.
+
+    Input:
+    None
+
+    Output:
+    None
+    """
+    _PROCESSORS.clear()
@@ -0,0 +1,275 @@
+import mmap
+import os
+import struct
+from concurrent import futures
+
+from . import sequence_index_lanh, setup_log_lanh
+
+# First four bytes of every EXR file.
+EXR_MAGIC = b"\x76\x2f\x31\x01"
+
+# Attributes the probe keeps, and how to unpack them.
+ATTRIBUTE_FORMATS = {
+    "dataWindow": "<4i",
+    "displayWindow": "<4i",
+    "pixelAspectRatio": "<f",
+}
+
+
+class ExrProbeError(ValueError):
+    """
+    Description:
+    Raised when a file isn't an EXR or its header can't be read.
+    """
+
+
+def read_exr_header(file_path):
+    """
+    Description:
+    Reads the data window, display window and pixel aspect of an EXR from its
+    header only. The file is memory mapped, so only the header pages are read
+    and no pixels are decoded.
+
+    Input:
+    file_path(str): The EXR file.
+
+    Output:
+    header(dict): The data_window and display_window as (x_min, y_min, x_max,
+    y_max), the pixel_aspect, and the width and height of the display window.
+    """
+    with open(file_path, "rb") as f:
+        try:
+            header_map = mmap.mmap(f.fileno(), 0, access=mmap.ACCESS_READ)
+        except ValueError:
+            raise ExrProbeError(f"{file_path} is empty")
+
+    try:
+        if header_map[:4] != EXR_MAGIC:
+            raise ExrProbeError(f"{file_path} is not an EXR file")
+
+        attributes = {}
+        position = 8
+        while True:
+            name_end = header_map.find(b"\0", position)
+            if name_end < 0:
+                raise ExrProbeError(f"{file_path} has a truncated header")
+            name = header_map[position:name_end].decode("latin-1")
+            position = name_end + 1
+
+            # An empty name ends the header.
+            if not name:
+                break
+
+            type_end = header_map.find(b"\0", position)
+            if type_end < 0:
+                raise ExrProbeError(f"{file_path} has a truncated header")
+            position = type_end + 1
+
+            (size,) = struct.unpack_from("<i", header_map, position)
+            position += 4
+
+            if name in ATTRIBUTE_FORMATS:
+                attributes[name] = struct.unpack_from(
+                    ATTRIBUTE_FORMATS[name], header_map, position
+                )
+            position += size
+    except struct.error:
+        raise ExrProbeError(f"{file_path} has a truncated header")
+    finally:
+        header_map.close()
+
+    if "dataWindow" not in attributes or "displayWindow" not in attributes:
+        raise ExrProbeError(f"{file_path} has no data or display window")
+
+    display_window = attributes["displayWindow"]
+    header = {
+        "data_window": attributes["dataWindow"],
+        "display_window": display_window,
+        "pixel_aspect": round(attributes.get("pixelAspectRatio", (1.0,))[0], 4),
+        "width": display_window[2] - display_window[0] + 1,
+        "height": display_window[3] - display_window[1] + 1,
+    }
+
+    return header
+
+
+def get_frame_path(folder_path, sequence, frame):
+    """
+    Description:
+    Gets the file path of a frame of a sequence.
+
+    Input:
+    folder_path(str): The folder of the sequence.
+    sequence(dict): The sequence, as returned by the sequence index.
+    frame(int): The frame number.
+
+    Output:
+    frame_path(str): The path of the frame file.
+    """
+    frame_text = str(frame).zfill(sequence["padding"])
+    return os.path.join(
+        folder_path, f"{sequence['head']}{frame_text}{sequence['tail']}"
+    )
+
+
+def sample_frames(sequence, samples=3):
+    """
+    Description:
+    Picks the first, the last and a few frames evenly spaced in between.
+
+    Input:
+    sequence(dict): The sequence, as returned by the sequence index.
+    samples(int): The number of frames to pick in between.
+
+    Output:
+    frames(list): The sorted frame numbers to probe.
+    """
+    sequence_frames = sequence_index_lanh.get_frames(sequence)
+    frames = {sequence_frames.first, sequence_frames.last}
+
+    count = len(sequence_frames)
+    for sample in range(1, samples + 1):
+        # The n-th existing frame, gaps are skipped.
+        frames.add(sequence_frames.get_frame(sample * (count - 1) // (samples + 1)))
+
+    return sorted(frames)
+
+
+def probe_sequence(folder_path, sequence, samples=3, workers=4):
+    """
+    Description:
+    Reads the headers of the first, last and a sample of middle frames of an
+    EXR sequence in parallel, and checks that they all match.
+
+    Input:
+    folder_path(str): The folder of the sequence.
+    sequence(dict): The sequence, as returned by the sequence index.
+    samples(int): The number of middle frames to read.
+    workers(int): The number of threads reading headers.
+
+    Output:
+    probe(dict): The width, height and pixel_aspect of the plate, the headers
+    per frame and the list of mismatches between frames. None if the sequence
+    isn't an EXR sequence.
+    """
+    if not sequence["is_sequence"] or sequence["tail"].lower() != ".exr":
+        return None
+
+    frames = sample_frames(sequence, samples)
+    paths = [get_frame_path(folder_path, sequence, frame) for frame in frames]
+
+    with futures.ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        headers = dict(zip(frames, pool.map(read_exr_header, paths)))
+
+    reference = headers[frames[0]]
+    mismatches = []
+    for frame in frames[1:]:
+        header = headers[frame]
+        for key in ("display_window", "data_window", "pixel_aspect"):
+            if header[key] != reference[key]:
+                mismatches.append(
+                    f"frame {frame} {key} {header[key]} differs from "
+                    f"frame {frames[0]} {reference[key]}"
+                )
+
+    probe = {
+        "width": reference["width"],
+        "height": reference["height"],
+        "pixel_aspect": reference["pixel_aspect"],
+        "headers": headers,
+        "mismatches": mismatches,
+    }
+
+    return probe
+
+
+def find_format(width, height, pixel_aspect, formats):
+    """
+    Description:
+    Finds the format that matches a resolution and pixel aspect.
+
+    Input:
+    width(int): The width of the plate.
+    height(int): The height of the plate.
+    pixel_aspect(float): The pixel aspect of the plate.
+    formats(list): (name, width, height, pixel_aspect) of the known formats.
+
+    Output:
+    format_name(str): The name of the matching format, or None.
+    """
+    for name, format_width, format_height, format_aspect in formats:
+        if (
+            format_width == width
+            and format_height == height
+            and abs(format_aspect - pixel_aspect) < 0.01
+        ):
+            return name
+
+    return None
+
+
+def get_plate_format_name(width, height):
+    """
+    Description:
+    Names a new format for a plate resolution that nuke doesn't have.
+
+    Input:
+    width(int): The width of the plate.
+    height(int): The height of the plate.
+
+    Output:
+    format_name(str): The name of the new format, e.g. plate_4448x3096.
+    """
+    return f"plate_{width}x{height}"
+
+
+def probe_plate(folder_path, sequence):
+    """
+    Description:
+    Probes a plate for the setup. Unreadable headers and frames that don't
+    match are logged as warnings, the setup then falls back to the preset format.
+
+    Input:
+    folder_path(str): The folder of the plate.
+    sequence(dict): The plate sequence, as returned by the sequence index.
+
+    Output:
+    probe(dict): The probe of the plate, or None if it couldn't be probed.
+    """
+    try:
+        probe = probe_sequence(folder_path, sequence)
+    except (OSError, ExrProbeError) as error:
+        setup_log_lanh.LOGGER.warning(f"Could not probe the plate format: {error}")
+        return None
+
+    if probe is not None:
+        for mismatch in probe["mismatches"]:
+            setup_log_lanh.LOGGER.warning(f"{sequence['name']}: {mismatch}")
+
+    return probe
+
+
+def check_preset_format(format_name, probe, preset_format):
+    """
+    Description:
+    Warns when the plate format isn't the format of the preset. The root
+    follows the plate and the EXR output is reformatted to the preset format.
+
+    Input:
+    format_name(str): The format picked for the plate.
+    probe(dict): The probe of the plate.
+    preset_format(str): The aspect_ratio format of the preset.
+
+    Output:
+    matches(bool): True if the plate is in the preset format.
+    """
+    if format_name == preset_format:
+        return True
+
+    setup_log_lanh.LOGGER.warning(
+        f"Plate format {format_name} ({probe['width']}x{probe['height']}, "
+        f"{probe['pixel_aspect']:g} pixel aspect) doesn't match the preset format "
+        f"{preset_format}, the EXR output is reformatted to {preset_format}"
+    )
+
+    return False
@@ -0,0 +1,248 @@
+import os
+
+from . import setup_log_lanh
+
+# Default folder layout of a shot, each folder maps to its sub folders.
+DEFAULT_FOLDER_TEMPLATE = {
+    "comp": {
+        "01_scripts": {},
+        "02_footage": {
+            "01_plate": {},
+            "02_ref_mov": {},
+            "03_onset_ref": {},
+            "04_LUT": {},
+        },
+        "03_assets": {},
+        "04_renders": {
+            "01_mov": {},
+            "02_exr": {},
+        },
+    }
+}
+
+# Folders the setup reads from or writes into, every template needs them.
+REQUIRED_FOLDERS = [
+    ("comp", "01_scripts"),
+    ("comp", "02_footage", "01_plate"),
+    ("comp", "04_renders", "01_mov"),
+    ("comp", "04_renders", "02_exr"),
+]
+
+# Key of a folder's own path in the folder structure, "." can't be a folder name.
+PATH_KEY = "."
+
+# How many levels below a show folder shots can be, 2 covers show/shot and
+# show/sequence/shot layouts since shots are found by their comp folder.
+DEFAULT_SHOT_DEPTH = 2
+
+
+def is_shot_folder(folder_path):
+    """
+    Description:
+    Checks if a folder is a shot, a folder with a comp folder in it.
+
+    Input:
+    folder_path(str): The folder to check.
+
+    Output:
+    is_shot(bool): True if the folder has a comp folder.
+    """
+    return os.path.isdir(os.path.join(folder_path, "comp"))
+
+
+def validate_template(folder_template):
+    """
+    Description:
+    Checks that a folder template is made of nested dictionaries and has every
+    folder the setup needs.
+
+    Input:
+    folder_template(dict): The folder layout, each folder maps to its sub folders.
+
+    Output:
+    None
+    """
+
+    def check_level(level, parents):
+        if not isinstance(level, dict):
+            raise ValueError(
+                f"Folder template entry {'/'.join(parents)} must be a dictionary"
+            )
+        for name, children in level.items():
+            if not name or "/" in name or "\\" in name or name in (".", ".."):
+                raise ValueError(f"Invalid folder name in template: {name!r}")
+            check_level(children, parents + [name])
+
+    check_level(folder_template, [])
+
+    for required in REQUIRED_FOLDERS:
+        level = folder_template
+        for name in required:
+            if name not in level:
+                raise ValueError(f"Folder template is missing {'/'.join(required)}")
+            level = level[name]
+
+
+def build_folder_structure(shot_path, folder_template):
+    """
+    Description:
+    Builds the dictionary of folder paths of a shot from the template. Folders
+    with sub folders map to a dictionary that keeps their own path under
+    PATH_KEY, the rest map to their path.
+
+    Input:
+    shot_path(str): The folder path of the shot.
+    folder_template(dict): The folder layout.
+
+    Output:
+    folder_structure(dict): Directory of all the folders of the shot.
+    """
+
+    def build_level(parent_path, level):
+        structure = {PATH_KEY: parent_path}
+        for name, children in level.items():
+            path = os.path.join(parent_path, name)
+            structure[name] = build_level(path, children) if children else path
+        return structure
+
+    return build_level(shot_path, folder_template)
+
+
+def get_folder_path(folder_structure, *names):
+    """
+    Description:
+    Gets the path of a folder of the folder structure, whether it has sub
+    folders or not.
+
+    Input:
+    folder_structure(dict): Directory of all the folders of the shot.
+    names(str): The folder names from the shot down, e.g. "comp", "01_scripts".
+
+    Output:
+    folder_path(str): The path of the folder.
+    """
+    node = folder_structure
+    for name in names:
+        node = node[name]
+
+    return node[PATH_KEY] if isinstance(node, dict) else node
+
+
+def get_sub_folders(folder_structure, *names):
+    """
+    Description:
+    Gets the sub folders of a folder of the folder structure.
+
+    Input:
+    folder_structure(dict): Directory of all the folders of the shot.
+    names(str): The folder names from the shot down, e.g. "comp", "02_footage".
+
+    Output:
+    sub_folders(list): (name, path) of the sub folders, empty if the folder is
+    missing or has none.
+    """
+    node = folder_structure
+    for name in names:
+        node = node.get(name) if isinstance(node, dict) else None
+    if not isinstance(node, dict):
+        return []
+
+    return [(name, get_folder_path(node, name)) for name in node if name != PATH_KEY]
+
+
+def plan_folders(shot_path, folder_template):
+    """
+    Description:
+    Walks the existing tree once with scandir, only into the template folders,
+    and lists the folders that are missing.
+
+    Input:
+    shot_path(str): The folder path of the shot.
+    folder_template(dict): The folder layout.
+
+    Output:
+    missing_folders(list): The folders to create, parents before children.
+    """
+    missing_folders = []
+
+    def add_all(path, level):
+        missing_folders.append(path)
+        for name, children in level.items():
+            add_all(os.path.join(path, name), children)
+
+    def walk(path, level):
+        existing = set()
+        with os.scandir(path) as entries:
+            for entry in entries:
+                if entry.is_dir():
+                    existing.add(entry.name)
+
+        for name, children in level.items():
+            child_path = os.path.join(path, name)
+            if name in existing:
+                walk(child_path, children)
+            else:
+                add_all(child_path, children)
+
+    if os.path.isdir(shot_path):
+        walk(shot_path, folder_template)
+    else:
+        add_all(shot_path, folder_template)
+
+    return missing_folders
+
+
+def apply_plan(missing_folders):
+    """
+    Description:
+    Creates the missing folders of a plan, one mkdir each. The first folder
+    can be a shot of a new sequence, so it's created with its parents.
+
+    Input:
+    missing_folders(list): The folders to create, parents before children.
+
+    Output:
+    created(list): The folders that were created.
+    """
+    created = []
+    for index, folder_path in enumerate(missing_folders):
+        try:
+            if index == 0:
+                os.makedirs(folder_path)
+            else:
+                os.mkdir(folder_path)
+            created.append(folder_path)
+        except FileExistsError:
+            # Another setup created it in the meantime.
+            pass
+
+    return created
+
+
+def create_folder_structure(shot_path, folder_template=None, dry_run=False):
+    """
+    Description:
+    Creates only the folders of the template that don't exist yet.
+
+    Input:
+    shot_path(str): The folder path of the shot.
+    folder_template(dict): The folder layout, DEFAULT_FOLDER_TEMPLATE if None.
+    dry_run(bool): If True, nothing is created and the plan is returned.
+
+    Output:
+    folder_structure(dict): Directory of all the folders of the shot, or the
+    list of folders that would be created on a dry run.
+    """
+    if folder_template is None:
+        folder_template = DEFAULT_FOLDER_TEMPLATE
+    validate_template(folder_template)
+
+    missing_folders = plan_folders(shot_path, folder_template)
+    if dry_run:
+        return missing_folders
+
+    created = apply_plan(missing_folders)
+    for folder_path in created:
+        setup_log_lanh.LOGGER.debug(f"Created folder: {folder_path}")
+
+    return build_folder_structure(shot_path, folder_template)
@@ -0,0 +1,332 @@
+import os
+from concurrent import futures
+
+from . import folder_template_lanh, sequence_index_lanh
+
+# Footage folder the main plate is read from.
+PLATE_FOLDER = "01_plate"
+
+# Footage folder with the show and shot LUTs.
+LUT_FOLDER = "04_LUT"
+
+# Files read as footage, image sequences or movies.
+MEDIA_EXTENSIONS = (
+    ".exr",
+    ".dpx",
+    ".cin",
+    ".tif",
+    ".tiff",
+    ".jpg",
+    ".jpeg",
+    ".png",
+    ".tga",
+    ".hdr",
+    ".mov",
+    ".mp4",
+    ".mxf",
+    ".avi",
+    ".r3d",
+    ".ari",
+)
+
+# Media files that hold a whole clip, numbered names are versions, not frames.
+MOVIE_EXTENSIONS = (".mov", ".mp4", ".mxf", ".avi", ".r3d")
+
+# Files OCIOFileTransform can apply.
+LUT_EXTENSIONS = (
+    ".cube",
+    ".3dl",
+    ".csp",
+    ".spi1d",
+    ".spi3d",
+    ".spimtx",
+    ".cc",
+    ".ccc",
+    ".cdl",
+    ".clf",
+    ".lut",
+    ".vf",
+)
+
+# Node name the viewer applies as its input process.
+VIEWER_INPUT = "VIEWER_INPUT"
+
+# Space between the footage nodes of a row.
+NODE_SPACING = 150
+
+
+def get_footage_folders(folder_structure):
+    """
+    Description:
+    Gets the footage folders of a shot from its folder structure.
+
+    Input:
+    folder_structure(dict): Directory of all the folders of the shot.
+
+    Output:
+    footage_folders(list): Sorted (name, path) of the 02_footage sub folders.
+    """
+    return sorted(
+        folder_template_lanh.get_sub_folders(folder_structure, "comp", "02_footage")
+    )
+
+
+def to_nuke_path(path):
+    """
+    Description:
+    Normalizes a path to nuke standards, with forward slashes.
+
+    Input:
+    path(str): The path to normalize.
+
+    Output:
+    nuke_path(str): The normalized path.
+    """
+    return os.path.normpath(path).replace(os.path.sep, "/")
+
+
+def split_files(sequence):
+    """
+    Description:
+    Splits an indexed sequence back into single files, for files whose number
+    isn't a frame, e.g. ref_v01.mov and ref_v02.mov.
+
+    Input:
+    sequence(dict): A sequence, as returned by the sequence index.
+
+    Output:
+    sequences(list): A single file sequence per file.
+    """
+    if not sequence["is_sequence"]:
+        return [sequence]
+
+    files = []
+    for frame in sequence_index_lanh.get_frames(sequence):
+        file_name = (
+            f"{sequence['head']}{str(frame).zfill(sequence['padding'])}"
+            f"{sequence['tail']}"
+        )
+        files.append(
+            {
+                "name": file_name,
+                "head": file_name,
+                "tail": "",
+                "padding": 0,
+                "is_sequence": False,
+                "ranges": [],
+                "first": None,
+                "last": None,
+                "count": 1,
+            }
+        )
+
+    return files
+
+
+def scan_folder(name, folder_path):
+    """
+    Description:
+    Lists the footage elements of a folder, from the sequence index. LUT
+    folders keep their LUT files, the rest their sequences and movies.
+
+    Input:
+    name(str): The name of the footage folder, e.g. 02_ref_mov.
+    folder_path(str): The footage folder.
+
+    Output:
+    elements(list): A dictionary per element, with its kind, folder, path and
+    the sequence it was indexed as.
+    """
+    try:
+        sequences = sequence_index_lanh.index_sequences(folder_path)
+    except FileNotFoundError:
+        return []
+
+    if name == LUT_FOLDER:
+        kind, extensions = "lut", LUT_EXTENSIONS
+    elif name == PLATE_FOLDER:
+        kind, extensions = "plate", MEDIA_EXTENSIONS
+    else:
+        kind, extensions = "reference", MEDIA_EXTENSIONS
+
+    elements = []
+    for sequence in sequences:
+        extension = os.path.splitext(sequence["name"])[1].lower()
+        if extension not in extensions:
+            continue
+
+        # LUTs, movies and lone frames are read as single files.
+        if kind == "lut" or extension in MOVIE_EXTENSIONS or sequence["count"] == 1:
+            single_files = split_files(sequence)
+        else:
+            single_files = [sequence]
+
+        for sequence in single_files:
+            elements.append(
+                {
+                    "kind": kind,
+                    "folder": name,
+                    "path": to_nuke_path(os.path.join(folder_path, sequence["name"])),
+                    "sequence": sequence,
+                }
+            )
+
+    return elements
+
+
+def scan_footage(folder_structure, workers=4):
+    """
+    Description:
+    Scans every footage folder of a shot at the same time.
+
+    Input:
+    folder_structure(dict): Directory of all the folders of the shot.
+    workers(int): Number of threads scanning folders.
+
+    Output:
+    footage(dict): The plate, reference and lut elements of the shot, each
+    sorted by folder and name. Plates with the most frames come first.
+    """
+    footage_folders = get_footage_folders(folder_structure)
+
+    with futures.ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        scans = list(pool.map(lambda folder: scan_folder(*folder), footage_folders))
+
+    footage = {"plates": [], "references": [], "luts": []}
+    for elements in scans:
+        for element in elements:
+            footage[f"{element['kind']}s"].append(element)
+
+    footage["plates"].sort(key=lambda element: -element["sequence"]["count"])
+
+    return footage
+
+
+def get_read_knobs(element):
+    """
+    Description:
+    Gets the knobs of the Read of a footage element. Sequences get their frame
+    range, movies get theirs from nuke when it loads them.
+
+    Input:
+    element(dict): A plate or reference element.
+
+    Output:
+    knobs(list): The (knob, value) pairs.
+    """
+    sequence = element["sequence"]
+    knobs = [("file", element["path"])]
+
+    if sequence["is_sequence"]:
+        knobs += [
+            ("first", sequence["first"]),
+            ("last", sequence["last"]),
+            ("origfirst", sequence["first"]),
+            ("origlast", sequence["last"]),
+            ("origset", True),
+        ]
+        if sequence_index_lanh.get_frames(sequence).has_gaps():
+            knobs.append(("on_error", "nearest frame"))
+
+    # Plates stay in their raw colorspace like the main plate.
+    if element["kind"] == "plate":
+        knobs.append(("raw", True))
+
+    return knobs
+
+
+def get_backdrop(label, nodes):
+    """
+    Description:
+    Gets a backdrop around a row of footage nodes.
+
+    Input:
+    label(str): The label of the backdrop.
+    nodes(list): The planned nodes of the row.
+
+    Output:
+    backdrop(dict): The planned backdrop node.
+    """
+    xpos = min(node["xpos"] for node in nodes) - 25
+    ypos = min(node["ypos"] for node in nodes) - 75
+    width = max(node["xpos"] for node in nodes) + 125 - xpos
+
+    return {
+        "class": "BackdropNode",
+        "name": f"Backdrop_{label.replace(' ', '_')}",
+        "knobs": [
+            ("label", label),
+            ("note_font_size", 36),
+            ("bdwidth", width),
+            ("bdheight", 200),
+        ],
+        "xpos": xpos,
+        "ypos": ypos,
+    }
+
+
+def plan_footage_nodes(footage, main_path=None):
+    """
+    Description:
+    Lays out the nodes of the footage of a shot, besides the main plate. The
+    other plates sit left of the main plate, the references in a row above,
+    and the LUTs beside them, the first one as the viewer input process.
+
+    Input:
+    footage(dict): The footage of the shot, as returned by scan_footage.
+    main_path(str): The nuke path of the main plate, it's already read.
+
+    Output:
+    nodes(list): A dictionary per node with its class, name, knobs and
+    position, backdrops first.
+    """
+    plates = [element for element in footage["plates"] if element["path"] != main_path]
+
+    rows = []
+    plate_nodes = []
+    for index, element in enumerate(plates):
+        plate_nodes.append(
+            {
+                "class": "Read",
+                "name": f"Read_Plate{index + 2}",
+                "knobs": get_read_knobs(element),
+                "xpos": -200 * (index + 1),
+                "ypos": 0,
+            }
+        )
+    rows.append(("Plates", plate_nodes))
+
+    reference_nodes = []
+    for index, element in enumerate(footage["references"]):
+        reference_nodes.append(
+            {
+                "class": "Read",
+                "name": f"Read_Ref{index + 1}",
+                "knobs": get_read_knobs(element),
+                "xpos": NODE_SPACING * index,
+                "ypos": -400,
+            }
+        )
+    rows.append(("Reference", reference_nodes))
+
+    lut_nodes = []
+    for index, element in enumerate(footage["luts"]):
+        lut_nodes.append(
+            {
+                "class": "OCIOFileTransform",
+                "name": VIEWER_INPUT if index == 0 else f"LUT{index + 1}",
+                "knobs": [("file", element["path"])],
+                "xpos": -200 * (index + 1),
+                "ypos": -400,
+            }
+        )
+    rows.append(("LUT", lut_nodes))
+
+    nodes = []
+    for label, row in rows:
+        if row:
+            nodes.append(get_backdrop(label, row))
+    for label, row in rows:
+        nodes += row
+
+    return nodes
@@ -0,0 +1,442 @@
+import bisect
+import re
+
+# A frame range token of the nuke syntax, "1001", "1001-1100" or "1001-1100x2".
+RANGE_PATTERN = re.compile(r"^(-?\d+)(?:-(-?\d+)(?:x(\d+))?)?$")
+
+# Frames ranges are separated by spaces, commas are accepted too.
+SEPARATOR_PATTERN = re.compile(r"[\s,]+")
+
+# Equally spaced single frames written as one stepped range from this many on.
+MIN_STEPPED_FRAMES = 3
+
+
+class FrameSetError(ValueError):
+    """
+    Description:
+    Raised when a frame range can't be parsed.
+    """
+
+
+class FrameSet(object):
+    def __init__(self, ranges=()):
+        """
+        Description:
+        A set of frames stored as sorted runs of consecutive frames, so a plate
+        of 100k frames with a couple of gaps is three pairs of numbers. Lookups
+        are a binary search over the runs, and union, difference and
+        intersection walk the runs of both sets once. It's immutable.
+
+        Input:
+        ranges(list): Optional [first, last] pairs, in any order, overlapping
+        or touching pairs are merged.
+
+        Output:
+        None
+        """
+        runs = []
+        for first, last in sorted((int(first), int(last)) for first, last in ranges):
+            if last < first:
+                raise FrameSetError(f"Frame range {first}-{last} is reversed")
+            if runs and first <= runs[-1][1] + 1:
+                if last > runs[-1][1]:
+                    runs[-1] = (runs[-1][0], last)
+            else:
+                runs.append((first, last))
+
+        self._set_runs(runs)
+
+    def _set_runs(self, runs):
+        """
+        Description:
+        Stores sorted and merged runs, with the run starts for the binary
+        search and the frame count.
+
+        Input:
+        runs(list): Sorted (first, last) pairs that don't touch.
+
+        Output:
+        None
+        """
+        self._runs = tuple(runs)
+        self._firsts = [first for first, _ in runs]
+        self._count = sum(last - first + 1 for first, last in runs)
+
+    @property
+    def first(self):
+        """
+        Description:
+        Gets the first frame of the set.
+
+        Input:
+        None
+
+        Output:
+        first(int): The first frame, or None if the set is empty.
+        """
+        return self._runs[0][0] if self._runs else None
+
+    @property
+    def last(self):
+        """
+        Description:
+        Gets the last frame of the set.
+
+        Input:
+        None
+
+        Output:
+        last(int): The last frame, or None if the set is empty.
+        """
+        return self._runs[-1][1] if self._runs else None
+
+    @property
+    def ranges(self):
+        """
+        Description:
+        Gets the runs of the set, as the sequence index stores them.
+
+        Input:
+        None
+
+        Output:
+        ranges(list): Sorted [first, last] pairs, e.g. [[1, 50], [52, 100]].
+        """
+        return [[first, last] for first, last in self._runs]
+
+    def has_gaps(self):
+        """
+        Description:
+        Checks if frames are missing between the first and the last frame.
+
+        Input:
+        None
+
+        Output:
+        has_gaps(bool): True if the set has more than one run.
+        """
+        return len(self._runs) > 1
+
+    def get_span(self):
+        """
+        Description:
+        Gets every frame from the first to the last frame of the set.
+
+        Input:
+        None
+
+        Output:
+        span(FrameSet): A single run, or an empty set.
+        """
+        if not self._runs:
+            return FrameSet()
+
+        return get_runs_set([(self.first, self.last)])
+
+    def get_gaps(self):
+        """
+        Description:
+        Gets the frames missing between the first and the last frame.
+
+        Input:
+        None
+
+        Output:
+        gaps(FrameSet): The missing frames.
+        """
+        return get_runs_set(
+            [
+                (previous[1] + 1, run[0] - 1)
+                for previous, run in zip(self._runs, self._runs[1:])
+            ]
+        )
+
+    def get_frame(self, index):
+        """
+        Description:
+        Gets the n-th frame of the set, skipping the gaps.
+
+        Input:
+        index(int): The position of the frame, 0 is the first frame.
+
+        Output:
+        frame(int): The frame number.
+        """
+        if not 0 <= index < self._count:
+            raise IndexError(f"Frame index {index} out of {self._count} frames")
+
+        for first, last in self._runs:
+            length = last - first + 1
+            if index < length:
+                return first + index
+            index -= length
+
+    def union(self, other):
+        """
+        Description:
+        Gets the frames of either set.
+
+        Input:
+        other(FrameSet): The other set.
+
+        Output:
+        union(FrameSet): The frames in this set or the other.
+        """
+        runs = []
+        left = self._runs
+        right = other._runs
+        i = j = 0
+        while i < len(left) or j < len(right):
+            # Take the run that starts first, then merge it with the last one.
+            if j >= len(right) or (i < len(left) and left[i][0] <= right[j][0]):
+                first, last = left[i]
+                i += 1
+            else:
+                first, last = right[j]
+                j += 1
+
+            if runs and first <= runs[-1][1] + 1:
+                if last > runs[-1][1]:
+                    runs[-1] = (runs[-1][0], last)
+            else:
+                runs.append((first, last))
+
+        return get_runs_set(runs)
+
+    def difference(self, other):
+        """
+        Description:
+        Gets the frames of this set that aren't in the other.
+
+        Input:
+        other(FrameSet): The frames to remove.
+
+        Output:
+        difference(FrameSet): The remaining frames.
+        """
+        runs = []
+        right = other._runs
+        j = 0
+        for first, last in self._runs:
+            # Skip the removed runs that end before this run.
+            while j < len(right) and right[j][1] < first:
+                j += 1
+
+            k = j
+            while k < len(right) and right[k][0] <= last:
+                if right[k][0] > first:
+                    runs.append((first, right[k][0] - 1))
+                first = max(first, right[k][1] + 1)
+                k += 1
+            if first <= last:
+                runs.append((first, last))
+
+        return get_runs_set(runs)
+
+    def intersection(self, other):
+        """
+        Description:
+        Gets the frames in both sets.
+
+        Input:
+        other(FrameSet): The other set.
+
+        Output:
+        intersection(FrameSet): The frames in this set and the other.
+        """
+        runs = []
+        left = self._runs
+        right = other._runs
+        i = j = 0
+        while i < len(left) and j < len(right):
+            first = max(left[i][0], right[j][0])
+            last = min(left[i][1], right[j][1])
+            if first <= last:
+                runs.append((first, last))
+
+            # Move past the run that ends first.
+            if left[i][1] < right[j][1]:
+                i += 1
+            else:
+                j += 1
+
+        return get_runs_set(runs)
+
+    def format(self):
+        """
+        Description:
+        Formats the set with the nuke frame range syntax. Runs of equally
+        spaced single frames, like a render on twos, are written as a stepped
+        range.
+
+        Input:
+        None
+
+        Output:
+        range_text(str): The set as text, e.g. "1-50 52-100" or "1-99x2".
+        """
+        parts = []
+        runs = self._runs
+        index = 0
+        while index < len(runs):
+            first, last = runs[index]
+            if first != last:
+                parts.append(f"{first}-{last}")
+                index += 1
+                continue
+
+            # Gather the single frames that follow with the same step.
+            end = index + 1
+            if end < len(runs) and runs[end][0] == runs[end][1]:
+                step = runs[end][0] - first
+                while (
+                    end < len(runs)
+                    and runs[end][0] == runs[end][1]
+                    and runs[end][0] - runs[end - 1][0] == step
+                ):
+                    end += 1
+
+            if end - index >= MIN_STEPPED_FRAMES:
+                parts.append(f"{first}-{runs[end - 1][0]}x{step}")
+                index = end
+            else:
+                parts.append(str(first))
+                index += 1
+
+        return " ".join(parts)
+
+    def __contains__(self, frame):
+        index = bisect.bisect_right(self._firsts, frame) - 1
+        return index >= 0 and frame <= self._runs[index][1]
+
+    def __iter__(self):
+        for first, last in self._runs:
+            for frame in range(first, last + 1):
+                yield frame
+
+    def __len__(self):
+        return self._count
+
+    def __bool__(self):
+        return bool(self._runs)
+
+    def __eq__(self, other):
+        return isinstance(other, FrameSet) and self._runs == other._runs
+
+    def __ne__(self, other):
+        return not self == other
+
+    def __hash__(self):
+        return hash(self._runs)
+
+    def __or__(self, other):
+        return self.union(other)
+
+    def __sub__(self, other):
+        return self.difference(other)
+
+    def __and__(self, other):
+        return self.intersection(other)
+
+    def __str__(self):
+        return self.format()
+
+    def __repr__(self):
+        return f"FrameSet({self.format()!r})"
+
+
+def get_runs_set(runs):
+    """
+    Description:
+    Makes a frame set from runs that are already sorted and merged, without
+    sorting them again.
+
+    Input:
+    runs(list): Sorted (first, last) pairs that don't touch.
+
+    Output:
+    frame_set(FrameSet): The frame set.
+    """
+    frame_set = FrameSet()
+    frame_set._set_runs(runs)
+
+    return frame_set
+
+
+def from_frames(frames):
+    """
+    Description:
+    Makes a frame set from frame numbers.
+
+    Input:
+    frames(list): Frame numbers, in any order, with or without duplicates.
+
+    Output:
+    frame_set(FrameSet): The frame set.
+    """
+    runs = []
+    for frame in sorted(set(frames)):
+        if runs and frame == runs[-1][1] + 1:
+            runs[-1][1] = frame
+        else:
+            runs.append([frame, frame])
+
+    return get_runs_set([(first, last) for first, last in runs])
+
+
+def from_range(first, last, step=1):
+    """
+    Description:
+    Makes a frame set from a frame range.
+
+    Input:
+    first(int): The first frame.
+    last(int): The last frame, included.
+    step(int): Optional step between the frames, 2 renders on twos.
+
+    Output:
+    frame_set(FrameSet): The frame set.
+    """
+    if step < 1:
+        raise FrameSetError(f"Frame step {step} must be 1 or more")
+    if step == 1:
+        return FrameSet([(first, last)])
+
+    return get_runs_set([(frame, frame) for frame in range(first, last + 1, step)])
+
+
+def parse_frames(range_text):
+    """
+    Description:
+    Parses a frame range written with the nuke syntax.
+
+    Input:
+    range_text(str): The ranges, e.g. "1001-1100", "1-50 52-100" or "1-99x2".
+
+    Output:
+    frame_set(FrameSet): The frame set, empty for an empty text.
+    """
+    runs = []
+    for token in SEPARATOR_PATTERN.split(range_text.strip()):
+        if not token:
+            continue
+
+        match = RANGE_PATTERN.match(token)
+        if not match:
+            raise FrameSetError(f"{token!r} is not a frame range")
+
+        first = int(match.group(1))
+        last = int(match.group(2)) if match.group(2) is not None else first
+        if last < first:
+            raise FrameSetError(f"Frame range {token!r} is reversed")
+        step = int(match.group(3)) if match.group(3) else 1
+        if step < 1:
+            raise FrameSetError(f"Frame range {token!r} has a step of 0")
+
+        if step == 1:
+            runs.append((first, last))
+        else:
+            runs += [(frame, frame) for frame in range(first, last + 1, step)]
+
+    # The runs are sorted and merged once, however many tokens there are.
+    return FrameSet(runs)
@@ -0,0 +1,116 @@
+import argparse
+import json
+import os
+import subprocess
+import sys
+
+# Modules that must not load when the package is imported at nuke startup.
+HEAVY_MODULES = (
+    "PySide2",
+    "PyOpenColorIO",
+    "nuke_panel_setup_lanh.nuke_panel_setup_lanh",
+    "nuke_panel_setup_lanh.shot_setup_nuke_lanh",
+)
+
+# Code timed in a fresh interpreter, so nothing is already imported.
+MEASURE_CODE = """
+import json, sys, time
+start = time.perf_counter()
+import {module}
+seconds = time.perf_counter() - start
+heavy = [name for name in {heavy!r} if name in sys.modules]
+print(json.dumps({{"seconds": seconds, "heavy_loaded": heavy}}))
+"""
+
+
+def measure_import(module="nuke_panel_setup_lanh", runs=5):
+    """
+    Description:
+    Times the import of a module in fresh interpreters and lists the heavy
+    modules it pulled in.
+
+    Input:
+    module(str): The module to import.
+    runs(int): The number of interpreters to time, the best one is kept.
+
+    Output:
+    result(dict): The best and all the import times in seconds, and the heavy
+    modules that were loaded.
+    """
+    # Make the package importable from the child interpreter.
+    package_root = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+    env = dict(os.environ)
+    env["PYTHONPATH"] = os.pathsep.join(
+        path for path in (package_root, env.get("PYTHONPATH", "")) if path
+    )
+
+    code = MEASURE_CODE.format(module=module, heavy=HEAVY_MODULES)
+    times = []
+    heavy_loaded = []
+    for _ in range(max(1, runs)):
+        output = subprocess.run(
+            [sys.executable, "-c", code],
+            env=env,
+            check=True,
+            stdout=subprocess.PIPE,
+            universal_newlines=True,
+        ).stdout
+        measure = json.loads(output.strip().splitlines()[-1])
+        times.append(measure["seconds"])
+        heavy_loaded = measure["heavy_loaded"]
+
+    return {
+        "module": module,
+        "seconds": min(times),
+        "times": times,
+        "heavy_loaded": heavy_loaded,
+    }
+
+
+def main(argv=None):
+    """
+    Description:
+    Command line check of the package import cost, to keep nuke startup from
+    regressing.
+
+    Input:
+    argv(list): Optional list of arguments, sys.argv by default.
+
+    Output:
+    exit_code(int): 0 if the import is under budget and loads no heavy module.
+    """
+    parser = argparse.ArgumentParser(
+        description="Measure the import cost of the shot setup package."
+    )
+    parser.add_argument("--module", default="nuke_panel_setup_lanh")
+    parser.add_argument("--runs", type=int, default=5)
+    parser.add_argument(
+        "--budget-ms",
+        type=float,
+        default=20.0,
+        help="Fail when the best import time is over this budget.",
+    )
+    parser.add_argument("--json", action="store_true", help="Print the result as json.")
+    args = parser.parse_args(argv)
+
+    result = measure_import(args.module, args.runs)
+    milliseconds = result["seconds"] * 1000.0
+    result["budget_ms"] = args.budget_ms
+    result["passed"] = milliseconds <= args.budget_ms and not result["heavy_loaded"]
+
+    if args.json:
+        print(json.dumps(result, indent=4))
+    else:
+        print(
+            f"import {args.module}: {milliseconds:.2f}ms (budget {args.budget_ms:g}ms)"
+        )
+        if result["heavy_loaded"]:
+            print(
+                f"Heavy modules loaded at import: {', '.join(result['heavy_loaded'])}"
+            )
+
+    return 0 if result["passed"] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
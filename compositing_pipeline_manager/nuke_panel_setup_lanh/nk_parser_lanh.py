@@ -0,0 +1,238 @@
+import os
+import re
+
+from . import footage_lanh
+
+# Nodes whose inner nodes follow them in the script, up to an end_group line.
+GROUP_CLASSES = ("Group", "LiveGroup")
+
+# Nodes whose file knob is an output, every other file knob is an input.
+WRITE_CLASSES = ("Write", "DeepWrite", "WriteGeo")
+
+# Knobs holding the path of a file read or written by a node.
+FILE_KNOBS = ("file", "proxy")
+
+# Frame padding of a file knob, "####" or "%04d".
+PRINTF_PADDING = re.compile(r"%0?(\d*)d")
+
+# Frame number of a single frame path, e.g. plate.1001.exr.
+FRAME_NUMBER = re.compile(r"(?<=[._])(\d+)(?=\.\w+$)")
+
+
+def read_value(value):
+    """
+    Description:
+    Strips the quotes or braces around a knob value of a .nk file, and the
+    escapes of a quoted value.
+
+    Input:
+    value(str): The knob value as written in the file.
+
+    Output:
+    value(str): The bare value.
+    """
+    value = value.strip()
+    if len(value) > 1 and value[0] + value[-1] == '""':
+        return re.sub(r"\\(.)", r"\1", value[1:-1])
+    if len(value) > 1 and value[0] + value[-1] == "{}":
+        return value[1:-1]
+
+    return value
+
+
+def split_knob(line):
+    """
+    Description:
+    Splits a knob line of a node, indented once, into its name and value.
+    Lines indented more are the continuation of a multi line value.
+
+    Input:
+    line(str): The line, with its line ending.
+
+    Output:
+    knob(tuple): The name, the value as written and the line ending, or None
+    if the line isn't a knob line.
+    """
+    if not line.startswith(" ") or line.startswith("  "):
+        return None
+
+    text = line.rstrip("\r\n")
+    parts = text[1:].split(" ", 1)
+    if len(parts) != 2:
+        return None
+
+    return parts[0], parts[1], line[len(text) :]
+
+
+def get_node_start(line):
+    """
+    Description:
+    Gets the class of the node a line opens, nodes start with their class at
+    the start of the line.
+
+    Input:
+    line(str): The line.
+
+    Output:
+    node_class(str): The class, or None if the line doesn't open a node.
+    """
+    if line.startswith(" "):
+        return None
+
+    stripped = line.strip()
+    if not stripped.endswith("{"):
+        return None
+
+    node_class = stripped[:-1].strip()
+    return node_class if node_class and " " not in node_class else None
+
+
+def iter_nodes(lines, knobs=None):
+    """
+    Description:
+    Parses the nodes of a script one at a time, so only one node is held in
+    memory. Values are read from their first line, multi line values like
+    curves are cut to it.
+
+    Input:
+    lines(iterable): The lines of the script, e.g. an open file.
+    knobs(set): Optional knob names to keep, every knob by default.
+
+    Output:
+    nodes(generator): A dictionary per node, with its class, name, group path,
+    knobs as bare values and the line it starts on.
+    """
+    groups = []
+    node = None
+
+    for line_number, line in enumerate(lines, 1):
+        if node is not None:
+            if line.startswith(" "):
+                knob = split_knob(line)
+                if knob is not None and (knobs is None or knob[0] in knobs):
+                    node["knobs"][knob[0]] = read_value(knob[1])
+                if knob is not None and knob[0] == "name":
+                    node["name"] = read_value(knob[1])
+                continue
+
+            if line.rstrip("\r\n") == "}":
+                # Inner nodes of a group follow it until its end_group.
+                if node["class"] in GROUP_CLASSES:
+                    groups.append(node["name"] or node["class"])
+                yield node
+                node = None
+                continue
+
+        node_class = get_node_start(line)
+        if node_class is not None:
+            node = {
+                "class": node_class,
+                "name": "",
+                "group": ".".join(groups),
+                "knobs": {},
+                "line": line_number,
+            }
+        elif line.strip() == "end_group" and groups:
+            groups.pop()
+
+
+def read_nodes(nk_file_path, knobs=None):
+    """
+    Description:
+    Parses the nodes of a script file, see iter_nodes.
+
+    Input:
+    nk_file_path(str): The script to read.
+    knobs(set): Optional knob names to keep, every knob by default.
+
+    Output:
+    nodes(generator): A dictionary per node.
+    """
+    with open(nk_file_path, "r", encoding="utf-8", errors="replace") as f:
+        for node in iter_nodes(f, knobs):
+            yield node
+
+
+def to_sequence_path(path):
+    """
+    Description:
+    Normalizes a file path so the same files always compare equal: forward
+    slashes, and frame numbers and printf padding written as hashes.
+
+    Input:
+    path(str): A file knob value or a frame path.
+
+    Output:
+    sequence_path(str): e.g. /shots/sh010/plate.####.exr
+    """
+    path = os.path.normpath(path).replace(os.path.sep, "/").replace("\\", "/")
+    path = PRINTF_PADDING.sub(lambda match: "#" * int(match.group(1) or 1), path)
+
+    # A single frame stands for its sequence, numbered movies are versions.
+    extension = os.path.splitext(path)[1].lower()
+    if "#" not in os.path.basename(path) and extension not in (
+        footage_lanh.MOVIE_EXTENSIONS
+    ):
+        path = FRAME_NUMBER.sub(lambda match: "#" * len(match.group(1)), path)
+
+    return path
+
+
+def get_file_role(node_class):
+    """
+    Description:
+    Tells if the file knob of a node is read or written.
+
+    Input:
+    node_class(str): The class of the node.
+
+    Output:
+    role(str): "write" for output nodes, "read" for the rest.
+    """
+    return "write" if node_class in WRITE_CLASSES else "read"
+
+
+def read_script_summary(nk_file_path):
+    """
+    Description:
+    Reads the root settings and every file knob of a script in one pass.
+
+    Input:
+    nk_file_path(str): The script to read.
+
+    Output:
+    summary(dict): The root knobs, and a dictionary per file knob with the
+    node class, name, group, knob, path and role.
+    """
+    wanted = set(FILE_KNOBS) | {
+        "first_frame",
+        "last_frame",
+        "fps",
+        "format",
+        "disable",
+    }
+
+    summary = {"root": {}, "files": []}
+    for node in read_nodes(nk_file_path, wanted):
+        if node["class"] == "Root" and not node["group"]:
+            summary["root"] = node["knobs"]
+            continue
+
+        for knob in FILE_KNOBS:
+            path = node["knobs"].get(knob)
+            if not path:
+                continue
+            summary["files"].append(
+                {
+                    "node_class": node["class"],
+                    "node_name": node["name"],
+                    "group": node["group"],
+                    "knob": knob,
+                    "path": path,
+                    "sequence_path": to_sequence_path(path),
+                    "role": get_file_role(node["class"]),
+                    "disabled": node["knobs"].get("disable") == "true",
+                }
+            )
+
+    return summary
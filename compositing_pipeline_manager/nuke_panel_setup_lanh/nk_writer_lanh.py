@@ -0,0 +1,272 @@
+import re
+
+from . import exr_probe_lanh, footage_lanh, publish_lanh, setup_plan_lanh
+
+# Version written in the script header, newer nuke versions open it as is.
+NUKE_VERSION = "12.2 v1"
+
+# Nuke default formats as "width height pixel_aspect", to write full format knobs.
+NUKE_FORMATS = {
+    "PC_Video": (640, 480, 1.0),
+    "NTSC": (720, 486, 0.91),
+    "PAL": (720, 576, 1.09),
+    "NTSC_16:9": (720, 486, 1.21),
+    "PAL_16:9": (720, 576, 1.46),
+    "HD_720": (1280, 720, 1.0),
+    "HD_1080": (1920, 1080, 1.0),
+    "UHD_4K": (3840, 2160, 1.0),
+    "1K_Super_35(full-ap)": (1024, 778, 1.0),
+    "1K_Cinemascope": (914, 778, 2.0),
+    "2K_Super_35(full-ap)": (2048, 1556, 1.0),
+    "2K_Cinemascope": (1828, 1556, 2.0),
+    "2K_DCP": (2048, 1080, 1.0),
+    "4K_Super_35(full-ap)": (4096, 3112, 1.0),
+    "4K_Cinemascope": (3656, 3112, 2.0),
+    "4K_DCP": (4096, 2160, 1.0),
+    "square_256": (256, 256, 1.0),
+    "square_512": (512, 512, 1.0),
+    "square_1K": (1024, 1024, 1.0),
+    "square_2K": (2048, 2048, 1.0),
+}
+
+# Values that can be written without quotes.
+BARE_VALUE = re.compile(r"^[A-Za-z0-9_./:#+\-]+$")
+
+
+def quote_value(value):
+    """
+    Description:
+    Quotes a knob value for a .nk file when it has spaces or tcl characters.
+
+    Input:
+    value: The knob value, bools are written as true or false and floats
+    without trailing zeros.
+
+    Output:
+    text(str): The value as it goes into the script.
+    """
+    if isinstance(value, bool):
+        return "true" if value else "false"
+    if isinstance(value, float):
+        return f"{value:g}"
+
+    text = str(value)
+    if BARE_VALUE.match(text):
+        return text
+
+    for character in ("\\", '"', "[", "]", "$", "{", "}"):
+        text = text.replace(character, f"\\{character}")
+
+    return f'"{text}"'
+
+
+def get_format_value(format_name):
+    """
+    Description:
+    Gets the value of a format knob for a nuke format name. Unknown names are
+    written as the name only, for nuke to look them up in its format list.
+
+    Input:
+    format_name(str): The nuke format name, e.g. HD_1080.
+
+    Output:
+    format_value(str): The format as "width height x y right top aspect name".
+    """
+    if format_name not in NUKE_FORMATS:
+        return format_name
+
+    width, height, pixel_aspect = NUKE_FORMATS[format_name]
+    return f"{width} {height} 0 0 {width} {height} {pixel_aspect:g} {format_name}"
+
+
+def format_node(node_class, knobs, inputs=None):
+    """
+    Description:
+    Writes a node block in .nk syntax.
+
+    Input:
+    node_class(str): The class of the node, e.g. Read.
+    knobs(list): The (knob, value) pairs, in order.
+    inputs(int): The number of inputs, only written when it isn't 1.
+
+    Output:
+    lines(list): The lines of the node block.
+    """
+    lines = [f"{node_class} {{"]
+    if inputs is not None and inputs != 1:
+        lines.append(f" inputs {inputs}")
+    for knob, value in knobs:
+        lines.append(f" {knob} {quote_value(value)}")
+    lines.append("}")
+
+    return lines
+
+
+def get_plate_format_value(aspect_ratio, plate_probe):
+    """
+    Description:
+    Gets the root format knob value for the plate, named after the nuke format
+    of the same resolution when there is one.
+
+    Input:
+    aspect_ratio(str): The format of the preset.
+    plate_probe(dict): The probe of the plate, or None to use the preset format.
+
+    Output:
+    format_value(str): The format knob value.
+    """
+    if plate_probe is None:
+        return get_format_value(aspect_ratio)
+
+    width = plate_probe["width"]
+    height = plate_probe["height"]
+    pixel_aspect = plate_probe["pixel_aspect"]
+
+    formats = [(name,) + values for name, values in NUKE_FORMATS.items()]
+    format_name = exr_probe_lanh.find_format(width, height, pixel_aspect, formats)
+    if format_name is None:
+        format_name = exr_probe_lanh.get_plate_format_name(width, height)
+
+    exr_probe_lanh.check_preset_format(format_name, plate_probe, aspect_ratio)
+
+    return f"{width} {height} 0 0 {width} {height} {pixel_aspect:g} {format_name}"
+
+
+def build_script(
+    show_specifications,
+    folder_structure,
+    sequence,
+    plate_probe=None,
+    footage=None,
+    baked_luts=None,
+    proxy_path=None,
+):
+    """
+    Description:
+    Builds the text of a new script by stamping the setup plan of the preset,
+    the same graph the nuke backend builds: Read, the colorspace conversions
+    in and out, Remove, and the MOV and EXR branches.
+
+    Input:
+    show_specifications(dict): The show specs with the exr, mov and nuke file names.
+    folder_structure(dict): Directory of all the folders of the shot.
+    sequence(dict): The plate sequence, as returned by the sequence index.
+    plate_probe(dict): Optional probe of the plate headers, the root format
+    follows the plate when it's given.
+    footage(dict): Optional footage of the shot, as returned by
+    footage_lanh.scan_footage, its other plates, references and LUTs are read.
+    baked_luts(dict): Optional "input" and "output" baked LUTs, read by
+    OCIOFileTransform nodes instead of the OCIOColorSpace conversions.
+    proxy_path(str): Optional proxy sequence of the plate, read in proxy mode.
+
+    Output:
+    script_text(str): The contents of the .nk file.
+    """
+    # The graph of the preset is compiled once, only the shot values change.
+    aspect_ratio = show_specifications["aspect_ratio"]
+    plan = setup_plan_lanh.get_plan(show_specifications, baked=bool(baked_luts))
+    parameters = setup_plan_lanh.get_parameters(
+        show_specifications,
+        folder_structure,
+        sequence,
+        get_plate_format_value(aspect_ratio, plate_probe),
+        baked_luts,
+        proxy_path,
+    )
+    stamped = setup_plan_lanh.apply_plan(plan, parameters)
+
+    lines = ["#! nuke -nx", f"version {NUKE_VERSION}"]
+    lines += format_node("Root", stamped["root"], inputs=0)
+    lines += format_planned_nodes(stamped["nodes"])
+
+    # Other plates, references and LUTs, standing alone.
+    if footage is not None:
+        lines += format_planned_nodes(
+            footage_lanh.plan_footage_nodes(footage, parameters["read_path"])
+        )
+
+    return "\n".join(lines) + "\n"
+
+
+def format_planned_nodes(planned_nodes):
+    """
+    Description:
+    Writes nodes laid out ahead of time, e.g. the nodes of a setup plan. A
+    node follows the node before it on the stack, nodes with another input
+    push it back first, and nodes without input stand alone.
+
+    Input:
+    planned_nodes(list): A dictionary per node with its class, name, knobs,
+    position and optional input name.
+
+    Output:
+    lines(list): The lines of the node blocks.
+    """
+    # Nodes used as input out of order are kept in a stack variable.
+    referenced = set()
+    previous = None
+    for planned in planned_nodes:
+        input_name = planned.get("input")
+        if input_name is not None and input_name != previous:
+            referenced.add(input_name)
+        previous = planned["name"]
+
+    lines = []
+    previous = None
+    for planned in planned_nodes:
+        input_name = planned.get("input")
+        if input_name is not None and input_name != previous:
+            lines.append(f"push $N_{input_name}")
+
+        knobs = [
+            (knob, get_format_value(value) if knob == "format" else value)
+            for knob, value in planned["knobs"]
+        ]
+        knobs += [
+            ("name", planned["name"]),
+            ("xpos", planned["xpos"]),
+            ("ypos", planned["ypos"]),
+        ]
+        lines += format_node(
+            planned["class"], knobs, inputs=0 if input_name is None else None
+        )
+
+        if planned["name"] in referenced:
+            lines.append(f"set N_{planned['name']} [stack 0]")
+        previous = planned["name"]
+
+    return lines
+
+
+def write_prepared_script(prepared, timer):
+    """
+    Description:
+    Writes the script of a prepared shot as .nk text directly, without a nuke
+    session or licence.
+
+    Input:
+    prepared(dict): The prepared shot, as returned by
+    shot_setup_nuke_lanh.prepare_shot.
+    timer(class): The SetupTimer of the setup, to time every stage.
+
+    Output:
+    nk_file_path(str): The path of the written script.
+    """
+    show_specifications = prepared["show_specifications"]
+    script_text = build_script(
+        show_specifications,
+        prepared["folder_structure"],
+        prepared["sequence"],
+        prepared["plate_probe"],
+        prepared["footage"],
+        prepared["baked_luts"],
+        prepared["proxy_path"],
+    )
+    timer.lap("graph_build")
+
+    # Written on local scratch and renamed into place.
+    nk_file_path = show_specifications["nuke_file"]
+    publish_lanh.write_text(nk_file_path, script_text)
+    timer.lap("save")
+
+    return nk_file_path
@@ -1,530 +1,1029 @@
-import nuke
-import os
-import json
-import PySide2 as ps
-import PyOpenColorIO as ocio
-import shot_setup_nuke_lanh as nkfile
-
-
-# It creates the UI object.
-class ShowPresetsUI(ps.QtWidgets.QDialog):
-    def __init__(self, parent=None):
-        """
-        Description:
-        Initialize the class, or ui window in this case.
-
-        Input:
-        parent(class): Optional parent class to inherit.
-
-        Output:
-        None
-        """
-        super(ShowPresetsUI, self).__init__(parent)
-
-        # Default specifications template
-        self.default_specs = {
-            "aspect_ratio": "HD_1080",
-            "color_space": "sRGB",
-            "frame_range": "1-100",
-            "viewer": "None",
-            "screen_color": "texture_paint",
-            "workspace_color": "scene_linear",
-            "exr_name": "final.####.exr",
-            "mov_name": "final.mov",
-            "fps": "24",
-        }
-
-        # Current working specs
-        self.current_specs = self.default_specs.copy()
-        self.current_show_path = ""
-
-        self.setWindowTitle("Shot Presets Manager")
-        self.setMinimumSize(600, 500)
-        self.resize(600, 300)
-        self.setWindowFlags(ps.QtCore.Qt.Window)
-
-        self.init_ui()
-        # self.load_show_presets()
-
-    def init_ui(self):
-        """
-        Description:
-        A class function that sets up the title and the UI.
-
-        Input:
-        none
-
-        Output:
-        None
-        """
-        layout = ps.QtWidgets.QVBoxLayout(self)
-
-        # Title
-        title = ps.QtWidgets.QLabel("Shot Setup Manager")
-        title.setAlignment(ps.QtCore.Qt.AlignCenter)
-        title.setStyleSheet("font-size: 18px; font-weight: bold; margin: 15px;")
-        layout.addWidget(title)
-
-        # Show selection and path section
-        self.create_show_section(layout)
-
-        # Specifications editor
-        self.create_specs_editor(layout)
-
-        # Action buttons
-        self.create_action_buttons(layout)
-
-    def create_show_section(self, parent_layout):
-        group = ps.QtWidgets.QGroupBox("Shot Setup:")
-        layout = ps.QtWidgets.QVBoxLayout(group)
-
-        # New show name input
-        new_shot_layout = ps.QtWidgets.QHBoxLayout()
-        new_shot_layout.addWidget(ps.QtWidgets.QLabel("Compositors Name:"))
-        self.show_name_input = ps.QtWidgets.QLineEdit()
-        self.show_name_input.setPlaceholderText("Enter the compositors name...")
-        self.show_name_input.setToolTip(
-            "Add the compostior name as formatted to the show to add to the file name"
-        )
-        new_shot_layout.addWidget(self.show_name_input)
-        layout.addLayout(new_shot_layout)
-
-        # Show path selection
-        path_layout = ps.QtWidgets.QHBoxLayout()
-        path_layout.addWidget(ps.QtWidgets.QLabel("Shot Path:"))
-
-        self.show_path_label = ps.QtWidgets.QLabel("No path selected")
-        self.show_path_label.setStyleSheet(
-            "border: 1px solid gray; padding: 5px; background: #f0f0f0;"
-        )
-        self.show_path_label.setToolTip(
-            "In the browse button, search for your shot folder "
-            "click on the root folder."
-        )
-        path_layout.addWidget(self.show_path_label, 1)
-
-        browse_btn = ps.QtWidgets.QPushButton("Browse")
-        browse_btn.clicked.connect(self.browse_show_path)
-        path_layout.addWidget(browse_btn)
-
-        layout.addLayout(path_layout)
-
-        # Add an add preset button
-        preset_layout = ps.QtWidgets.QHBoxLayout()
-        preset_layout.addWidget(ps.QtWidgets.QLabel("Show Preset:"))
-
-        self.preset_path_label = ps.QtWidgets.QLabel("No path selected")
-        self.preset_path_label.setStyleSheet(
-            "border: 1px solid gray; padding: 5px; background: #f0f0f0;"
-        )
-        self.preset_path_label.setToolTip(
-            "In the browse button, search for your shot folder "
-            "click on the root folder."
-        )
-        preset_layout.addWidget(self.preset_path_label, 1)
-
-        search_btn = ps.QtWidgets.QPushButton("Browse")
-        search_btn.clicked.connect(self.browse_preset_path)
-        search_btn.clicked.connect(self.load_preset_settings)
-        preset_layout.addWidget(search_btn)
-
-        layout.addLayout(preset_layout)
-
-        parent_layout.addWidget(group)
-
-    # Come back here to manually set up the list of options.
-    def create_specs_editor(self, parent_layout):
-        group = ps.QtWidgets.QGroupBox("Show Specifications")
-        form_layout = ps.QtWidgets.QFormLayout(group)
-
-        # Create input widgets for each spec
-        self.spec_widgets = {}
-
-        # Grab the available list.
-        color_spaces, aspect_ratios, viewer_color = self.get_options()
-
-        # Get color spaces
-        # color_spaces = nuke.getOcioColorSpaces()
-
-        # Aspect Ratio
-        self.spec_widgets["aspect_ratio"] = ps.QtWidgets.QComboBox()
-        self.spec_widgets["aspect_ratio"].addItems(aspect_ratios)
-        form_layout.addRow("Aspect Ratio:", self.spec_widgets["aspect_ratio"])
-
-        # Color Space
-        self.spec_widgets["viewer"] = ps.QtWidgets.QComboBox()
-        self.spec_widgets["viewer"].addItems(viewer_color)
-        form_layout.addRow("Color Space:", self.spec_widgets["viewer"])
-
-        # Screen Color
-        self.spec_widgets["screen_color"] = ps.QtWidgets.QComboBox()
-        self.spec_widgets["screen_color"].addItems(color_spaces)
-        form_layout.addRow("Screen Color:", self.spec_widgets["screen_color"])
-
-        # Workspace Color
-        self.spec_widgets["workspace_color"] = ps.QtWidgets.QComboBox()
-        self.spec_widgets["workspace_color"].addItems(color_spaces)
-        form_layout.addRow("Workspace Color:", self.spec_widgets["workspace_color"])
-
-        # EXR Name
-        self.spec_widgets["exr_name"] = ps.QtWidgets.QLineEdit()
-        form_layout.addRow("EXR Name:", self.spec_widgets["exr_name"])
-
-        # MOV Name
-        self.spec_widgets["mov_name"] = ps.QtWidgets.QLineEdit()
-        form_layout.addRow("MOV Name:", self.spec_widgets["mov_name"])
-
-        # FPS
-        self.spec_widgets["fps"] = ps.QtWidgets.QComboBox()
-        self.spec_widgets["fps"].addItems(
-            ["23.976", "24", "25", "29.97", "30", "50", "59.94", "60"]
-        )
-        self.spec_widgets["fps"].setEditable(True)
-        form_layout.addRow("FPS:", self.spec_widgets["fps"])
-
-        parent_layout.addWidget(group)
-
-    # Come back to this to set up the action buttons. COME HERE TO CONNECT.
-    def create_action_buttons(self, parent_layout):
-        """
-        Description:
-        Creates the Save Show Preset, Start New Script, and close bottons.
-
-        Input:
-        None
-
-        Output:
-        None
-        """
-        button_layout = ps.QtWidgets.QHBoxLayout()
-
-        # Save Show Preset
-        save_btn = ps.QtWidgets.QPushButton("Save Show Preset")
-        save_btn.clicked.connect(self.save_show_preset)
-        save_btn.setStyleSheet(
-            "background-color: #2196F3; color: white; font-weight: bold; padding: 8px;"
-        )
-        button_layout.addWidget(save_btn)
-
-        # Setup New Script (calls your existing function)
-        setup_btn = ps.QtWidgets.QPushButton("Setup New Script")
-        setup_btn.clicked.connect(self.transfer_data)
-        setup_btn.clicked.connect(self.close)
-        setup_btn.setStyleSheet(
-            "background-color: #4CAF50; color: white; font-weight: bold; padding: 8px;"
-        )
-        button_layout.addWidget(setup_btn)
-
-        # Close
-        close_btn = ps.QtWidgets.QPushButton("Close")
-        close_btn.clicked.connect(self.close)
-        close_btn.setStyleSheet(
-            "background-color: #FA003F; color: white; font-weight: bold; padding: 8px;"
-        )
-        button_layout.addWidget(close_btn)
-
-        parent_layout.addLayout(button_layout)
-
-    def browse_show_path(self):
-        """
-        Description:
-        Browses the paths and sets the text of the selected file.
-
-        Input:
-        None
-
-        Output:
-        show_path(str): A path to your comp folder.
-        """
-        current_path = self.show_path_label.text()
-        if current_path == "No path selected":
-            current_path = os.path.expanduser("~")
-        folder = ps.QtWidgets.QFileDialog.getExistingDirectory(
-            self, "Select Folder", current_path
-        )
-        if folder:
-            self.current_show_path = folder
-
-        # print(folder)
-        return folder
-
-    def browse_preset_path(self):
-        """
-        Description:
-        Sets the JSON preset file for the show.
-
-        Input:
-        None
-
-        Output:
-        json_preset(str): .JSON file path.
-        """
-
-        current_path = self.preset_path_label.text()
-        if current_path == "No path selected":
-            current_path = os.path.expanduser("~")
-
-        file_path, _ = ps.QtWidgets.QFileDialog.getOpenFileName(
-            self,
-            "Select Preset JSON File",
-            current_path,
-            "JSON Files (*.json);;All Files (*)",
-        )
-        if file_path:
-            json_preset = self.preset_path_label.setText(file_path)
-            # You might also want to call a function here to load the data from this file
-            # e.g., self.load_preset_from_file(file_path)
-        return json_preset
-
-    def get_json_path(self, name, root):
-        """
-        Description:
-        Get the root directory, and create a json file path.
-
-        Input:
-        name (str): The name of the presets file.
-        root (str):
-
-        Output:
-        json_nuke_path (str): The path of the json file with nuke slashes.
-        """
-        # Sets the json name.
-        json_name = f"{name}.json"
-        print(json_name)
-        print(name)
-
-        # This will now create a folder like C:\Users\YourUsername\presets
-        presets_folder = os.path.join(root, "presets")
-
-        print(json_name)
-        print(name)
-
-        # Ensure the directory exists before returning the path
-        os.makedirs(presets_folder, exist_ok=True)
-
-        json_path = os.path.join(presets_folder, json_name)
-
-        json_nuke_path = json_path.replace(os.path.sep, "/")
-
-        print(json_nuke_path)
-        return json_nuke_path
-
-    def save_show_preset(self):
-        """
-        Description:
-        It saves the selected nodes in the show settings into a json file
-
-        Input:
-        None
-
-        Output:
-        filename(str): Is the path of the saved json file.
-        """
-        json_preset = dict()
-        shot_path = self.browse_show_path()
-        name = "preset"
-        # print(shot_path)
-        # print (name)
-        filename = self.get_json_path(name, shot_path)
-        # print(filename)
-        for key, widget in self.spec_widgets.items():
-            if isinstance(widget, ps.QtWidgets.QLineEdit):
-                json_preset[key] = widget.text()
-            elif isinstance(widget, ps.QtWidgets.QComboBox):
-                json_preset[key] = widget.currentText()
-        # print(json_preset)
-
-        with open(filename, "w") as f:
-            json.dump(json_preset, f, indent=4)
-        # print('Succesfully exported to {}'.format(filename))
-
-        return filename
-
-    def load_preset_settings(self):
-        """
-        Description:
-        It loads the presets of a json file into the respective keys.
-
-        Input:
-        None
-
-        Output:
-        self.current_specs (dic): A new updated dictionary with all the current specs.
-        """
-        with open(self.preset_path_label.text(), "r") as f:
-            data = json.load(f)
-
-        self.current_specs = data.copy()
-
-        # print (self.current_specs)
-
-        for key, widget in self.spec_widgets.items():
-            value = self.current_specs.get(key, "")
-            # print(f'This is the value {value}')
-            if isinstance(widget, ps.QtWidgets.QComboBox):
-                index = widget.findText(value)
-                if index >= 0:
-                    widget.setCurrentIndex(index)
-                    # print (f'index {index}')
-                else:
-                    widget.setEditText(value)
-                    # print (f'value: {value}')
-            elif isinstance(widget, ps.QtWidgets.QLineEdit):
-                widget.setText(value)
-
-        # print (self.spec_widgets.items())
-
-        ps.QtWidgets.QMessageBox.information(
-            self, "Preset Loaded", "Preset loaded successfully!"
-        )
-
-        return self.current_specs
-
-    def get_options(self):
-        """
-        Description:
-        Grabs all the available items in the list and adds it to the menu.
-
-        Input:
-        None
-
-        Ouput:
-        options_vl(list): List of all the available colorspaces in the OCIOColorspace node
-        aspect_ratios(list): List of all the available aspect ratios/
-        viewer_color(list): List of all the available viewer color.
-        """
-
-        # Get the active OCIO config Nuke is using
-        config = ocio.GetCurrentConfig()
-
-        # Get *only* the defined color spaces (no displays, no views)
-        color_spaces = [cs.getName() for cs in config.getColorSpaces()]
-
-        # Grab all the aspect ratios available
-        aspect_ratios = []
-        for format_obj in nuke.formats():
-            aspect_ratios.append(format_obj.name())
-
-        # Grab all the available viewer options
-        viewer_color = []
-        viewer = nuke.activeViewer()
-        colors = viewer.node()["viewerProcess"].values()
-        for i in colors:
-            viewer_color.append(i)
-
-        return color_spaces, aspect_ratios, viewer_color
-
-    def grab_root_name(self, path):
-        """
-        Description:
-        Grab the given path and get the last two words.
-
-        Input:
-        path(str): Full path of where the shot will be set.
-
-        Output:
-        root_folders(list): List of the last two strings needed.
-        """
-        # Use os.path.normpath() to normalize the path and then split it
-        dir_list = os.path.normpath(path).split(os.path.sep)
-
-        # Grab the last two elements from the list
-        root_folders = dir_list[-2:]
-
-        # print(root_folders)
-        # print(dir_list)
-        return root_folders
-
-    def transfer_data(self):
-        """
-        Description:
-        Adds the results to a list that exports it to a set up script.
-
-        Input:
-        None
-
-        Output:
-        specs (dict): All the values gathered by the UI.
-        """
-
-        # Set the dictionary blank.
-        specs = {}
-
-        # Gets the shot folder path.
-        shot_path = self.show_path_label.text()
-
-        # Get the specs information into the file.
-        for key, widget in self.spec_widgets.items():
-            if isinstance(widget, ps.QtWidgets.QLineEdit):
-                specs[key] = widget.text()
-            elif isinstance(widget, ps.QtWidgets.QComboBox):
-                specs[key] = widget.currentText()
-
-        # Grab the folders name for the naming convention.
-        show_shot_name = self.grab_root_name(shot_path)
-        show_name, shot_number = show_shot_name
-        compers_name = self.show_name_input.text()
-
-        # Set the naming files for the shows and outputs.
-        file_name = f"{show_name}_{shot_number}_comp_{compers_name}_v01"
-        file_name_path = f"{shot_path}/comp/01_scripts/"
-        base_file_path = os.path.join(file_name_path, file_name)
-        nk_file_path = f"{base_file_path}.nk"
-        exr_name = f"{file_name}_{self.spec_widgets['exr_name'].text()}"
-        mov_name = f"{file_name}_{self.spec_widgets['mov_name'].text()}"
-
-        # Rename the exr and mov inputs.
-        specs["exr_name"] = exr_name
-        specs["mov_name"] = mov_name
-        specs["nuke_file"] = nk_file_path
-
-        nkfile.setup_new_script(shot_path, specs)
-
-        return
-
-
-def show_presets_manager():  #
-    """
-    Description:
-    It checks if the window is created, deletes the window, and draws a new one.
-
-    Input:
-    None
-
-    Output:
-    show_presets_manager.ui(class): Is an object that stores the UI class in it.
-    """
-
-    # Check if the function has the attribute (window), named dialog. if it does, it closes it.
-    if hasattr(show_presets_manager, "ui"):
-        show_presets_manager.ui.close()
-
-    # Stores the class into the show_presets_manager.ui attribute.
-    show_presets_manager.ui = ShowPresetsUI()
-
-    # Shows the window.
-    show_presets_manager.ui.show()
-
-    # print(type(show_presets_manager.ui))
-
-    return show_presets_manager.ui
-
-
-def main():
-    """
-    Description:
-    It runs the UI program.
-
-    Input:
-    None
-
-    Output:
-    None
-    """
-    # Runs the program.
-    show_presets_manager()
-
-
-# Run the UI
-if __name__ == "__main__":
-    show_presets_manager()
+import os
+import threading
+import PySide2 as ps
+from concurrent import futures
+from . import colorspace_lanh, folder_template_lanh, option_catalog_lanh
+from . import preset_store_lanh, setup_log_lanh, shot_index_lanh, thumbnail_lanh
+from . import shot_setup_nuke_lanh as nkfile
+
+
+# It creates the UI object.
+class ShowPresetsUI(ps.QtWidgets.QDialog):
+    def __init__(self, parent=None):
+        """
+        Description:
+        Initialize the class, or ui window in this case.
+
+        Input:
+        parent(class): Optional parent class to inherit.
+
+        Output:
+        None
+        """
+        super(ShowPresetsUI, self).__init__(parent)
+
+        # Default specifications template
+        self.default_specs = {
+            "aspect_ratio": "HD_1080",
+            "color_space": "sRGB",
+            "viewer": "None",
+            "screen_color": "texture_paint",
+            "workspace_color": "scene_linear",
+            "exr_name": "final.####.exr",
+            "mov_name": "final.mov",
+            "fps": "24",
+            "folder_template": folder_template_lanh.DEFAULT_FOLDER_TEMPLATE,
+        }
+
+        # Current working specs
+        self.current_specs = self.default_specs.copy()
+        self.current_show_path = ""
+
+        # Setup running in the background, if any.
+        self.setup_job = None
+        self.cancel_event = None
+
+        # Show whose shots are listed, and its index update running, if any.
+        self.show_root = ""
+        self.index_job = None
+
+        # Plate preview of the selected shot being made, if any.
+        self.preview_job = None
+
+        self.setWindowTitle("Shot Presets Manager")
+        self.setMinimumSize(600, 850)
+        self.resize(600, 300)
+        self.setWindowFlags(ps.QtCore.Qt.Window)
+
+        self.init_ui()
+        # self.load_show_presets()
+
+    def init_ui(self):
+        """
+        Description:
+        A class function that sets up the title and the UI.
+
+        Input:
+        none
+
+        Output:
+        None
+        """
+        layout = ps.QtWidgets.QVBoxLayout(self)
+
+        # Title
+        title = ps.QtWidgets.QLabel("Shot Setup Manager")
+        title.setAlignment(ps.QtCore.Qt.AlignCenter)
+        title.setStyleSheet("font-size: 18px; font-weight: bold; margin: 15px;")
+        layout.addWidget(title)
+
+        # Shots of the show, from the shot index
+        self.create_shot_list(layout)
+
+        # Show selection and path section
+        self.create_show_section(layout)
+
+        # Specifications editor
+        self.create_specs_editor(layout)
+
+        # Action buttons
+        self.create_action_buttons(layout)
+
+    def create_show_section(self, parent_layout):
+        group = ps.QtWidgets.QGroupBox("Shot Setup:")
+        layout = ps.QtWidgets.QVBoxLayout(group)
+
+        # New show name input
+        new_shot_layout = ps.QtWidgets.QHBoxLayout()
+        new_shot_layout.addWidget(ps.QtWidgets.QLabel("Compositors Name:"))
+        self.show_name_input = ps.QtWidgets.QLineEdit()
+        self.show_name_input.setPlaceholderText("Enter the compositors name...")
+        self.show_name_input.setToolTip(
+            "Add the compostior name as formatted to the show to add to the file name"
+        )
+        new_shot_layout.addWidget(self.show_name_input)
+        layout.addLayout(new_shot_layout)
+
+        # Show path selection
+        path_layout = ps.QtWidgets.QHBoxLayout()
+        path_layout.addWidget(ps.QtWidgets.QLabel("Shot Path:"))
+
+        self.show_path_label = ps.QtWidgets.QLabel("No path selected")
+        self.show_path_label.setStyleSheet(
+            "border: 1px solid gray; padding: 5px; background: #f0f0f0;"
+        )
+        self.show_path_label.setToolTip(
+            "In the browse button, search for your shot folder "
+            "click on the root folder."
+        )
+        path_layout.addWidget(self.show_path_label, 1)
+
+        browse_btn = ps.QtWidgets.QPushButton("Browse")
+        browse_btn.clicked.connect(self.pick_shot_path)
+        path_layout.addWidget(browse_btn)
+
+        layout.addLayout(path_layout)
+
+        # Plate preview of the shot, made in the background.
+        preview_layout = ps.QtWidgets.QHBoxLayout()
+        self.preview_label = ps.QtWidgets.QLabel("No preview")
+        self.preview_label.setAlignment(ps.QtCore.Qt.AlignCenter)
+        self.preview_label.setMinimumHeight(150)
+        preview_layout.addWidget(self.preview_label, 1)
+
+        self.filmstrip_check = ps.QtWidgets.QCheckBox("Filmstrip")
+        self.filmstrip_check.setToolTip("Show frames across the whole plate.")
+        self.filmstrip_check.toggled.connect(self.update_preview)
+        preview_layout.addWidget(self.filmstrip_check)
+        layout.addLayout(preview_layout)
+
+        self.preview_timer = ps.QtCore.QTimer(self)
+        self.preview_timer.timeout.connect(self.poll_preview)
+
+        # Add an add preset button
+        preset_layout = ps.QtWidgets.QHBoxLayout()
+        preset_layout.addWidget(ps.QtWidgets.QLabel("Show Preset:"))
+
+        self.preset_path_label = ps.QtWidgets.QLabel("No path selected")
+        self.preset_path_label.setStyleSheet(
+            "border: 1px solid gray; padding: 5px; background: #f0f0f0;"
+        )
+        self.preset_path_label.setToolTip(
+            "In the browse button, search for your shot folder "
+            "click on the root folder."
+        )
+        preset_layout.addWidget(self.preset_path_label, 1)
+
+        search_btn = ps.QtWidgets.QPushButton("Browse")
+        search_btn.clicked.connect(self.browse_preset_path)
+        search_btn.clicked.connect(self.load_preset_settings)
+        preset_layout.addWidget(search_btn)
+
+        layout.addLayout(preset_layout)
+
+        parent_layout.addWidget(group)
+
+    def create_shot_list(self, parent_layout):
+        """
+        Description:
+        Creates the list of the shots of a show and their setup state. It's
+        filled from the shot index, so thousands of shots list instantly.
+
+        Input:
+        parent_layout(class): The layout to add the list to.
+
+        Output:
+        None
+        """
+        group = ps.QtWidgets.QGroupBox("Show Shots:")
+        layout = ps.QtWidgets.QVBoxLayout(group)
+
+        # Show root selection
+        root_layout = ps.QtWidgets.QHBoxLayout()
+        root_layout.addWidget(ps.QtWidgets.QLabel("Show Path:"))
+        self.show_root_label = ps.QtWidgets.QLabel("No path selected")
+        self.show_root_label.setStyleSheet(
+            "border: 1px solid gray; padding: 5px; background: #f0f0f0;"
+        )
+        root_layout.addWidget(self.show_root_label, 1)
+
+        root_btn = ps.QtWidgets.QPushButton("Browse")
+        root_btn.clicked.connect(self.browse_show_root)
+        root_layout.addWidget(root_btn)
+
+        self.rescan_btn = ps.QtWidgets.QPushButton("Rescan")
+        self.rescan_btn.setToolTip("Update the index with the shots that changed.")
+        self.rescan_btn.clicked.connect(self.update_shot_index)
+        root_layout.addWidget(self.rescan_btn)
+        layout.addLayout(root_layout)
+
+        # Filter of the list
+        self.shot_filter_input = ps.QtWidgets.QLineEdit()
+        self.shot_filter_input.setPlaceholderText("Filter shots...")
+        self.shot_filter_input.textChanged.connect(self.load_shot_list)
+        layout.addWidget(self.shot_filter_input)
+
+        # Shots and their state
+        self.shot_list = ps.QtWidgets.QTreeWidget()
+        self.shot_list.setHeaderLabels(["Shot", "State", "Plate", "Frames"])
+        self.shot_list.setRootIsDecorated(False)
+        self.shot_list.setUniformRowHeights(True)
+        self.shot_list.itemSelectionChanged.connect(self.select_shot)
+        layout.addWidget(self.shot_list)
+
+        parent_layout.addWidget(group)
+
+    def browse_show_root(self):
+        """
+        Description:
+        Picks the show folder, lists its shots from the index and updates the
+        index in the background.
+
+        Input:
+        None
+
+        Output:
+        None
+        """
+        current_path = self.show_root or os.path.expanduser("~")
+        folder = ps.QtWidgets.QFileDialog.getExistingDirectory(
+            self, "Select Show Folder", current_path
+        )
+        if not folder:
+            return
+
+        self.show_root = folder
+        self.show_root_label.setText(folder)
+        self.load_shot_list()
+        self.update_shot_index()
+
+    def load_shot_list(self):
+        """
+        Description:
+        Fills the shot list from the index of the show, without touching the
+        show folders.
+
+        Input:
+        None
+
+        Output:
+        None
+        """
+        if not self.show_root:
+            return
+
+        shots = shot_index_lanh.list_shots(
+            self.show_root, self.shot_filter_input.text().strip()
+        )
+
+        items = []
+        for shot in shots:
+            frames = ""
+            if shot["plate_count"]:
+                frames = f"{shot['plate_first']}-{shot['plate_last']}"
+            item = ps.QtWidgets.QTreeWidgetItem(
+                [
+                    shot["shot_name"],
+                    shot_index_lanh.get_setup_state(shot),
+                    shot["plate_name"] or "",
+                    frames,
+                ]
+            )
+            item.setData(0, ps.QtCore.Qt.UserRole, shot["shot_path"])
+            items.append(item)
+
+        # Folders without a comp folder can be new shots, they can be set up too.
+        for folder_path in shot_index_lanh.list_unclassified(
+            self.show_root, self.shot_filter_input.text().strip()
+        ):
+            item = ps.QtWidgets.QTreeWidgetItem(
+                [os.path.basename(folder_path), "unclassified", "", ""]
+            )
+            item.setData(0, ps.QtCore.Qt.UserRole, folder_path)
+            items.append(item)
+
+        self.shot_list.clear()
+        self.shot_list.addTopLevelItems(items)
+
+    def update_shot_index(self):
+        """
+        Description:
+        Rescans the folders of the show that changed on a background worker,
+        and reloads the list when it's done.
+
+        Input:
+        None
+
+        Output:
+        None
+        """
+        if not self.show_root or self.index_job is not None:
+            return
+
+        self.index_job = get_setup_pool().submit(
+            shot_index_lanh.crawl_show, self.show_root
+        )
+        self.rescan_btn.setEnabled(False)
+
+        self.index_timer = ps.QtCore.QTimer(self)
+        self.index_timer.timeout.connect(self.poll_shot_index)
+        self.index_timer.start(200)
+
+    def poll_shot_index(self):
+        """
+        Description:
+        Reloads the shot list once the index update is done.
+
+        Input:
+        None
+
+        Output:
+        None
+        """
+        if not self.index_job.done():
+            return
+
+        self.index_timer.stop()
+        job = self.index_job
+        self.index_job = None
+        self.rescan_btn.setEnabled(True)
+
+        try:
+            job.result()
+        except Exception as error:
+            setup_log_lanh.LOGGER.warning(f"Could not index {self.show_root}: {error}")
+            return
+
+        self.load_shot_list()
+
+    def select_shot(self):
+        """
+        Description:
+        Sets the shot picked in the list as the shot to set up.
+
+        Input:
+        None
+
+        Output:
+        None
+        """
+        items = self.shot_list.selectedItems()
+        if not items:
+            return
+
+        self.set_shot_path(items[0].data(0, ps.QtCore.Qt.UserRole))
+
+    def set_shot_path(self, shot_path):
+        """
+        Description:
+        Sets the shot to set up, and shows the preview of its plate.
+
+        Input:
+        shot_path(str): The shot folder path.
+
+        Output:
+        None
+        """
+        self.current_show_path = shot_path
+        self.show_path_label.setText(shot_path)
+        self.update_preview()
+
+    def pick_shot_path(self):
+        """
+        Description:
+        Browses to the shot folder and sets it as the shot to set up.
+
+        Input:
+        None
+
+        Output:
+        None
+        """
+        folder = self.browse_show_path()
+        if folder:
+            self.set_shot_path(folder)
+
+    def update_preview(self):
+        """
+        Description:
+        Asks for the plate preview of the shot on a background worker, the
+        cached ones come back right away.
+
+        Input:
+        None
+
+        Output:
+        None
+        """
+        if not self.current_show_path:
+            return
+
+        folder_structure = folder_template_lanh.build_folder_structure(
+            self.current_show_path,
+            self.current_specs.get(
+                "folder_template", folder_template_lanh.DEFAULT_FOLDER_TEMPLATE
+            ),
+        )
+        plate_folder = folder_template_lanh.get_folder_path(
+            folder_structure, "comp", "02_footage", "01_plate"
+        )
+
+        # Only the last shot asked for is shown, older previews still get cached.
+        self.preview_job = thumbnail_lanh.request_preview(
+            plate_folder, self.filmstrip_check.isChecked()
+        )
+        self.preview_label.setText("Loading preview...")
+        self.preview_timer.start(100)
+
+    def poll_preview(self):
+        """
+        Description:
+        Shows the plate preview once it's made.
+
+        Input:
+        None
+
+        Output:
+        None
+        """
+        if self.preview_job is None:
+            self.preview_timer.stop()
+            return
+        if not self.preview_job.done():
+            return
+
+        self.preview_timer.stop()
+        job = self.preview_job
+        self.preview_job = None
+
+        try:
+            preview_path = job.result()
+        except Exception as error:
+            setup_log_lanh.LOGGER.warning(f"Could not make the plate preview: {error}")
+            preview_path = None
+
+        if preview_path is None:
+            self.preview_label.setText("No preview")
+            return
+
+        pixmap = ps.QtGui.QPixmap(preview_path)
+        if pixmap.width() > self.preview_label.width():
+            pixmap = pixmap.scaledToWidth(
+                self.preview_label.width(), ps.QtCore.Qt.SmoothTransformation
+            )
+        self.preview_label.setPixmap(pixmap)
+
+    # Come back here to manually set up the list of options.
+    def create_specs_editor(self, parent_layout):
+        group = ps.QtWidgets.QGroupBox("Show Specifications")
+        form_layout = ps.QtWidgets.QFormLayout(group)
+
+        # Create input widgets for each spec
+        self.spec_widgets = {}
+
+        # Grab the available list.
+        color_spaces, aspect_ratios, viewer_color = self.get_options()
+
+        # Get color spaces
+        # color_spaces = nuke.getOcioColorSpaces()
+
+        # Aspect Ratio
+        self.spec_widgets["aspect_ratio"] = ps.QtWidgets.QComboBox()
+        self.spec_widgets["aspect_ratio"].addItems(aspect_ratios)
+        form_layout.addRow("Aspect Ratio:", self.spec_widgets["aspect_ratio"])
+
+        # Color Space
+        self.spec_widgets["viewer"] = ps.QtWidgets.QComboBox()
+        self.spec_widgets["viewer"].addItems(viewer_color)
+        form_layout.addRow("Color Space:", self.spec_widgets["viewer"])
+
+        # Screen Color
+        self.spec_widgets["screen_color"] = ps.QtWidgets.QComboBox()
+        self.spec_widgets["screen_color"].addItems(color_spaces)
+        form_layout.addRow("Screen Color:", self.spec_widgets["screen_color"])
+
+        # Workspace Color
+        self.spec_widgets["workspace_color"] = ps.QtWidgets.QComboBox()
+        self.spec_widgets["workspace_color"].addItems(color_spaces)
+        form_layout.addRow("Workspace Color:", self.spec_widgets["workspace_color"])
+
+        # EXR Name
+        self.spec_widgets["exr_name"] = ps.QtWidgets.QLineEdit()
+        form_layout.addRow("EXR Name:", self.spec_widgets["exr_name"])
+
+        # MOV Name
+        self.spec_widgets["mov_name"] = ps.QtWidgets.QLineEdit()
+        form_layout.addRow("MOV Name:", self.spec_widgets["mov_name"])
+
+        # FPS
+        self.spec_widgets["fps"] = ps.QtWidgets.QComboBox()
+        self.spec_widgets["fps"].addItems(
+            ["23.976", "24", "25", "29.97", "30", "50", "59.94", "60"]
+        )
+        self.spec_widgets["fps"].setEditable(True)
+        form_layout.addRow("FPS:", self.spec_widgets["fps"])
+
+        parent_layout.addWidget(group)
+
+    # Come back to this to set up the action buttons. COME HERE TO CONNECT.
+    def create_action_buttons(self, parent_layout):
+        """
+        Description:
+        Creates the Save Show Preset, Start New Script, and close bottons.
+
+        Input:
+        None
+
+        Output:
+        None
+        """
+        # Progress of the setup running in the background.
+        progress_layout = ps.QtWidgets.QHBoxLayout()
+        self.progress_bar = ps.QtWidgets.QProgressBar()
+        self.progress_bar.setRange(0, 100)
+        self.progress_bar.setVisible(False)
+        progress_layout.addWidget(self.progress_bar, 1)
+
+        self.cancel_btn = ps.QtWidgets.QPushButton("Cancel")
+        self.cancel_btn.clicked.connect(self.cancel_setup)
+        self.cancel_btn.setVisible(False)
+        progress_layout.addWidget(self.cancel_btn)
+
+        parent_layout.addLayout(progress_layout)
+
+        button_layout = ps.QtWidgets.QHBoxLayout()
+
+        # Save Show Preset
+        save_btn = ps.QtWidgets.QPushButton("Save Show Preset")
+        save_btn.clicked.connect(self.save_show_preset)
+        save_btn.setStyleSheet(
+            "background-color: #2196F3; color: white; font-weight: bold; padding: 8px;"
+        )
+        button_layout.addWidget(save_btn)
+
+        # Setup New Script, the window closes once the script is saved.
+        self.setup_btn = ps.QtWidgets.QPushButton("Setup New Script")
+        self.setup_btn.clicked.connect(self.start_setup)
+        self.setup_btn.setStyleSheet(
+            "background-color: #4CAF50; color: white; font-weight: bold; padding: 8px;"
+        )
+        button_layout.addWidget(self.setup_btn)
+
+        # Close
+        close_btn = ps.QtWidgets.QPushButton("Close")
+        close_btn.clicked.connect(self.close)
+        close_btn.setStyleSheet(
+            "background-color: #FA003F; color: white; font-weight: bold; padding: 8px;"
+        )
+        button_layout.addWidget(close_btn)
+
+        parent_layout.addLayout(button_layout)
+
+    def browse_show_path(self):
+        """
+        Description:
+        Browses the paths and sets the text of the selected file.
+
+        Input:
+        None
+
+        Output:
+        show_path(str): A path to your comp folder.
+        """
+        current_path = self.show_path_label.text()
+        if current_path == "No path selected":
+            current_path = os.path.expanduser("~")
+        folder = ps.QtWidgets.QFileDialog.getExistingDirectory(
+            self, "Select Folder", current_path
+        )
+        if folder:
+            self.current_show_path = folder
+
+        # print(folder)
+        return folder
+
+    def browse_preset_path(self):
+        """
+        Description:
+        Sets the JSON preset file for the show.
+
+        Input:
+        None
+
+        Output:
+        json_preset(str): .JSON file path.
+        """
+
+        current_path = self.preset_path_label.text()
+        if current_path == "No path selected":
+            current_path = os.path.expanduser("~")
+
+        file_path, _ = ps.QtWidgets.QFileDialog.getOpenFileName(
+            self,
+            "Select Preset JSON File",
+            current_path,
+            "JSON Files (*.json);;All Files (*)",
+        )
+        if file_path:
+            json_preset = self.preset_path_label.setText(file_path)
+            # You might also want to call a function here to load the data from this file
+            # e.g., self.load_preset_from_file(file_path)
+        return json_preset
+
+    def get_json_path(self, name, root):
+        """
+        Description:
+        Get the root directory, and create a json file path.
+
+        Input:
+        name (str): The name of the presets file.
+        root (str):
+
+        Output:
+        json_nuke_path (str): The path of the json file with nuke slashes.
+        """
+        # Sets the json name.
+        json_name = f"{name}.json"
+
+        # This will now create a folder like C:\Users\YourUsername\presets
+        presets_folder = os.path.join(root, "presets")
+
+        # Ensure the directory exists before returning the path
+        os.makedirs(presets_folder, exist_ok=True)
+
+        json_path = os.path.join(presets_folder, json_name)
+
+        json_nuke_path = json_path.replace(os.path.sep, "/")
+
+        setup_log_lanh.LOGGER.debug(f"Preset path: {json_nuke_path}")
+        return json_nuke_path
+
+    def save_show_preset(self):
+        """
+        Description:
+        It saves the selected nodes in the show settings into a json file
+
+        Input:
+        None
+
+        Output:
+        filename(str): Is the path of the saved json file.
+        """
+        json_preset = dict()
+        shot_path = self.browse_show_path()
+        name = "preset"
+        # print(shot_path)
+        # print (name)
+        filename = self.get_json_path(name, shot_path)
+        # print(filename)
+        for key, widget in self.spec_widgets.items():
+            if isinstance(widget, ps.QtWidgets.QLineEdit):
+                json_preset[key] = widget.text()
+            elif isinstance(widget, ps.QtWidgets.QComboBox):
+                json_preset[key] = widget.currentText()
+        # print(json_preset)
+
+        # Keep the folder layout of the loaded preset.
+        json_preset["folder_template"] = self.current_specs.get(
+            "folder_template", folder_template_lanh.DEFAULT_FOLDER_TEMPLATE
+        )
+        if "use_baked_luts" in self.current_specs:
+            json_preset["use_baked_luts"] = self.current_specs["use_baked_luts"]
+
+        # Warn about colorspaces missing from the config, the leads can fix it now.
+        try:
+            colorspace_lanh.check_colorspaces(json_preset)
+        except colorspace_lanh.ColorspaceError as error:
+            ps.QtWidgets.QMessageBox.warning(self, "Colorspace Error", str(error))
+
+        preset_store_lanh.save_preset(filename, json_preset)
+        # print('Succesfully exported to {}'.format(filename))
+
+        return filename
+
+    def load_preset_settings(self):
+        """
+        Description:
+        It loads the presets of a json file into the respective keys.
+
+        Input:
+        None
+
+        Output:
+        self.current_specs (dic): A new updated dictionary with all the current specs.
+        """
+        try:
+            data = preset_store_lanh.load_preset(self.preset_path_label.text())
+        except (OSError, preset_store_lanh.PresetError) as error:
+            ps.QtWidgets.QMessageBox.warning(self, "Preset Error", str(error))
+            return self.current_specs
+
+        self.current_specs = data.copy()
+
+        # print (self.current_specs)
+
+        for key, widget in self.spec_widgets.items():
+            value = self.current_specs.get(key, "")
+            # print(f'This is the value {value}')
+            if isinstance(widget, ps.QtWidgets.QComboBox):
+                index = widget.findText(value)
+                if index >= 0:
+                    widget.setCurrentIndex(index)
+                    # print (f'index {index}')
+                else:
+                    widget.setEditText(value)
+                    # print (f'value: {value}')
+            elif isinstance(widget, ps.QtWidgets.QLineEdit):
+                widget.setText(value)
+
+        # print (self.spec_widgets.items())
+
+        ps.QtWidgets.QMessageBox.information(
+            self, "Preset Loaded", "Preset loaded successfully!"
+        )
+
+        return self.current_specs
+
+    def get_options(self):
+        """
+        Description:
+        Grabs all the available items in the list and adds it to the menu, from
+        the option catalog of the session.
+
+        Input:
+        None
+
+        Ouput:
+        options_vl(list): List of all the available colorspaces in the OCIOColorspace node
+        aspect_ratios(list): List of all the available aspect ratios/
+        viewer_color(list): List of all the available viewer color.
+        """
+
+        # Cached for the session, it only reloads when the OCIO config changes.
+        color_spaces, aspect_ratios, viewer_color = option_catalog_lanh.get_options()
+
+        return color_spaces, aspect_ratios, viewer_color
+
+    def gather_specs(self):
+        """
+        Description:
+        Gathers the shot path, the compositor name and the specs from the UI.
+
+        Input:
+        None
+
+        Output:
+        shot_path(str): The shot folder path.
+        compers_name(str): The name of the compositor.
+        specs (dict): All the values gathered by the UI.
+        """
+
+        # Set the dictionary blank.
+        specs = {}
+
+        # Gets the shot folder path.
+        shot_path = self.show_path_label.text()
+
+        # Get the specs information into the file.
+        for key, widget in self.spec_widgets.items():
+            if isinstance(widget, ps.QtWidgets.QLineEdit):
+                specs[key] = widget.text()
+            elif isinstance(widget, ps.QtWidgets.QComboBox):
+                specs[key] = widget.currentText()
+
+        # Carry the folder layout of the loaded preset.
+        specs["folder_template"] = self.current_specs.get(
+            "folder_template", folder_template_lanh.DEFAULT_FOLDER_TEMPLATE
+        )
+        if "use_baked_luts" in self.current_specs:
+            specs["use_baked_luts"] = self.current_specs["use_baked_luts"]
+
+        compers_name = self.show_name_input.text()
+
+        return shot_path, compers_name, specs
+
+    def transfer_data(self):
+        """
+        Description:
+        Adds the results to a list that exports it to a set up script. It runs
+        every stage on the calling thread, start_setup is the non blocking one.
+
+        Input:
+        None
+
+        Output:
+        specs (dict): All the values gathered by the UI.
+        """
+        shot_path, compers_name, specs = self.gather_specs()
+
+        prepared = prepare_transfer(
+            shot_path, compers_name, specs, show_root=self.show_root
+        )
+        nkfile.finish_setup(prepared)
+
+        return prepared["show_specifications"]
+
+    def start_setup(self):
+        """
+        Description:
+        Starts the setup without freezing nuke. The folder creation, plate
+        indexing and preset resolution run on a background worker, and the
+        graph build and save run back on the main thread when they are done.
+
+        Input:
+        None
+
+        Output:
+        None
+        """
+        if self.setup_job is not None:
+            return
+
+        shot_path, compers_name, specs = self.gather_specs()
+
+        self.cancel_event = threading.Event()
+        self.setup_progress = {"stage": "starting", "fraction": 0.0}
+
+        def progress(stage, fraction):
+            self.setup_progress = {"stage": stage, "fraction": fraction}
+
+        self.setup_job = get_setup_pool().submit(
+            prepare_transfer,
+            shot_path,
+            compers_name,
+            specs,
+            self.cancel_event,
+            progress,
+            self.show_root,
+        )
+
+        self.setup_btn.setEnabled(False)
+        self.progress_bar.setValue(0)
+        self.progress_bar.setVisible(True)
+        self.cancel_btn.setVisible(True)
+
+        # Poll the job from the main thread, the timer runs on the UI thread.
+        self.setup_timer = ps.QtCore.QTimer(self)
+        self.setup_timer.timeout.connect(self.poll_setup)
+        self.setup_timer.start(100)
+
+    def poll_setup(self):
+        """
+        Description:
+        Updates the progress bar, and builds the script on the main thread when
+        the background stages are done.
+
+        Input:
+        None
+
+        Output:
+        None
+        """
+        progress = self.setup_progress
+        self.progress_bar.setValue(int(progress["fraction"] * 100))
+        self.progress_bar.setFormat(f"{progress['stage']} %p%")
+
+        if not self.setup_job.done():
+            return
+
+        self.setup_timer.stop()
+        job = self.setup_job
+        self.setup_job = None
+
+        try:
+            prepared = job.result()
+            if self.cancel_event.is_set():
+                nkfile.cancel_prepared(prepared)
+                raise nkfile.SetupCancelled("Setup was cancelled")
+
+            self.progress_bar.setFormat("graph_build %p%")
+            self.progress_bar.setValue(80)
+            nkfile.finish_setup(prepared)
+        except nkfile.SetupCancelled:
+            self.reset_setup()
+            return
+        except Exception as error:
+            self.reset_setup()
+            ps.QtWidgets.QMessageBox.warning(self, "Setup Failed", str(error))
+            return
+
+        self.progress_bar.setValue(100)
+        self.reset_setup()
+        self.close()
+
+    def cancel_setup(self):
+        """
+        Description:
+        Cancels the running setup, it stops before its next stage.
+
+        Input:
+        None
+
+        Output:
+        None
+        """
+        if self.cancel_event is not None:
+            self.cancel_event.set()
+        self.cancel_btn.setEnabled(False)
+
+    def reset_setup(self):
+        """
+        Description:
+        Hides the progress of a finished setup and enables the setup button.
+
+        Input:
+        None
+
+        Output:
+        None
+        """
+        self.progress_bar.setVisible(False)
+        self.cancel_btn.setVisible(False)
+        self.cancel_btn.setEnabled(True)
+        self.setup_btn.setEnabled(True)
+
+
+# Background workers for the filesystem stages of the setup.
+_SETUP_POOL = None
+
+
+def get_setup_pool():
+    """
+    Description:
+    Gets the worker pool of the panel, created on first use.
+
+    Input:
+    None
+
+    Output:
+    pool(class): A ThreadPoolExecutor for the background setup stages.
+    """
+    global _SETUP_POOL
+    if _SETUP_POOL is None:
+        _SETUP_POOL = futures.ThreadPoolExecutor(max_workers=2)
+
+    return _SETUP_POOL
+
+
+def prepare_transfer(
+    shot_path,
+    compers_name,
+    specs,
+    cancel_event=None,
+    progress=None,
+    show_root=None,
+):
+    """
+    Description:
+    Resolves the shot preset, names the files and runs the filesystem stages of
+    the setup. It doesn't call nuke, so it can run on a background worker.
+
+    Input:
+    shot_path(str): The shot folder path.
+    compers_name(str): The name of the compositor.
+    specs(dict): The values gathered by the UI.
+    cancel_event(object): Optional threading.Event to cancel the setup.
+    progress(function): Optional function called with the stage and fraction done.
+    show_root(str): Optional show folder picked in the shot list, the folder
+    of the show preset above the shot by default.
+
+    Output:
+    prepared(dict): The prepared shot, for nkfile.finish_setup.
+    """
+    # Apply the sequence and shot overrides saved below the show folder.
+    show_root = preset_store_lanh.get_show_root(shot_path, show_root)
+    specs = preset_store_lanh.resolve_preset(shot_path, show_root, base=specs)
+    if progress:
+        progress("presets", 0.1)
+
+    # Set the naming files for the shows and outputs.
+    specs = nkfile.build_shot_specs(shot_path, compers_name, specs)
+
+    return nkfile.prepare_shot(shot_path, specs, cancel_event, progress)
+
+
+def show_presets_manager():  #
+    """
+    Description:
+    It checks if the window is created, deletes the window, and draws a new one.
+
+    Input:
+    None
+
+    Output:
+    show_presets_manager.ui(class): Is an object that stores the UI class in it.
+    """
+
+    # Check if the function has the attribute (window), named dialog. if it does, it closes it.
+    if hasattr(show_presets_manager, "ui"):
+        show_presets_manager.ui.close()
+
+    # Stores the class into the show_presets_manager.ui attribute.
+    show_presets_manager.ui = ShowPresetsUI()
+
+    # Shows the window.
+    show_presets_manager.ui.show()
+
+    # print(type(show_presets_manager.ui))
+
+    return show_presets_manager.ui
+
+
+def main():
+    """
+    Description:
+    It runs the UI program.
+
+    Input:
+    None
+
+    Output:
+    None
+    """
+    # Runs the program.
+    show_presets_manager()
+
+
+# Run the UI
+if __name__ == "__main__":
+    show_presets_manager()
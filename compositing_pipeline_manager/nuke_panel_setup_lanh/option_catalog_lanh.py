@@ -0,0 +1,127 @@
+import os
+
+import nuke
+
+# Options shared by every panel of the session, refreshed when the OCIO config changes.
+_CATALOG = {}
+
+
+def get_config_key():
+    """
+    Description:
+    Gets the identity of the OCIO config in use, its path and mtime, so the
+    catalog is only rebuilt when the config changes.
+
+    Input:
+    None
+
+    Output:
+    config_key(tuple): The config name, path and mtime.
+    """
+    config_name = ""
+    config_path = os.environ.get("OCIO", "")
+
+    # Nuke can also set the config on the root node.
+    root = nuke.root()
+    knobs = root.knobs()
+    if "OCIO_config" in knobs:
+        config_name = root["OCIO_config"].value()
+        if config_name == "custom" and "customOCIOConfigPath" in knobs:
+            config_path = root["customOCIOConfigPath"].value()
+
+    try:
+        config_mtime = os.stat(config_path).st_mtime_ns if config_path else 0
+    except OSError:
+        config_mtime = 0
+
+    return config_name, config_path, config_mtime
+
+
+def get_viewer_processes(config):
+    """
+    Description:
+    Gets the viewer processes from the active viewer, or from any viewer node.
+    With no viewer, it builds them from the displays and views of the config.
+
+    Input:
+    config(object): The OCIO config in use.
+
+    Output:
+    viewer_color(list): List of all the available viewer color.
+    from_viewer(bool): True if they came from a viewer node.
+    """
+    viewer = nuke.activeViewer()
+    if viewer is not None:
+        viewer_node = viewer.node()
+    else:
+        viewer_nodes = nuke.allNodes("Viewer")
+        viewer_node = viewer_nodes[0] if viewer_nodes else None
+
+    if viewer_node is not None:
+        return list(viewer_node["viewerProcess"].values()), True
+
+    # No viewer yet, use the "view (display)" names nuke gives its processes.
+    viewer_color = ["None"]
+    for display in config.getDisplays():
+        for view in config.getViews(display):
+            viewer_color.append(f"{view} ({display})")
+
+    return viewer_color, False
+
+
+def get_options():
+    """
+    Description:
+    Gets the colorspaces, aspect ratios and viewer processes for the panel.
+    The colorspaces are cached until the OCIO config path or mtime changes.
+    The formats are read every time, they are in memory and the setup adds
+    plate formats to them.
+
+    Input:
+    None
+
+    Output:
+    color_spaces(list): List of all the available colorspaces in the OCIOColorspace node
+    aspect_ratios(list): List of all the available aspect ratios.
+    viewer_color(list): List of all the available viewer color.
+    """
+    config_key = get_config_key()
+
+    if _CATALOG.get("key") != config_key:
+        # Loaded on first use, the OCIO bindings are slow to import.
+        import PyOpenColorIO as ocio
+
+        # Get the active OCIO config Nuke is using
+        config = ocio.GetCurrentConfig()
+
+        _CATALOG.clear()
+        _CATALOG["key"] = config_key
+        _CATALOG["config"] = config
+        _CATALOG["color_spaces"] = [cs.getName() for cs in config.getColorSpaces()]
+        _CATALOG["from_viewer"] = False
+
+    # Retry the viewer until one exists, the config fallback is only a stand in.
+    if not _CATALOG["from_viewer"]:
+        viewer_color, from_viewer = get_viewer_processes(_CATALOG["config"])
+        _CATALOG["viewer_color"] = viewer_color
+        _CATALOG["from_viewer"] = from_viewer
+
+    return (
+        list(_CATALOG["color_spaces"]),
+        [format_obj.name() for format_obj in nuke.formats()],
+        list(_CATALOG["viewer_color"]),
+    )
+
+
+def invalidate():
+    """
+    Description:
+    Clears the catalog, so the next panel reads the options again.
+
+    Input:
+    None
+
+    Output:
+    None
+    """
+    _CATALOG.clear()
@@ -0,0 +1,361 @@
+import json
+import os
+
+from . import folder_template_lanh, frameset_lanh, publish_lanh
+
+# Where a preset lives inside a show, sequence or shot folder.
+PRESET_FOLDER = "presets"
+PRESET_NAME = "preset.json"
+
+# Known spec keys and the types they can be saved as.
+PRESET_SCHEMA = {
+    "aspect_ratio": (str,),
+    "color_space": (str,),
+    "frame_range": (str,),
+    "viewer": (str,),
+    "screen_color": (str,),
+    "workspace_color": (str,),
+    "exr_name": (str,),
+    "mov_name": (str,),
+    "fps": (str, int, float),
+    "folder_template": (dict,),
+    "use_baked_luts": (bool,),
+    "make_proxies": (bool,),
+}
+
+# Keys a resolved preset needs to set up a script.
+REQUIRED_KEYS = (
+    "aspect_ratio",
+    "viewer",
+    "screen_color",
+    "workspace_color",
+    "exr_name",
+    "mov_name",
+    "fps",
+)
+
+# Parsed preset files, keyed by path, with the mtime and size they were read at.
+_FILE_CACHE = {}
+
+# Resolved presets, keyed by the chain of preset files and their mtimes.
+_RESOLVED_CACHE = {}
+
+
+class PresetError(ValueError):
+    """
+    Description:
+    Raised when a preset has unknown keys, wrong types or missing keys.
+    """
+
+
+def validate_preset(preset, partial=False, source=""):
+    """
+    Description:
+    Checks a preset against the schema of the known spec keys.
+
+    Input:
+    preset(dict): The preset to check.
+    partial(bool): If True, missing keys are allowed, as in a sequence or shot delta.
+    source(str): Optional file name for the error messages.
+
+    Output:
+    None
+    """
+    where = f" in {source}" if source else ""
+
+    if not isinstance(preset, dict):
+        raise PresetError(f"Preset{where} must be a dictionary")
+
+    for key, value in preset.items():
+        if key not in PRESET_SCHEMA:
+            raise PresetError(f"Unknown preset key {key!r}{where}")
+        if not isinstance(value, PRESET_SCHEMA[key]):
+            raise PresetError(f"Preset key {key!r}{where} has the wrong type")
+
+    if "fps" in preset:
+        try:
+            float(preset["fps"])
+        except ValueError:
+            raise PresetError(f"Preset fps {preset['fps']!r}{where} is not a number")
+
+    if "frame_range" in preset:
+        try:
+            frameset_lanh.parse_frames(preset["frame_range"])
+        except frameset_lanh.FrameSetError as error:
+            raise PresetError(f"Preset key 'frame_range'{where}: {error}")
+
+    if "folder_template" in preset:
+        try:
+            folder_template_lanh.validate_template(preset["folder_template"])
+        except ValueError as error:
+            raise PresetError(f"{error}{where}")
+
+    if not partial:
+        missing = [key for key in REQUIRED_KEYS if key not in preset]
+        if missing:
+            raise PresetError(f"Preset{where} is missing {', '.join(missing)}")
+
+
+def get_preset_path(folder_path):
+    """
+    Description:
+    Gets the preset file path of a show, sequence or shot folder.
+
+    Input:
+    folder_path(str): The folder of the level.
+
+    Output:
+    preset_path(str): The path of its preset json.
+    """
+    return os.path.join(folder_path, PRESET_FOLDER, PRESET_NAME)
+
+
+def stat_preset(preset_path, stat_cache=None):
+    """
+    Description:
+    Gets the mtime and size of a preset file, reusing the stat_cache of a batch.
+
+    Input:
+    preset_path(str): The preset json file.
+    stat_cache(dict): Optional stats already taken in the same batch.
+
+    Output:
+    signature(tuple): The mtime and size, or None if the file doesn't exist.
+    """
+    if stat_cache is not None and preset_path in stat_cache:
+        return stat_cache[preset_path]
+
+    try:
+        stat = os.stat(preset_path)
+        signature = (stat.st_mtime_ns, stat.st_size)
+    except FileNotFoundError:
+        signature = None
+
+    if stat_cache is not None:
+        stat_cache[preset_path] = signature
+
+    return signature
+
+
+def load_preset(preset_path, signature=None):
+    """
+    Description:
+    Loads a preset json file, reusing the parsed copy while it hasn't changed.
+
+    Input:
+    preset_path(str): The preset json file.
+    signature(tuple): Optional mtime and size already taken for the file.
+
+    Output:
+    preset(dict): A copy of the preset.
+    """
+    if signature is None:
+        signature = stat_preset(preset_path)
+        if signature is None:
+            raise FileNotFoundError(preset_path)
+
+    cached = _FILE_CACHE.get(preset_path)
+    if cached and cached[0] == signature:
+        return dict(cached[1])
+
+    with open(preset_path, "r") as f:
+        try:
+            preset = json.load(f)
+        except ValueError as error:
+            raise PresetError(f"Preset {preset_path} is not valid json: {error}")
+
+    validate_preset(preset, partial=True, source=preset_path)
+    _FILE_CACHE[preset_path] = (signature, preset)
+
+    return dict(preset)
+
+
+def save_preset(preset_path, preset):
+    """
+    Description:
+    Validates and saves a preset json file. It's written on local scratch and
+    renamed into place, so nobody loads a half written preset.
+
+    Input:
+    preset_path(str): The preset json file.
+    preset(dict): The preset to save.
+
+    Output:
+    preset_path(str): The saved file.
+    """
+    validate_preset(preset, partial=True, source=preset_path)
+
+    publish_lanh.write_json(preset_path, preset, indent=4)
+
+    _FILE_CACHE.pop(preset_path, None)
+
+    return preset_path
+
+
+def is_inside(path, folder):
+    """
+    Description:
+    Checks if a path is a folder or below it. Paths on another drive aren't.
+
+    Input:
+    path(str): The absolute path to check.
+    folder(str): The absolute folder.
+
+    Output:
+    inside(bool): True if the path is the folder or inside it.
+    """
+    try:
+        relative = os.path.relpath(path, folder)
+    except ValueError:
+        # Windows paths on different drives have no relative path.
+        return False
+
+    return not relative.startswith(os.pardir)
+
+
+def get_level_folders(shot_path, show_root):
+    """
+    Description:
+    Gets the folders from the show root down to the shot, e.g. the show,
+    sequence and shot folders.
+
+    Input:
+    shot_path(str): The folder of the shot.
+    show_root(str): The folder of the show, a parent of the shot.
+
+    Output:
+    folders(list): The folders, show first and shot last.
+    """
+    show_root = os.path.normpath(os.path.abspath(show_root))
+    shot_path = os.path.normpath(os.path.abspath(shot_path))
+
+    if not is_inside(shot_path, show_root):
+        raise PresetError(f"Shot {shot_path} is not inside the show {show_root}")
+    relative = os.path.relpath(shot_path, show_root)
+    if relative == os.curdir:
+        return [show_root]
+
+    folders = [show_root]
+    for name in relative.split(os.sep):
+        folders.append(os.path.join(folders[-1], name))
+
+    return folders
+
+
+def get_show_root(
+    shot_path, show_root=None, depth=folder_template_lanh.DEFAULT_SHOT_DEPTH
+):
+    """
+    Description:
+    Gets the show folder of a shot. It's the given show folder when the shot
+    is inside it, otherwise the highest folder with a preset up to the shot
+    depth above the shot, so the sequence presets of show/sequence/shot
+    layouts are found too, and a stray preset higher up isn't.
+
+    Input:
+    shot_path(str): The folder of the shot.
+    show_root(str): Optional show folder, e.g. the one picked in the panel.
+    depth(int): How many levels above the shot the show can be.
+
+    Output:
+    show_root(str): The show folder, the parent of the shot if no folder
+    above it has a preset.
+    """
+    shot_path = os.path.normpath(os.path.abspath(shot_path))
+
+    if show_root:
+        show_root = os.path.normpath(os.path.abspath(show_root))
+        if is_inside(shot_path, show_root):
+            return show_root
+
+    # Walk up to the shot depth, the last folder with a preset wins.
+    found = None
+    folder = os.path.dirname(shot_path)
+    for _ in range(depth):
+        if os.path.isfile(get_preset_path(folder)):
+            found = folder
+        parent = os.path.dirname(folder)
+        if parent == folder:
+            break
+        folder = parent
+
+    return found or os.path.dirname(shot_path)
+
+
+def resolve_preset(shot_path, show_root, base=None, stat_cache=None):
+    """
+    Description:
+    Resolves the preset of a shot, the show preset overridden by the sequence
+    and shot deltas. The result is cached until one of the files changes.
+
+    Input:
+    shot_path(str): The folder of the shot.
+    show_root(str): The folder of the show.
+    base(dict): Optional preset used instead of the show level file, e.g. the
+    values of the panel. The deltas below the show are still applied.
+    stat_cache(dict): Optional stats shared by a batch of shots.
+
+    Output:
+    preset(dict): The resolved and validated preset.
+    """
+    folders = get_level_folders(shot_path, show_root)
+    if base is not None:
+        folders = folders[1:]
+
+    chain = []
+    for folder in folders:
+        preset_path = get_preset_path(folder)
+        signature = stat_preset(preset_path, stat_cache)
+        if signature is not None:
+            chain.append((preset_path, signature))
+
+    base_key = json.dumps(base, sort_keys=True) if base is not None else None
+    key = (base_key, tuple(chain))
+    if key in _RESOLVED_CACHE:
+        return dict(_RESOLVED_CACHE[key])
+
+    preset = dict(base) if base is not None else {}
+    for preset_path, signature in chain:
+        preset.update(load_preset(preset_path, signature))
+
+    validate_preset(preset, source=shot_path)
+    _RESOLVED_CACHE[key] = preset
+
+    return dict(preset)
+
+
+def resolve_presets(shot_paths, show_root, base=None):
+    """
+    Description:
+    Resolves the presets of many shots at once. The show and sequence files
+    are stat'ed and parsed once for the whole batch.
+
+    Input:
+    shot_paths(list): The folders of the shots.
+    show_root(str): The folder of the show.
+    base(dict): Optional preset used instead of the show level file.
+
+    Output:
+    presets(dict): The resolved preset of every shot path.
+    """
+    stat_cache = {}
+    presets = {}
+    for shot_path in shot_paths:
+        presets[shot_path] = resolve_preset(shot_path, show_root, base, stat_cache)
+
+    return presets
+
+
+def clear_cache():
+    """
+    Description:
+    Clears the parsed and resolved presets.
+
+    Input:
+    None
+
+    Output:
+    None
+    """
+    _FILE_CACHE.clear()
+    _RESOLVED_CACHE.clear()
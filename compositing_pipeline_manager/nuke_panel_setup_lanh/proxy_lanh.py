@@ -0,0 +1,545 @@
+import argparse
+import multiprocessing
+import os
+import sys
+import time
+from concurrent import futures
+
+from . import exr_probe_lanh, publish_lanh, sequence_index_lanh, setup_log_lanh
+
+try:
+    import numpy
+    import OpenEXR
+    import Imath
+except ImportError:
+    # Proxies are optional, the setup reads the full plate without them.
+    numpy = OpenEXR = Imath = None
+
+# Proxy sizes made of a plate, by name and downscale factor.
+PROXY_SCALES = (("half", 2), ("quarter", 4))
+
+# Proxy the Read node and the root proxy mode use.
+DEFAULT_SCALE = "half"
+
+# Folder of the proxies, inside the plate folder. The plate index only reads
+# the files of the plate folder itself, so they aren't taken as plates.
+PROXY_FOLDER = "proxy"
+
+
+def has_dependencies():
+    """
+    Description:
+    Checks that NumPy and the OpenEXR bindings are installed.
+
+    Input:
+    None
+
+    Output:
+    available(bool): True if proxies can be made.
+    """
+    return numpy is not None
+
+
+def get_scale_factor(scale_name):
+    """
+    Description:
+    Gets the downscale factor of a proxy size.
+
+    Input:
+    scale_name(str): The proxy size, e.g. half.
+
+    Output:
+    factor(int): The downscale factor, e.g. 2.
+    """
+    factors = dict(PROXY_SCALES)
+    if scale_name not in factors:
+        raise ValueError(
+            f"Unknown proxy scale {scale_name!r}, use one of {sorted(factors)}"
+        )
+
+    return factors[scale_name]
+
+
+def get_proxy_scale(scale_name=DEFAULT_SCALE):
+    """
+    Description:
+    Gets the root proxy scale that reads a proxy size.
+
+    Input:
+    scale_name(str): The proxy size, e.g. half.
+
+    Output:
+    proxy_scale(float): The scale of the root proxy mode, e.g. 0.5.
+    """
+    return 1.0 / get_scale_factor(scale_name)
+
+
+def get_proxy_folder(plate_folder, scale_name):
+    """
+    Description:
+    Gets the folder of a proxy size of the plate.
+
+    Input:
+    plate_folder(str): The plate folder.
+    scale_name(str): The proxy size, e.g. half.
+
+    Output:
+    proxy_folder(str): e.g. .../01_plate/proxy/half
+    """
+    return os.path.join(plate_folder, PROXY_FOLDER, scale_name)
+
+
+def get_proxy_path(plate_folder, sequence, scale_name=DEFAULT_SCALE):
+    """
+    Description:
+    Gets the path of a proxy sequence, for the proxy knob of the Read node.
+
+    Input:
+    plate_folder(str): The plate folder.
+    sequence(dict): The plate sequence, as returned by the sequence index.
+    scale_name(str): The proxy size, e.g. half.
+
+    Output:
+    proxy_path(str): The proxy sequence path, with forward slashes.
+    """
+    proxy_path = os.path.join(
+        get_proxy_folder(plate_folder, scale_name), sequence["name"]
+    )
+    return os.path.normpath(proxy_path).replace(os.path.sep, "/")
+
+
+def is_up_to_date(source_path, target_path):
+    """
+    Description:
+    Checks if a proxy frame is newer than its plate frame, so it's kept.
+
+    Input:
+    source_path(str): The plate frame.
+    target_path(str): The proxy frame.
+
+    Output:
+    up_to_date(bool): True if the proxy doesn't need to be made again.
+    """
+    try:
+        return os.stat(target_path).st_mtime >= os.stat(source_path).st_mtime
+    except OSError:
+        return False
+
+
+def resample(pixels, factor, origin=(0, 0)):
+    """
+    Description:
+    Shrinks an image channel by averaging each factor x factor block. The
+    blocks are aligned on multiples of the factor in pixel coordinates, like
+    scale_box, and the edges are repeated to fill the blocks on the borders.
+
+    Input:
+    pixels(array): The channel, a 2D float32 array.
+    factor(int): The downscale factor.
+    origin(tuple): The (x, y) of the first pixel, the data window min.
+
+    Output:
+    pixels(array): The shrunk channel, the size of the scaled data window.
+    """
+    height, width = pixels.shape
+    pad_left = origin[0] % factor
+    pad_top = origin[1] % factor
+    pad_width = -(pad_left + width) % factor
+    pad_height = -(pad_top + height) % factor
+    if pad_left or pad_top or pad_width or pad_height:
+        pixels = numpy.pad(
+            pixels, ((pad_top, pad_height), (pad_left, pad_width)), mode="edge"
+        )
+
+    height, width = pixels.shape
+    blocks = pixels.reshape(height // factor, factor, width // factor, factor)
+
+    return blocks.mean(axis=(1, 3), dtype=numpy.float32)
+
+
+def scale_box(box, factor):
+    """
+    Description:
+    Scales an EXR window by the downscale factor, rounding outwards.
+
+    Input:
+    box(object): An Imath.Box2i window.
+    factor(int): The downscale factor.
+
+    Output:
+    box(object): The scaled Imath.Box2i window.
+    """
+    return Imath.Box2i(
+        Imath.V2i(box.min.x // factor, box.min.y // factor),
+        Imath.V2i(-(-(box.max.x + 1) // factor) - 1, -(-(box.max.y + 1) // factor) - 1),
+    )
+
+
+def read_frame(frame_path):
+    """
+    Description:
+    Reads every channel of an EXR frame as float32 arrays.
+
+    Input:
+    frame_path(str): The EXR frame.
+
+    Output:
+    header(dict): The header of the frame.
+    channels(dict): The 2D float32 array of each channel, by name.
+    """
+    exr_file = OpenEXR.InputFile(frame_path)
+    try:
+        header = exr_file.header()
+        data_window = header["dataWindow"]
+        width = data_window.max.x - data_window.min.x + 1
+        height = data_window.max.y - data_window.min.y + 1
+
+        names = sorted(header["channels"])
+        float_type = Imath.PixelType(Imath.PixelType.FLOAT)
+        buffers = exr_file.channels(names, float_type)
+    finally:
+        exr_file.close()
+
+    channels = {}
+    for name, buffer in zip(names, buffers):
+        channels[name] = numpy.frombuffer(buffer, dtype=numpy.float32).reshape(
+            height, width
+        )
+
+    return header, channels
+
+
+def write_frame(frame_path, header, channels, factor):
+    """
+    Description:
+    Writes a proxy frame next to its target and renames it into place, so an
+    interrupted run never leaves a partial frame that looks up to date.
+
+    Input:
+    frame_path(str): The proxy frame.
+    header(dict): The header of the plate frame.
+    channels(dict): The shrunk float32 arrays of each channel, by name.
+    factor(int): The downscale factor from the plate.
+
+    Output:
+    None
+    """
+    data_window = scale_box(header["dataWindow"], factor)
+    width = data_window.max.x - data_window.min.x + 1
+    height = data_window.max.y - data_window.min.y + 1
+
+    # Same channels and compression as the plate, at the proxy size.
+    proxy_header = OpenEXR.Header(width, height)
+    proxy_header["dataWindow"] = data_window
+    proxy_header["displayWindow"] = scale_box(header["displayWindow"], factor)
+    proxy_header["compression"] = header["compression"]
+    proxy_header["channels"] = header["channels"]
+
+    pixels = {}
+    for name, values in channels.items():
+        if values.shape != (height, width):
+            raise ValueError(
+                f"Proxy channel {name} is {values.shape[1]}x{values.shape[0]}, "
+                f"its data window is {width}x{height}"
+            )
+
+        # Store each channel in its plate type, half plates stay half.
+        pixel_type = header["channels"][name].type
+        if pixel_type == Imath.PixelType(Imath.PixelType.HALF):
+            values = values.astype(numpy.float16)
+        elif pixel_type == Imath.PixelType(Imath.PixelType.UINT):
+            values = values.round().astype(numpy.uint32)
+        pixels[name] = numpy.ascontiguousarray(values).tobytes()
+
+    os.makedirs(os.path.dirname(frame_path), exist_ok=True)
+    hidden_path = publish_lanh.get_hidden_path(frame_path)
+    try:
+        exr_file = OpenEXR.OutputFile(hidden_path, proxy_header)
+        try:
+            exr_file.writePixels(pixels)
+        finally:
+            exr_file.close()
+        os.replace(hidden_path, frame_path)
+    except Exception:
+        publish_lanh.remove_file(hidden_path)
+        raise
+
+
+def make_proxy_frame(source_path, targets):
+    """
+    Description:
+    Makes the proxies of one plate frame. The plate is read once, and each
+    smaller proxy is shrunk from the previous one.
+
+    Input:
+    source_path(str): The plate frame.
+    targets(list): The (proxy frame, factor) pairs to make, smallest factor first.
+
+    Output:
+    None
+    """
+    header, channels = read_frame(source_path)
+    data_window = header["dataWindow"]
+
+    previous_factor = 1
+    for target_path, factor in targets:
+        step = factor // previous_factor
+        origin = (data_window.min.x, data_window.min.y)
+        channels = {
+            name: resample(values, step, origin) for name, values in channels.items()
+        }
+        data_window = scale_box(data_window, step)
+        write_frame(target_path, header, channels, factor)
+        previous_factor = factor
+
+
+def plan_proxy_frames(plate_folder, sequence, scale_names):
+    """
+    Description:
+    Lists the plate frames whose proxies are missing or older than the frame,
+    so an interrupted run picks up where it stopped.
+
+    Input:
+    plate_folder(str): The plate folder.
+    sequence(dict): The plate sequence, as returned by the sequence index.
+    scale_names(list): The proxy sizes to make.
+
+    Output:
+    jobs(list): A (plate frame, targets) pair per frame to make.
+    skipped(int): The number of plate frames whose proxies are up to date.
+    """
+    scales = sorted(
+        (get_scale_factor(scale_name), scale_name) for scale_name in scale_names
+    )
+
+    jobs = []
+    skipped = 0
+    for frame in sequence_index_lanh.get_frames(sequence):
+        source_path = exr_probe_lanh.get_frame_path(plate_folder, sequence, frame)
+        targets = [
+            (
+                exr_probe_lanh.get_frame_path(
+                    get_proxy_folder(plate_folder, scale_name), sequence, frame
+                ),
+                factor,
+            )
+            for factor, scale_name in scales
+        ]
+
+        # Smaller proxies are shrunk from larger ones, so a frame is redone
+        # whole when any of its proxies is stale.
+        if all(is_up_to_date(source_path, target) for target, _ in targets):
+            skipped += 1
+        else:
+            jobs.append((source_path, targets))
+
+    return jobs, skipped
+
+
+def get_python():
+    """
+    Description:
+    Gets the python the worker processes run. Inside nuke the executable is
+    nuke itself, so LANH_PYTHON has to point to a python with NumPy and
+    OpenEXR to use processes there.
+
+    Input:
+    None
+
+    Output:
+    python(str): The python executable, or None if there is none to use.
+    """
+    python = os.environ.get("LANH_PYTHON")
+    if python:
+        return python
+    if os.path.basename(sys.executable).lower().startswith("python"):
+        return sys.executable
+
+    return None
+
+
+def get_workers(workers=None):
+    """
+    Description:
+    Gets the number of proxy workers. The LANH_PROXY_WORKERS environment
+    variable limits them, e.g. when every batch worker makes proxies.
+
+    Input:
+    workers(int): Optional number of workers.
+
+    Output:
+    workers(int): The number of workers, one per core by default.
+    """
+    if workers is None:
+        workers = int(os.environ.get("LANH_PROXY_WORKERS", 0)) or os.cpu_count() or 1
+
+    return max(1, workers)
+
+
+def create_pool(workers):
+    """
+    Description:
+    Creates the pool the proxy frames are made on. Resampling is CPU bound, so
+    it's a pool of fresh processes, or of threads when there is no python to
+    start them with.
+
+    Input:
+    workers(int): The number of workers.
+
+    Output:
+    pool(object): The executor.
+    """
+    python = get_python()
+    if python is None:
+        setup_log_lanh.LOGGER.debug("No python for proxy processes, using threads")
+        return futures.ThreadPoolExecutor(max_workers=workers)
+
+    # Spawn fresh processes, a forked nuke session is not safe to reuse.
+    context = multiprocessing.get_context("spawn")
+    context.set_executable(python)
+
+    return futures.ProcessPoolExecutor(max_workers=workers, mp_context=context)
+
+
+def generate_proxies(
+    plate_folder, sequence, scale_names=None, workers=None, cancel_event=None
+):
+    """
+    Description:
+    Makes the proxy sequences of a plate across a pool of worker processes.
+    Frames whose proxies are up to date are skipped.
+
+    Input:
+    plate_folder(str): The plate folder.
+    sequence(dict): The plate sequence, as returned by the sequence index.
+    scale_names(list): The proxy sizes to make, all of PROXY_SCALES by default.
+    workers(int): Number of worker processes, one per core by default.
+    cancel_event(object): Optional threading.Event, the frames not started yet
+    are dropped when it's set.
+
+    Output:
+    stats(dict): The plate frames whose proxies were written or were up to
+    date, and the seconds taken.
+    """
+    if scale_names is None:
+        scale_names = [scale_name for scale_name, _ in PROXY_SCALES]
+
+    start = time.perf_counter()
+    jobs, skipped = plan_proxy_frames(plate_folder, sequence, scale_names)
+
+    written = 0
+    if jobs:
+        with create_pool(min(get_workers(workers), len(jobs))) as pool:
+            pending = [pool.submit(make_proxy_frame, *job) for job in jobs]
+            for job in futures.as_completed(pending):
+                job.result()
+                written += 1
+                if cancel_event is not None and cancel_event.is_set():
+                    for other in pending:
+                        other.cancel()
+                    break
+
+    stats = {
+        "written": written,
+        "skipped": skipped,
+        "seconds": time.perf_counter() - start,
+    }
+    setup_log_lanh.LOGGER.debug(
+        f"Proxies of {sequence['name']}: {written} written, {skipped} up to date "
+        f"in {stats['seconds']:.2f}s"
+    )
+
+    return stats
+
+
+def make_plate_proxies(plate_folder, sequence, workers=None, cancel_event=None):
+    """
+    Description:
+    Makes the proxies of the plate for the setup. Plates that aren't EXR, or
+    sessions without NumPy and OpenEXR, are read without a proxy.
+
+    Input:
+    plate_folder(str): The plate folder.
+    sequence(dict): The plate sequence, as returned by the sequence index.
+    workers(int): Number of worker processes, one per core by default.
+    cancel_event(object): Optional threading.Event to stop early.
+
+    Output:
+    proxy_path(str): The proxy path for the Read node, or None without proxies.
+    """
+    if not sequence["name"].lower().endswith(".exr"):
+        setup_log_lanh.LOGGER.warning(
+            f"{sequence['name']} isn't an EXR sequence, no proxies are made"
+        )
+        return None
+    if not has_dependencies():
+        setup_log_lanh.LOGGER.warning(
+            "NumPy and OpenEXR are needed to make proxies, the plate is read "
+            "without them"
+        )
+        return None
+
+    generate_proxies(plate_folder, sequence, workers=workers, cancel_event=cancel_event)
+
+    return get_proxy_path(plate_folder, sequence, DEFAULT_SCALE)
+
+
+def main(argv=None):
+    """
+    Description:
+    Command line entry point to make or update the plate proxies of shots.
+
+    Input:
+    argv(list): Optional list of arguments, sys.argv by default.
+
+    Output:
+    exit_code(int): 0 if every shot has its proxies, 1 otherwise.
+    """
+    parser = argparse.ArgumentParser(
+        description="Make the half and quarter resolution proxies of shot plates."
+    )
+    parser.add_argument("shots", nargs="+", help="The shot folders.")
+    parser.add_argument(
+        "--scales",
+        nargs="+",
+        choices=[scale_name for scale_name, _ in PROXY_SCALES],
+        default=None,
+        help="The proxy sizes to make, all of them by default.",
+    )
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help="Number of worker processes, one per core by default.",
+    )
+    args = parser.parse_args(argv)
+
+    if not has_dependencies():
+        print("NumPy and OpenEXR are needed to make proxies", file=sys.stderr)
+        return 1
+
+    exit_code = 0
+    for shot_path in args.shots:
+        plate_folder = os.path.join(shot_path, "comp", "02_footage", "01_plate")
+        try:
+            sequence = sequence_index_lanh.get_main_sequence(plate_folder)
+        except FileNotFoundError:
+            sequence = None
+        if sequence is None or not sequence["name"].lower().endswith(".exr"):
+            print(f"[FAIL] {shot_path} No EXR plate in {plate_folder}")
+            exit_code = 1
+            continue
+
+        stats = generate_proxies(
+            plate_folder, sequence, args.scales, workers=args.workers
+        )
+        print(
+            f"[OK  ] {shot_path} {stats['written']} written, {stats['skipped']} up "
+            f"to date ({stats['seconds']:.2f}s)"
+        )
+
+    return exit_code
+
+
+if __name__ == "__main__":
+    sys.exit(main())
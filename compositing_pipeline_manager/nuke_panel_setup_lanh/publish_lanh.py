@@ -0,0 +1,286 @@
+import json
+import os
+import shutil
+import tempfile
+import uuid
+
+from . import setup_log_lanh
+
+
+def get_scratch_dir():
+    """
+    Description:
+    Gets the local folder files are written to before they are published. The
+    LANH_SCRATCH_DIR environment variable can point it to a faster local disk.
+
+    Input:
+    None
+
+    Output:
+    scratch_dir(str): The path of the scratch folder.
+    """
+    scratch_dir = os.environ.get("LANH_SCRATCH_DIR")
+    if not scratch_dir:
+        scratch_dir = os.path.join(tempfile.gettempdir(), "lanh_scratch")
+
+    os.makedirs(scratch_dir, exist_ok=True)
+
+    return scratch_dir
+
+
+def get_hidden_path(target_path):
+    """
+    Description:
+    Gets a unique hidden path next to a file, for a copy that is renamed over
+    it once complete.
+
+    Input:
+    target_path(str): The file to publish.
+
+    Output:
+    hidden_path(str): e.g. /shots/.preset.json.1234.a1b2c3d4.tmp
+    """
+    folder_path, file_name = os.path.split(target_path)
+    return os.path.join(
+        folder_path, f".{file_name}.{os.getpid()}.{uuid.uuid4().hex[:8]}.tmp"
+    )
+
+
+def is_same_device(first_path, second_path):
+    """
+    Description:
+    Checks if two folders are on the same file system, so a file can be
+    renamed from one to the other.
+
+    Input:
+    first_path(str): A folder.
+    second_path(str): Another folder.
+
+    Output:
+    same_device(bool): True if a rename between them works.
+    """
+    return os.stat(first_path).st_dev == os.stat(second_path).st_dev
+
+
+def copy_file(source_path, destination_path):
+    """
+    Description:
+    Copies a file and flushes it to disk, so it's complete before it's renamed.
+
+    Input:
+    source_path(str): The file to copy.
+    destination_path(str): The copy.
+
+    Output:
+    None
+    """
+    with open(source_path, "rb") as source, open(destination_path, "wb") as copy:
+        shutil.copyfileobj(source, copy, 1024 * 1024)
+        copy.flush()
+        os.fsync(copy.fileno())
+
+
+class Publisher(object):
+    def __init__(self, scratch_dir=None):
+        """
+        Description:
+        Stages files on local scratch and publishes them in one go. Every file
+        is first moved next to its target, then they are all renamed into
+        place, so readers never see a partial file.
+
+        Used as a context manager, the files are published when the block
+        ends, and thrown away if it raised.
+
+        Input:
+        scratch_dir(str): Optional local folder, get_scratch_dir() by default.
+
+        Output:
+        None
+        """
+        self.scratch_dir = scratch_dir or get_scratch_dir()
+        self.staged = []
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, error_type, error, traceback):
+        if error_type is None:
+            self.publish()
+        else:
+            self.discard()
+        return False
+
+    def stage(self, target_path):
+        """
+        Description:
+        Reserves a local file to write, that is published to the target.
+
+        Input:
+        target_path(str): Where the file is published.
+
+        Output:
+        local_path(str): The empty local file to write to.
+        """
+        file_name = os.path.basename(target_path)
+        local_path = os.path.join(
+            self.scratch_dir, f"{uuid.uuid4().hex[:8]}_{file_name}"
+        )
+        os.close(os.open(local_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY, 0o666))
+        self.staged.append((local_path, target_path))
+
+        return local_path
+
+    def stage_text(self, target_path, text):
+        """
+        Description:
+        Stages a text file.
+
+        Input:
+        target_path(str): Where the file is published.
+        text(str): The contents of the file.
+
+        Output:
+        local_path(str): The staged local file.
+        """
+        local_path = self.stage(target_path)
+        with open(local_path, "w") as f:
+            f.write(text)
+
+        return local_path
+
+    def stage_json(self, target_path, data, **kwargs):
+        """
+        Description:
+        Stages a json file.
+
+        Input:
+        target_path(str): Where the file is published.
+        data(dict): The data to dump.
+        kwargs(dict): Extra arguments of json.dump, e.g. indent.
+
+        Output:
+        local_path(str): The staged local file.
+        """
+        local_path = self.stage(target_path)
+        with open(local_path, "w") as f:
+            json.dump(data, f, **kwargs)
+
+        return local_path
+
+    def publish(self):
+        """
+        Description:
+        Publishes every staged file. Files on another file system are copied
+        to a hidden file next to their target first, then all of them are
+        renamed into place, each rename is atomic.
+
+        Input:
+        None
+
+        Output:
+        target_paths(list): The published files.
+        """
+        staged = self.staged
+        self.staged = []
+
+        renames = []
+        try:
+            # Bring every file next to its target, the slow part.
+            for local_path, target_path in staged:
+                target_folder = os.path.dirname(target_path)
+                os.makedirs(target_folder, exist_ok=True)
+                if is_same_device(self.scratch_dir, target_folder):
+                    renames.append((local_path, target_path))
+                else:
+                    hidden_path = get_hidden_path(target_path)
+                    copy_file(local_path, hidden_path)
+                    renames.append((hidden_path, target_path))
+
+            # Then swap them in, a quick burst of renames.
+            for source_path, target_path in renames:
+                os.replace(source_path, target_path)
+        except Exception:
+            # Drop the hidden copies that weren't renamed, the locals go below.
+            local_paths = set(local_path for local_path, _ in staged)
+            for source_path, _ in renames:
+                if source_path not in local_paths:
+                    remove_file(source_path)
+            raise
+        finally:
+            for local_path, target_path in staged:
+                remove_file(local_path)
+
+        target_paths = [target_path for _, target_path in staged]
+        for target_path in target_paths:
+            setup_log_lanh.LOGGER.debug(f"Published {target_path}")
+
+        return target_paths
+
+    def discard(self):
+        """
+        Description:
+        Throws away the staged files without publishing them.
+
+        Input:
+        None
+
+        Output:
+        None
+        """
+        for local_path, _ in self.staged:
+            remove_file(local_path)
+        self.staged = []
+
+
+def remove_file(file_path):
+    """
+    Description:
+    Removes a file if it still exists.
+
+    Input:
+    file_path(str): The file to remove.
+
+    Output:
+    None
+    """
+    try:
+        os.remove(file_path)
+    except OSError:
+        pass
+
+
+def write_text(target_path, text):
+    """
+    Description:
+    Writes a text file through local scratch and publishes it atomically.
+
+    Input:
+    target_path(str): The file to write.
+    text(str): The contents of the file.
+
+    Output:
+    target_path(str): The published file.
+    """
+    with Publisher() as publisher:
+        publisher.stage_text(target_path, text)
+
+    return target_path
+
+
+def write_json(target_path, data, **kwargs):
+    """
+    Description:
+    Writes a json file through local scratch and publishes it atomically.
+
+    Input:
+    target_path(str): The file to write.
+    data(dict): The data to dump.
+    kwargs(dict): Extra arguments of json.dump, e.g. indent.
+
+    Output:
+    target_path(str): The published file.
+    """
+    with Publisher() as publisher:
+        publisher.stage_json(target_path, data, **kwargs)
+
+    return target_path
@@ -0,0 +1,436 @@
+import argparse
+import json
+import os
+import re
+import statistics
+import sys
+import time
+from concurrent import futures
+
+from . import folder_template_lanh, frameset_lanh, nk_parser_lanh
+from . import sequence_index_lanh, version_index_lanh
+
+# Frame padding of a nuke file knob, "####" or "%04d".
+PADDING_PATTERN = re.compile(r"#+|%0?\d*d")
+
+# Default frame range of a nuke Root, nuke doesn't save the knobs left at it.
+DEFAULT_FIRST_FRAME = 1
+DEFAULT_LAST_FRAME = 100
+
+# A frame smaller than this fraction of its neighbours is likely truncated.
+TRUNCATED_RATIO = 0.5
+
+# Frames on each side a frame is compared with.
+NEIGHBOURS = 2
+
+
+def read_script_settings(nk_file_path):
+    """
+    Description:
+    Reads the root frame range and the EXR write of a script, line by line. It
+    stops at the first EXR write, so the rest of the graph is never read.
+
+    Input:
+    nk_file_path(str): The script to read.
+
+    Output:
+    settings(dict): The first and last frame, and the file knob of the EXR
+    write, None if the script has no EXR write.
+    """
+    settings = {
+        "first": DEFAULT_FIRST_FRAME,
+        "last": DEFAULT_LAST_FRAME,
+        "render_file": None,
+    }
+
+    wanted = {"first_frame", "last_frame", "file", "file_type", "use_limit"}
+    wanted |= {"first", "last"}
+    for node in nk_parser_lanh.read_nodes(nk_file_path, wanted):
+        knobs = node["knobs"]
+        if node["class"] == "Root":
+            settings["first"] = int(float(knobs.get("first_frame", settings["first"])))
+            settings["last"] = int(float(knobs.get("last_frame", settings["last"])))
+        elif node["class"] == "Write" and is_exr_write(knobs):
+            settings["render_file"] = knobs["file"]
+            if knobs.get("use_limit") == "true":
+                settings["first"] = int(float(knobs.get("first", 1)))
+                settings["last"] = int(float(knobs.get("last", 1)))
+            break
+
+    return settings
+
+
+def is_exr_write(knobs):
+    """
+    Description:
+    Checks if the knobs of a Write node render EXR files.
+
+    Input:
+    knobs(dict): The knobs of the Write, as bare values.
+
+    Output:
+    is_exr(bool): True if it writes EXRs.
+    """
+    if "file" not in knobs:
+        return False
+    if knobs.get("file_type"):
+        return knobs["file_type"] == "exr"
+
+    return knobs["file"].lower().endswith(".exr")
+
+
+def get_latest_script(shot_path):
+    """
+    Description:
+    Gets the latest script of a shot, from its version index. When several
+    compositors have scripts, the one saved last wins.
+
+    Input:
+    shot_path(str): Full path of the shot folder.
+
+    Output:
+    nk_file_path(str): The latest script, or None if the shot has none.
+    """
+    scripts_dir = version_index_lanh.get_scripts_dir(shot_path)
+    latest = None
+    latest_mtime = None
+    for base_name, version in version_index_lanh.get_versions(scripts_dir).items():
+        nk_file_path = os.path.join(
+            scripts_dir, f"{base_name}_{version_index_lanh.format_version(version)}.nk"
+        )
+        try:
+            stat = os.stat(nk_file_path)
+        except OSError:
+            continue
+
+        # Empty files are versions reserved by a setup still running.
+        if stat.st_size and (latest is None or stat.st_mtime > latest_mtime):
+            latest = nk_file_path
+            latest_mtime = stat.st_mtime
+
+    return latest
+
+
+def scan_render_frames(render_file):
+    """
+    Description:
+    Lists the frames of a render with a single scandir pass.
+
+    Input:
+    render_file(str): The file knob of the write, e.g. /renders/name.####.exr.
+
+    Output:
+    sizes(dict): The size in bytes of every frame on disk.
+    """
+    folder_path, file_name = os.path.split(render_file)
+    parts = PADDING_PATTERN.split(file_name)
+    if len(parts) != 2:
+        raise ValueError(f"{render_file} is not a frame sequence")
+    head, tail = parts
+
+    sizes = {}
+    try:
+        entries = os.scandir(folder_path)
+    except FileNotFoundError:
+        return sizes
+
+    with entries:
+        for entry in entries:
+            name = entry.name
+            if not (name.startswith(head) and name.endswith(tail)):
+                continue
+            frame_text = name[len(head) : len(name) - len(tail)]
+            if frame_text.isdigit():
+                sizes[int(frame_text)] = entry.stat().st_size
+
+    return sizes
+
+
+def find_truncated(sizes, ratio=TRUNCATED_RATIO):
+    """
+    Description:
+    Finds the frames that are far smaller than the frames around them.
+
+    Input:
+    sizes(dict): The size of every frame on disk.
+    ratio(float): The fraction of the neighbours median a frame has to reach.
+
+    Output:
+    truncated(list): The frame numbers that are likely truncated.
+    """
+    frames = sorted(frame for frame, size in sizes.items() if size > 0)
+
+    truncated = []
+    for index, frame in enumerate(frames):
+        neighbours = (
+            frames[max(0, index - NEIGHBOURS) : index]
+            + frames[index + 1 : index + 1 + NEIGHBOURS]
+        )
+        if not neighbours:
+            continue
+        median = statistics.median(sizes[neighbour] for neighbour in neighbours)
+        if sizes[frame] < median * ratio:
+            truncated.append(frame)
+
+    return truncated
+
+
+def check_shot(shot_path, ratio=TRUNCATED_RATIO, frames=None):
+    """
+    Description:
+    Checks the EXR render of a shot against the frame range of its latest script.
+
+    Input:
+    shot_path(str): Full path of the shot folder.
+    ratio(float): The fraction of the neighbours median a frame has to reach.
+    frames(FrameSet): Optional frames the render should have, e.g. a render on
+    twos, the frame range of the script by default.
+
+    Output:
+    result(dict): The script, the render, the frame range, the number of
+    expected frames, and the missing, zero byte and truncated frames as
+    [first, last] ranges.
+    """
+    start = time.perf_counter()
+    result = {
+        "shot_path": shot_path,
+        "nuke_file": None,
+        "render_file": None,
+        "first": None,
+        "last": None,
+        "expected": 0,
+        "found": 0,
+        "missing": [],
+        "zero_byte": [],
+        "truncated": [],
+        "complete": False,
+        "error": "",
+        "seconds": 0.0,
+    }
+
+    try:
+        nk_file_path = get_latest_script(shot_path)
+        if nk_file_path is None:
+            raise ValueError("No script found")
+        result["nuke_file"] = nk_file_path
+
+        settings = read_script_settings(nk_file_path)
+        if settings["render_file"] is None:
+            raise ValueError("No EXR write in the script")
+        result.update(settings)
+
+        expected = frames
+        if expected is None:
+            expected = frameset_lanh.from_range(settings["first"], settings["last"])
+        result["first"] = expected.first
+        result["last"] = expected.last
+        result["expected"] = len(expected)
+
+        # Only the frames on disk are looked at, not every expected frame.
+        sizes = scan_render_frames(settings["render_file"])
+        in_range = {frame: size for frame, size in sizes.items() if frame in expected}
+
+        result["found"] = len(in_range)
+        result["missing"] = (expected - frameset_lanh.from_frames(sizes)).ranges
+        result["zero_byte"] = sequence_index_lanh.frames_to_ranges(
+            frame for frame, size in in_range.items() if size == 0
+        )
+        result["truncated"] = sequence_index_lanh.frames_to_ranges(
+            find_truncated(in_range, ratio)
+        )
+        result["complete"] = not (
+            result["missing"] or result["zero_byte"] or result["truncated"]
+        )
+    except (OSError, ValueError) as error:
+        result["error"] = str(error)
+
+    result["seconds"] = time.perf_counter() - start
+
+    return result
+
+
+def find_shots(show_root, depth=folder_template_lanh.DEFAULT_SHOT_DEPTH):
+    """
+    Description:
+    Finds the shot folders of a show, the folders with a comp folder, down to
+    a number of levels below the show folder.
+
+    Input:
+    show_root(str): The show folder.
+    depth(int): How many levels down shots can be, 2 for show/sequence/shot.
+
+    Output:
+    shot_paths(list): The sorted shot folders.
+    """
+    shot_paths = []
+    level = [show_root]
+    for _ in range(depth):
+        next_level = []
+        for folder_path in level:
+            try:
+                entries = os.scandir(folder_path)
+            except OSError:
+                continue
+            with entries:
+                for entry in entries:
+                    if entry.name.startswith(".") or not entry.is_dir():
+                        continue
+                    if folder_template_lanh.is_shot_folder(entry.path):
+                        shot_paths.append(entry.path)
+                    else:
+                        next_level.append(entry.path)
+        level = next_level
+
+    return sorted(shot_paths)
+
+
+def run_check(
+    shot_paths, workers=None, ratio=TRUNCATED_RATIO, callback=None, frames=None
+):
+    """
+    Description:
+    Checks the renders of many shots in parallel. The check is bound by the
+    file system, so it runs on threads.
+
+    Input:
+    shot_paths(list): The shot folders to check.
+    workers(int): Number of threads, 4 per core by default.
+    ratio(float): The fraction of the neighbours median a frame has to reach.
+    callback(function): Optional function called with each result as it finishes.
+    frames(FrameSet): Optional frames every render should have, see check_shot.
+
+    Output:
+    report(dict): The results sorted by shot, and the totals.
+    """
+    if workers is None:
+        workers = min(32, (os.cpu_count() or 1) * 4)
+
+    start = time.perf_counter()
+    results = []
+    with futures.ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        jobs = [
+            pool.submit(check_shot, shot_path, ratio, frames)
+            for shot_path in shot_paths
+        ]
+        for job in futures.as_completed(jobs):
+            result = job.result()
+            results.append(result)
+            if callback:
+                callback(result)
+
+    results.sort(key=lambda result: result["shot_path"])
+    report = {
+        "results": results,
+        "total": len(results),
+        "complete": sum(1 for result in results if result["complete"]),
+        "incomplete": sum(
+            1 for result in results if not result["complete"] and not result["error"]
+        ),
+        "failed": sum(1 for result in results if result["error"]),
+        "workers": workers,
+        "seconds": time.perf_counter() - start,
+    }
+
+    return report
+
+
+def print_result(result):
+    """
+    Description:
+    Prints a line for a checked shot, with its problem frames.
+
+    Input:
+    result(dict): A result returned by check_shot.
+
+    Output:
+    None
+    """
+    if result["error"]:
+        print(f"[FAIL] {result['shot_path']} {result['error']}")
+        return
+
+    state = "OK  " if result["complete"] else "MISS"
+    line = (
+        f"[{state}] {result['shot_path']} {result['found']}/"
+        f"{result['expected']} frames"
+    )
+    for key in ("missing", "zero_byte", "truncated"):
+        if result[key]:
+            line = f"{line} {key}: {sequence_index_lanh.format_ranges(result[key])}"
+    print(line)
+
+
+def main(argv=None):
+    """
+    Description:
+    Command line entry point of the render check.
+
+    Input:
+    argv(list): Optional list of arguments, sys.argv by default.
+
+    Output:
+    exit_code(int): 0 if every render is complete, 1 otherwise.
+    """
+    parser = argparse.ArgumentParser(
+        description="Check the EXR renders of a show for missing and broken frames."
+    )
+    parser.add_argument("paths", nargs="+", help="Show folders or shot folders.")
+    parser.add_argument(
+        "--depth",
+        type=int,
+        default=folder_template_lanh.DEFAULT_SHOT_DEPTH,
+        help="How many levels below a show folder shots can be.",
+    )
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument(
+        "--ratio",
+        type=float,
+        default=TRUNCATED_RATIO,
+        help="Frames smaller than this fraction of their neighbours are truncated.",
+    )
+    parser.add_argument(
+        "--frames",
+        help="Frames every render should have instead of the script range, "
+        "in nuke syntax, e.g. 1001-1100x2 for a render on twos.",
+    )
+    parser.add_argument(
+        "--all", action="store_true", help="Also list the complete shots."
+    )
+    parser.add_argument("--json", action="store_true", help="Print the report as json.")
+    args = parser.parse_args(argv)
+
+    shot_paths = []
+    for path in args.paths:
+        if folder_template_lanh.is_shot_folder(path):
+            shot_paths.append(path)
+        else:
+            shot_paths += find_shots(path, args.depth)
+
+    frames = None
+    if args.frames:
+        try:
+            frames = frameset_lanh.parse_frames(args.frames)
+        except frameset_lanh.FrameSetError as error:
+            parser.error(str(error))
+
+    report = run_check(
+        shot_paths, workers=args.workers, ratio=args.ratio, frames=frames
+    )
+
+    if args.json:
+        print(json.dumps(report, indent=4))
+    else:
+        for result in report["results"]:
+            if args.all or not result["complete"]:
+                print_result(result)
+        print(
+            f"{report['complete']}/{report['total']} shots complete, "
+            f"{report['incomplete']} incomplete, {report['failed']} failed, "
+            f"checked in {report['seconds']:.1f}s"
+        )
+
+    return 0 if report["complete"] == report["total"] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,533 @@
+import argparse
+import json
+import os
+import subprocess
+import sys
+import time
+from concurrent import futures
+
+from . import footage_lanh, nk_parser_lanh, publish_lanh, render_check_lanh
+from . import setup_log_lanh
+
+# Version of the job description, bumped when its keys change.
+JOB_VERSION = 1
+
+# Frames rendered by one EXR chunk.
+DEFAULT_CHUNK_SIZE = 10
+
+# Extra attempts of a failed chunk before it's reported as failed.
+DEFAULT_RETRIES = 2
+
+# Chunks rendered at once. Every chunk is a full nuke render with its own
+# threads and licence, so only a few run side by side.
+DEFAULT_WORKERS = 2
+
+# Lines of the nuke output kept in the result of a failed chunk.
+OUTPUT_LINES = 20
+
+
+class RenderJobError(ValueError):
+    """
+    Description:
+    Raised when a script can't be turned into a render job, e.g. it has no
+    EXR write.
+    """
+
+
+def get_write_kind(knobs):
+    """
+    Description:
+    Tells what a Write node renders, from its file type or file extension.
+
+    Input:
+    knobs(dict): The knobs of the Write, as bare values.
+
+    Output:
+    kind(str): "exr", "mov", or None for any other output.
+    """
+    if render_check_lanh.is_exr_write(knobs):
+        return "exr"
+
+    file_type = knobs.get("file_type")
+    extension = os.path.splitext(knobs.get("file", ""))[1].lower()
+    if file_type == "mov" or (
+        not file_type and extension in footage_lanh.MOVIE_EXTENSIONS
+    ):
+        return "mov"
+
+    return None
+
+
+def read_writes(nk_file_path):
+    """
+    Description:
+    Reads the root frame range and the first enabled EXR and MOV writes of a
+    script, the two writes the setup creates. Writes inside groups and the
+    writes artists add later are left out.
+
+    Input:
+    nk_file_path(str): The script to read.
+
+    Output:
+    writes(dict): The "exr" and "mov" writes, each with its name, file and
+    frame range, a missing write is None.
+    """
+    first = render_check_lanh.DEFAULT_FIRST_FRAME
+    last = render_check_lanh.DEFAULT_LAST_FRAME
+    writes = {"exr": None, "mov": None}
+
+    wanted = {"first_frame", "last_frame", "file", "file_type", "disable"}
+    wanted |= {"use_limit", "first", "last"}
+    for node in nk_parser_lanh.read_nodes(nk_file_path, wanted):
+        knobs = node["knobs"]
+        if node["group"]:
+            continue
+        if node["class"] == "Root":
+            first = int(float(knobs.get("first_frame", first)))
+            last = int(float(knobs.get("last_frame", last)))
+            continue
+        if node["class"] != "Write" or knobs.get("disable") == "true":
+            continue
+
+        kind = get_write_kind(knobs)
+        if kind is None or writes[kind] is not None:
+            continue
+
+        # A write with a frame range limit renders only its own range.
+        write = {"name": node["name"], "file": knobs["file"], "first": None}
+        if knobs.get("use_limit") == "true":
+            write["first"] = int(float(knobs.get("first", 1)))
+            write["last"] = int(float(knobs.get("last", 1)))
+        writes[kind] = write
+
+    for write in writes.values():
+        if write is not None and write["first"] is None:
+            write["first"] = first
+            write["last"] = last
+
+    return writes
+
+
+def split_range(first, last, chunk_size):
+    """
+    Description:
+    Splits a frame range into chunks of consecutive frames.
+
+    Input:
+    first(int): The first frame.
+    last(int): The last frame.
+    chunk_size(int): Frames per chunk, the last chunk can be shorter.
+
+    Output:
+    chunks(list): A (first, last) tuple per chunk.
+    """
+    chunk_size = max(1, chunk_size)
+
+    return [
+        (chunk_first, min(chunk_first + chunk_size - 1, last))
+        for chunk_first in range(first, last + 1, chunk_size)
+    ]
+
+
+def build_render_job(nk_file_path, chunk_size=DEFAULT_CHUNK_SIZE):
+    """
+    Description:
+    Builds the render job of a script. The EXR write is split in chunks that
+    can render in any order, and the MOV write, a single file, renders once
+    after every EXR chunk succeeded.
+
+    Input:
+    nk_file_path(str): The script to render.
+    chunk_size(int): Frames per EXR chunk.
+
+    Output:
+    job(dict): The job description, with a task per chunk and the tasks each
+    task depends on. It only holds json types, so it can be saved and handed
+    to another executor.
+    """
+    nk_file_path = os.path.abspath(nk_file_path)
+    writes = read_writes(nk_file_path)
+    exr_write = writes["exr"]
+    if exr_write is None:
+        raise RenderJobError(f"{nk_file_path} has no enabled EXR write to render")
+
+    tasks = []
+    for first, last in split_range(exr_write["first"], exr_write["last"], chunk_size):
+        tasks.append(
+            {
+                "id": f"exr.{first}-{last}",
+                "kind": "exr",
+                "write": exr_write["name"],
+                "first": first,
+                "last": last,
+                "depends_on": [],
+            }
+        )
+
+    mov_write = writes["mov"]
+    if mov_write is not None:
+        tasks.append(
+            {
+                "id": "mov",
+                "kind": "mov",
+                "write": mov_write["name"],
+                "first": mov_write["first"],
+                "last": mov_write["last"],
+                "depends_on": [task["id"] for task in tasks],
+            }
+        )
+
+    return {
+        "version": JOB_VERSION,
+        "script": nk_file_path,
+        "chunk_size": chunk_size,
+        "created": time.time(),
+        "outputs": {
+            kind: write["file"] for kind, write in writes.items() if write is not None
+        },
+        "tasks": tasks,
+    }
+
+
+def save_job(job_path, job):
+    """
+    Description:
+    Saves a job description, through local scratch like every other save.
+
+    Input:
+    job_path(str): The json file to write.
+    job(dict): The job description.
+
+    Output:
+    job_path(str): The saved file.
+    """
+    return publish_lanh.write_json(job_path, job, indent=4)
+
+
+def load_job(job_path):
+    """
+    Description:
+    Loads a saved job description.
+
+    Input:
+    job_path(str): The json file to read.
+
+    Output:
+    job(dict): The job description.
+    """
+    with open(job_path, "r") as f:
+        job = json.load(f)
+
+    if job.get("version") != JOB_VERSION:
+        raise RenderJobError(
+            f"{job_path} is a version {job.get('version')} job, "
+            f"version {JOB_VERSION} is supported"
+        )
+
+    return job
+
+
+def get_nuke_executable():
+    """
+    Description:
+    Gets the nuke executable the local executor renders with. The LANH_NUKE
+    environment variable points to a nuke outside of the PATH.
+
+    Input:
+    None
+
+    Output:
+    executable(str): The nuke executable.
+    """
+    return os.environ.get("LANH_NUKE") or "nuke"
+
+
+class LocalExecutor(object):
+    def __init__(self, workers=None, retries=DEFAULT_RETRIES, executable=None):
+        """
+        Description:
+        Renders the tasks of a job on this machine. Every task is its own nuke
+        process, a task starts once the tasks it depends on succeeded, and the
+        tasks depending on a failed one are skipped. A farm executor only has
+        to provide the same run method.
+
+        Input:
+        workers(int): Number of nuke processes at once, DEFAULT_WORKERS by
+        default.
+        retries(int): Extra attempts of a failed task.
+        executable(str): Optional nuke executable, get_nuke_executable() by
+        default.
+
+        Output:
+        None
+        """
+        self.workers = max(1, workers or DEFAULT_WORKERS)
+        self.retries = max(0, retries)
+        self.executable = executable or get_nuke_executable()
+
+    def get_command(self, job, task):
+        """
+        Description:
+        Builds the nuke command line of a task, rendering only its write over
+        its frames, and sharing the cores between the workers.
+
+        Input:
+        job(dict): The job description.
+        task(dict): The task.
+
+        Output:
+        command(list): The command and its arguments.
+        """
+        threads = max(1, (os.cpu_count() or 1) // self.workers)
+
+        return [
+            self.executable,
+            "-x",
+            "-m",
+            str(threads),
+            "-X",
+            task["write"],
+            "-F",
+            f"{task['first']}-{task['last']}",
+            job["script"],
+        ]
+
+    def run_task(self, job, task, cancel_event=None):
+        """
+        Description:
+        Renders a task, again until it succeeds or runs out of retries.
+
+        Input:
+        job(dict): The job description.
+        task(dict): The task.
+        cancel_event(class): Optional threading.Event, no retry once it's set.
+
+        Output:
+        result(dict): The task id, state, attempts with their return code and
+        seconds, the total seconds and the end of the output of a failure.
+        """
+        command = self.get_command(job, task)
+        result = {
+            "id": task["id"],
+            "state": "failed",
+            "attempts": [],
+            "seconds": 0.0,
+            "error": "",
+        }
+
+        for _ in range(self.retries + 1):
+            if cancel_event is not None and cancel_event.is_set():
+                break
+
+            start = time.perf_counter()
+            try:
+                process = subprocess.run(
+                    command,
+                    stdout=subprocess.PIPE,
+                    stderr=subprocess.STDOUT,
+                    universal_newlines=True,
+                    errors="replace",
+                )
+            except OSError as error:
+                # No nuke to start, retrying won't help.
+                result["error"] = f"{type(error).__name__}: {error}"
+                break
+            seconds = time.perf_counter() - start
+
+            result["attempts"].append(
+                {"returncode": process.returncode, "seconds": seconds}
+            )
+            result["seconds"] += seconds
+            if process.returncode == 0:
+                result["state"] = "succeeded"
+                result["error"] = ""
+                break
+            result["error"] = "\n".join(process.stdout.splitlines()[-OUTPUT_LINES:])
+            setup_log_lanh.LOGGER.debug(
+                f"{task['id']} of {job['script']} failed with {process.returncode}"
+            )
+
+        return result
+
+    def run(self, job, callback=None, cancel_event=None):
+        """
+        Description:
+        Renders every task of a job, as many at once as there are workers.
+
+        Input:
+        job(dict): The job description.
+        callback(function): Optional function called with each result as it
+        finishes.
+        cancel_event(class): Optional threading.Event, the tasks not started
+        yet are skipped once it's set.
+
+        Output:
+        report(dict): The per task results in job order, the totals and the
+        seconds it took.
+        """
+        start = time.perf_counter()
+        results = {}
+        waiting = list(job["tasks"])
+        running = {}
+
+        def finish(result):
+            results[result["id"]] = result
+            if callback:
+                callback(result)
+
+        def skip(task):
+            waiting.remove(task)
+            finish(
+                {
+                    "id": task["id"],
+                    "state": "skipped",
+                    "attempts": [],
+                    "seconds": 0.0,
+                    "error": "",
+                }
+            )
+
+        # Threads only wait on the nuke processes, the render happens in them.
+        with futures.ThreadPoolExecutor(max_workers=self.workers) as pool:
+            while waiting or running:
+                cancelled = cancel_event is not None and cancel_event.is_set()
+
+                # Skip the tasks that can't run, start the ones that are ready.
+                for task in list(waiting):
+                    states = [
+                        results[task_id]["state"] if task_id in results else None
+                        for task_id in task["depends_on"]
+                    ]
+                    if cancelled or any(
+                        state not in (None, "succeeded") for state in states
+                    ):
+                        skip(task)
+                    elif None not in states:
+                        waiting.remove(task)
+                        future = pool.submit(self.run_task, job, task, cancel_event)
+                        running[future] = task
+
+                # Tasks still waiting with nothing running depend on unknown ids.
+                if not running:
+                    for task in list(waiting):
+                        skip(task)
+                    continue
+
+                done, _ = futures.wait(running, return_when=futures.FIRST_COMPLETED)
+                for future in done:
+                    running.pop(future)
+                    finish(future.result())
+
+        ordered = [results[task["id"]] for task in job["tasks"]]
+        counts = {
+            state: sum(1 for result in ordered if result["state"] == state)
+            for state in ("succeeded", "failed", "skipped")
+        }
+
+        report = {
+            "script": job["script"],
+            "results": ordered,
+            "total": len(ordered),
+            "workers": self.workers,
+            "seconds": time.perf_counter() - start,
+        }
+        report.update(counts)
+
+        return report
+
+
+def print_result(result):
+    """
+    Description:
+    Prints a single line for a finished task.
+
+    Input:
+    result(dict): A result returned by LocalExecutor.run_task.
+
+    Output:
+    None
+    """
+    state = {"succeeded": "OK  ", "failed": "FAIL", "skipped": "SKIP"}[result["state"]]
+    line = f"[{state}] {result['id']} ({result['seconds']:.2f}s"
+    if len(result["attempts"]) > 1:
+        line += f", {len(result['attempts'])} attempts"
+    line += ")"
+    if result["error"]:
+        line = f"{line}\n{result['error']}"
+    print(line)
+
+
+def main(argv=None):
+    """
+    Description:
+    Command line entry point, builds the render job of a script, saves it and
+    renders it locally.
+
+    Input:
+    argv(list): Optional list of arguments, sys.argv by default.
+
+    Output:
+    exit_code(int): 0 if the job was built, or rendered without failures, 1
+    otherwise.
+    """
+    parser = argparse.ArgumentParser(
+        description="Split the render of a script in chunks and render them locally."
+    )
+    parser.add_argument(
+        "source", help="A script, a shot folder for its latest script, or a saved job."
+    )
+    parser.add_argument(
+        "--chunk-size", type=int, default=DEFAULT_CHUNK_SIZE, help="Frames per chunk."
+    )
+    parser.add_argument("--output", help="Save the job description to this json.")
+    parser.add_argument("--run", action="store_true", help="Render the job locally.")
+    parser.add_argument(
+        "--workers",
+        type=int,
+        default=None,
+        help=f"Chunks rendered at once, {DEFAULT_WORKERS} by default.",
+    )
+    parser.add_argument("--retries", type=int, default=DEFAULT_RETRIES)
+    parser.add_argument(
+        "--nuke", help="The nuke executable, LANH_NUKE or nuke by default."
+    )
+    parser.add_argument("--json", action="store_true", help="Print json.")
+    args = parser.parse_args(argv)
+
+    # Get the job from a saved description, a script or a shot.
+    if args.source.lower().endswith(".json"):
+        job = load_job(args.source)
+    else:
+        nk_file_path = args.source
+        if os.path.isdir(args.source):
+            nk_file_path = render_check_lanh.get_latest_script(args.source)
+            if nk_file_path is None:
+                parser.error(f"{args.source} has no script")
+        job = build_render_job(nk_file_path, args.chunk_size)
+
+    if args.output:
+        save_job(args.output, job)
+
+    if not args.run:
+        if args.json or not args.output:
+            print(json.dumps(job, indent=4))
+        return 0
+
+    executor = LocalExecutor(args.workers, args.retries, args.nuke)
+    callback = None if args.json else print_result
+    report = executor.run(job, callback=callback)
+
+    if args.json:
+        print(json.dumps(report, indent=4))
+    else:
+        print(
+            f"{report['succeeded']}/{report['total']} tasks rendered, "
+            f"{report['failed']} failed, {report['skipped']} skipped in "
+            f"{report['seconds']:.1f}s with {report['workers']} workers"
+        )
+
+    return 0 if report["failed"] == 0 and report["skipped"] == 0 else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,566 @@
+import argparse
+import hashlib
+import json
+import multiprocessing
+import os
+import sqlite3
+import sys
+import time
+from concurrent import futures
+
+from . import cache_lanh, folder_template_lanh, nk_parser_lanh, proxy_lanh
+from . import render_check_lanh, setup_log_lanh, version_index_lanh
+
+# Tables of the index. Scripts keep the mtime and size they were parsed at,
+# files hold every file knob of every script.
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS scripts (
+    path TEXT PRIMARY KEY,
+    shot_path TEXT,
+    base_name TEXT,
+    version INTEGER,
+    mtime INTEGER,
+    size INTEGER,
+    first_frame TEXT,
+    last_frame TEXT,
+    fps TEXT,
+    format TEXT,
+    scanned_at REAL
+);
+CREATE INDEX IF NOT EXISTS scripts_shot ON scripts (shot_path, base_name, version);
+CREATE TABLE IF NOT EXISTS files (
+    script_path TEXT,
+    node_class TEXT,
+    node_name TEXT,
+    group_path TEXT,
+    knob TEXT,
+    path TEXT,
+    sequence_path TEXT,
+    role TEXT,
+    disabled INTEGER
+);
+CREATE INDEX IF NOT EXISTS files_sequence ON files (sequence_path, role);
+CREATE INDEX IF NOT EXISTS files_script ON files (script_path);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+# Columns of a script and of a file knob, in the order of their table.
+SCRIPT_COLUMNS = (
+    "path",
+    "shot_path",
+    "base_name",
+    "version",
+    "mtime",
+    "size",
+    "first_frame",
+    "last_frame",
+    "fps",
+    "format",
+    "scanned_at",
+)
+FILE_COLUMNS = (
+    "script_path",
+    "node_class",
+    "node_name",
+    "group_path",
+    "knob",
+    "path",
+    "sequence_path",
+    "role",
+    "disabled",
+)
+
+# Below this many changed scripts, starting processes costs more than parsing.
+PROCESS_THRESHOLD = 64
+
+# The scripts that are the highest version of their name in their shot.
+LATEST_SCRIPTS = """
+SELECT path FROM scripts AS latest WHERE version = (
+    SELECT MAX(version) FROM scripts
+    WHERE shot_path = latest.shot_path AND base_name = latest.base_name
+)
+"""
+
+
+def get_index_path(show_root):
+    """
+    Description:
+    Gets the sqlite file of the script index of a show, in the local cache.
+
+    Input:
+    show_root(str): The show folder.
+
+    Output:
+    index_path(str): The path of the sqlite file.
+    """
+    show_key = hashlib.sha1(os.path.abspath(show_root).encode("utf-8")).hexdigest()
+    return os.path.join(cache_lanh.get_cache_dir("script_index"), f"{show_key}.sqlite")
+
+
+def connect(show_root):
+    """
+    Description:
+    Opens the script index of a show, and creates its tables the first time.
+
+    Input:
+    show_root(str): The show folder.
+
+    Output:
+    connection(class): The sqlite3 connection.
+    """
+    connection = sqlite3.connect(get_index_path(show_root))
+    connection.row_factory = sqlite3.Row
+    connection.executescript(SCHEMA)
+
+    return connection
+
+
+def list_shot_scripts(shot_path):
+    """
+    Description:
+    Lists every script of a shot with its mtime and size, from one listing of
+    its scripts folder.
+
+    Input:
+    shot_path(str): The shot folder.
+
+    Output:
+    scripts(list): A (path, mtime, size) tuple per script, empty files are
+    versions still being set up and are left out.
+    """
+    scripts = []
+    try:
+        entries = os.scandir(version_index_lanh.get_scripts_dir(shot_path))
+    except OSError:
+        return scripts
+
+    with entries:
+        for entry in entries:
+            if entry.name.startswith(".") or not entry.name.endswith(".nk"):
+                continue
+            try:
+                stat = entry.stat()
+            except OSError:
+                continue
+            if stat.st_size and entry.is_file():
+                scripts.append((entry.path, stat.st_mtime_ns, stat.st_size))
+
+    return scripts
+
+
+def parse_script(nk_file_path):
+    """
+    Description:
+    Parses a script for the index, runs in the worker processes.
+
+    Input:
+    nk_file_path(str): The script to parse.
+
+    Output:
+    summary(dict): The summary of the script, see read_script_summary, or None
+    if it can't be read.
+    """
+    try:
+        return nk_parser_lanh.read_script_summary(nk_file_path)
+    except OSError:
+        return None
+
+
+def create_pool(workers, count):
+    """
+    Description:
+    Creates the pool the changed scripts are parsed on. Parsing is CPU bound,
+    so many scripts go to fresh processes, a few to threads.
+
+    Input:
+    workers(int): The number of workers.
+    count(int): The number of scripts to parse.
+
+    Output:
+    pool(object): The executor.
+    """
+    python = proxy_lanh.get_python()
+    if python is None or count < PROCESS_THRESHOLD:
+        return futures.ThreadPoolExecutor(max_workers=workers)
+
+    # Spawn fresh processes, a forked nuke session is not safe to reuse.
+    context = multiprocessing.get_context("spawn")
+    context.set_executable(python)
+
+    return futures.ProcessPoolExecutor(max_workers=workers, mp_context=context)
+
+
+def get_script_row(shot_path, nk_file_path, mtime, size, summary):
+    """
+    Description:
+    Builds the row of a script from its summary.
+
+    Input:
+    shot_path(str): The shot folder.
+    nk_file_path(str): The script.
+    mtime(int): The mtime of the script in nanoseconds.
+    size(int): The size of the script.
+    summary(dict): The summary of the script.
+
+    Output:
+    row(tuple): A row of the scripts table.
+    """
+    name = os.path.basename(nk_file_path)
+    match = version_index_lanh.VERSION_PATTERN.match(name)
+    if match:
+        base_name, version = match.group("base"), int(match.group("version"))
+    else:
+        base_name, version = os.path.splitext(name)[0], 0
+
+    root = summary["root"]
+    return (
+        nk_file_path,
+        shot_path,
+        base_name,
+        version,
+        mtime,
+        size,
+        root.get("first_frame"),
+        root.get("last_frame"),
+        root.get("fps"),
+        root.get("format"),
+        time.time(),
+    )
+
+
+def crawl_scripts(
+    show_root, depth=folder_template_lanh.DEFAULT_SHOT_DEPTH, workers=None, full=False
+):
+    """
+    Description:
+    Updates the script index of a show. Every scripts folder is listed, and
+    only the scripts whose mtime or size changed are parsed again, so a rescan
+    mostly costs one listing per shot.
+
+    Input:
+    show_root(str): The show folder.
+    depth(int): How many levels below the show the shots are.
+    workers(int): Number of workers, one per core by default.
+    full(bool): True to parse every script again.
+
+    Output:
+    stats(dict): The number of scripts, parsed, unchanged and removed scripts,
+    and the seconds it took.
+    """
+    start = time.perf_counter()
+    show_root = os.path.abspath(show_root)
+    workers = max(1, workers or os.cpu_count() or 1)
+    connection = connect(show_root)
+
+    try:
+        # A different depth changes which folders are shots, parse everything.
+        row = connection.execute(
+            "SELECT value FROM meta WHERE key = 'depth'"
+        ).fetchone()
+        if row is None or int(row[0]) != depth:
+            full = True
+
+        known = {
+            row["path"]: (row["mtime"], row["size"])
+            for row in connection.execute("SELECT path, mtime, size FROM scripts")
+        }
+
+        # List the scripts folders in parallel, the listing is IO bound.
+        shot_paths = render_check_lanh.find_shots(show_root, depth)
+        with futures.ThreadPoolExecutor(max_workers=workers) as pool:
+            listings = pool.map(list_shot_scripts, shot_paths)
+            scripts = {
+                path: (shot_path, mtime, size)
+                for shot_path, listing in zip(shot_paths, listings)
+                for path, mtime, size in listing
+            }
+
+        changed = sorted(
+            path
+            for path, (_, mtime, size) in scripts.items()
+            if full or known.get(path) != (mtime, size)
+        )
+        removed = [path for path in known if path not in scripts]
+
+        # Parse the changed scripts.
+        script_rows = []
+        file_rows = []
+        if changed:
+            with create_pool(min(workers, len(changed)), len(changed)) as pool:
+                summaries = pool.map(parse_script, changed, chunksize=16)
+                for path, summary in zip(changed, summaries):
+                    if summary is None:
+                        continue
+                    shot_path, mtime, size = scripts[path]
+                    script_rows.append(
+                        get_script_row(shot_path, path, mtime, size, summary)
+                    )
+                    file_rows += [
+                        (
+                            path,
+                            item["node_class"],
+                            item["node_name"],
+                            item["group"],
+                            item["knob"],
+                            item["path"],
+                            item["sequence_path"],
+                            item["role"],
+                            int(item["disabled"]),
+                        )
+                        for item in summary["files"]
+                    ]
+
+        # Write everything in one transaction.
+        with connection:
+            connection.execute(
+                "INSERT OR REPLACE INTO meta VALUES ('depth', ?)", (str(depth),)
+            )
+            connection.executemany(
+                "DELETE FROM scripts WHERE path = ?",
+                [(path,) for path in removed],
+            )
+            connection.executemany(
+                "DELETE FROM files WHERE script_path = ?",
+                [(path,) for path in removed + changed],
+            )
+            connection.executemany(
+                f"INSERT OR REPLACE INTO scripts VALUES ({', '.join('?' * len(SCRIPT_COLUMNS))})",
+                script_rows,
+            )
+            connection.executemany(
+                f"INSERT INTO files VALUES ({', '.join('?' * len(FILE_COLUMNS))})",
+                file_rows,
+            )
+    finally:
+        connection.close()
+
+    stats = {
+        "scripts": len(scripts),
+        "parsed": len(changed),
+        "unchanged": len(scripts) - len(changed),
+        "removed": len(removed),
+        "seconds": time.perf_counter() - start,
+    }
+    setup_log_lanh.LOGGER.debug(
+        f"Indexed {stats['scripts']} scripts of {show_root}, {stats['parsed']} "
+        f"parsed in {stats['seconds']:.2f}s"
+    )
+
+    return stats
+
+
+def get_path_filter(path):
+    """
+    Description:
+    Gets the condition matching a path in the files table. A file or sequence
+    matches its sequence path, a folder every file below it.
+
+    Input:
+    path(str): A file, sequence or folder path.
+
+    Output:
+    condition(tuple): The SQL condition and its parameter.
+    """
+    sequence_path = nk_parser_lanh.to_sequence_path(path)
+    if os.path.isdir(path) or not os.path.splitext(sequence_path)[1]:
+        folder = sequence_path.rstrip("/")
+        folder = folder.replace("\\", "\\\\").replace("%", "\\%").replace("_", "\\_")
+        return "sequence_path LIKE ? ESCAPE '\\'", f"{folder}/%"
+
+    return "sequence_path = ?", sequence_path
+
+
+def find_nodes(show_root, path, role, latest_only=False):
+    """
+    Description:
+    Finds the nodes of the indexed scripts reading or writing a path.
+
+    Input:
+    show_root(str): The show folder.
+    path(str): A file, sequence or folder path.
+    role(str): "read" or "write".
+    latest_only(bool): If True, only the latest version of each script.
+
+    Output:
+    nodes(list): A dictionary per file knob, sorted by script.
+    """
+    condition, parameter = get_path_filter(path)
+    query = f"SELECT * FROM files WHERE {condition} AND role = ?"
+    if latest_only:
+        query += f" AND script_path IN ({LATEST_SCRIPTS})"
+
+    connection = connect(os.path.abspath(show_root))
+    try:
+        rows = connection.execute(
+            query + " ORDER BY script_path, node_name", (parameter, role)
+        ).fetchall()
+    finally:
+        connection.close()
+
+    return [dict(row) for row in rows]
+
+
+def find_readers(show_root, path, latest_only=False):
+    """
+    Description:
+    Finds the nodes reading a file, sequence or anything under a folder.
+
+    Input:
+    show_root(str): The show folder.
+    path(str): A file, sequence or folder path.
+    latest_only(bool): If True, only the latest version of each script.
+
+    Output:
+    nodes(list): A dictionary per file knob.
+    """
+    return find_nodes(show_root, path, "read", latest_only)
+
+
+def find_writers(show_root, path, latest_only=False):
+    """
+    Description:
+    Finds the nodes writing a file, sequence or anything under a folder.
+
+    Input:
+    show_root(str): The show folder.
+    path(str): A file, sequence or folder path.
+    latest_only(bool): If True, only the latest version of each script.
+
+    Output:
+    nodes(list): A dictionary per file knob.
+    """
+    return find_nodes(show_root, path, "write", latest_only)
+
+
+def find_write_collisions(show_root, latest_only=True):
+    """
+    Description:
+    Finds the output paths written by more than one script. Versions of the
+    same script write over each other on purpose, so by default only the
+    latest version of each script counts.
+
+    Input:
+    show_root(str): The show folder.
+    latest_only(bool): If False, every version counts.
+
+    Output:
+    collisions(dict): The scripts writing each colliding sequence path.
+    """
+    scope = f"AND script_path IN ({LATEST_SCRIPTS})" if latest_only else ""
+    query = f"""
+    SELECT sequence_path, script_path FROM files
+    WHERE role = 'write' AND NOT disabled {scope}
+    AND sequence_path IN (
+        SELECT sequence_path FROM files
+        WHERE role = 'write' AND NOT disabled {scope}
+        GROUP BY sequence_path HAVING COUNT(DISTINCT script_path) > 1
+    )
+    ORDER BY sequence_path, script_path
+    """
+
+    connection = connect(os.path.abspath(show_root))
+    try:
+        rows = connection.execute(query).fetchall()
+    finally:
+        connection.close()
+
+    collisions = {}
+    for row in rows:
+        script_paths = collisions.setdefault(row["sequence_path"], [])
+        if row["script_path"] not in script_paths:
+            script_paths.append(row["script_path"])
+
+    return collisions
+
+
+def main(argv=None):
+    """
+    Description:
+    Command line entry point, updates the script index of a show and answers
+    which scripts read or write a path, and which outputs collide.
+
+    Input:
+    argv(list): Optional list of arguments, sys.argv by default.
+
+    Output:
+    exit_code(int): 1 if collisions were asked for and found, else 0.
+    """
+    parser = argparse.ArgumentParser(
+        description="Index the file knobs of every script of a show."
+    )
+    parser.add_argument("show_root", help="The show folder.")
+    parser.add_argument(
+        "--depth",
+        type=int,
+        default=folder_template_lanh.DEFAULT_SHOT_DEPTH,
+        help="How many levels below the show shots can be.",
+    )
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument("--full", action="store_true", help="Parse every script again.")
+    parser.add_argument(
+        "--no-update", action="store_true", help="Query the index as it is."
+    )
+    parser.add_argument("--readers", help="List the nodes reading this path.")
+    parser.add_argument("--writers", help="List the nodes writing this path.")
+    parser.add_argument(
+        "--collisions",
+        action="store_true",
+        help="List the outputs written by more than one script.",
+    )
+    parser.add_argument(
+        "--all-versions",
+        action="store_true",
+        help="Query every script version, not only the latest.",
+    )
+    parser.add_argument("--json", action="store_true", help="Print JSON.")
+    args = parser.parse_args(argv)
+
+    result = {}
+    if not args.no_update:
+        result["stats"] = crawl_scripts(
+            args.show_root, args.depth, args.workers, args.full
+        )
+
+    # Queries only look at the latest version of each script by default.
+    if args.readers:
+        result["readers"] = find_readers(
+            args.show_root, args.readers, not args.all_versions
+        )
+    if args.writers:
+        result["writers"] = find_writers(
+            args.show_root, args.writers, not args.all_versions
+        )
+    if args.collisions:
+        result["collisions"] = find_write_collisions(
+            args.show_root, not args.all_versions
+        )
+
+    if args.json:
+        print(json.dumps(result, indent=4))
+    else:
+        for key in ("readers", "writers"):
+            for node in result.get(key, []):
+                print(
+                    f"{node['script_path']}  {node['node_class']} "
+                    f"{node['node_name']}.{node['knob']}  {node['path']}"
+                )
+        for sequence_path, script_paths in result.get("collisions", {}).items():
+            print(f"{sequence_path} written by:")
+            for script_path in script_paths:
+                print(f"    {script_path}")
+        stats = result.get("stats")
+        if stats:
+            print(
+                f"{stats['scripts']} scripts, {stats['parsed']} parsed, "
+                f"{stats['unchanged']} unchanged, {stats['removed']} removed "
+                f"in {stats['seconds']:.2f}s"
+            )
+
+    return 1 if result.get("collisions") else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
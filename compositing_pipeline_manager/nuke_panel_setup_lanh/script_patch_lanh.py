@@ -0,0 +1,472 @@
+import argparse
+import json
+import os
+import sys
+import time
+from concurrent import futures
+
+from . import folder_template_lanh, nk_parser_lanh, nk_writer_lanh
+from . import preset_store_lanh, publish_lanh, render_check_lanh, version_index_lanh
+
+# Nodes the setup creates and the patch can change.
+PATCH_CLASSES = ("Root", "OCIOColorSpace", "Write")
+
+# Knob values nuke doesn't save when they are left at their default.
+DEFAULT_FPS = 24.0
+DEFAULT_COLORSPACE = "scene_linear"
+
+
+def get_patch_rules(old_preset, new_preset):
+    """
+    Description:
+    Compares two presets and lists what the patch changes in the scripts set
+    up with the old one.
+
+    Input:
+    old_preset(dict): The preset the scripts were set up with.
+    new_preset(dict): The preset to apply.
+
+    Output:
+    rules(dict): The old and new fps and format, the colorspace pairs of the
+    OCIOColorSpace nodes, and the file name endings of the Writes. Keys that
+    didn't change are left out.
+    """
+    rules = {}
+
+    if "fps" in old_preset and "fps" in new_preset:
+        if float(old_preset["fps"]) != float(new_preset["fps"]):
+            rules["fps"] = (float(old_preset["fps"]), float(new_preset["fps"]))
+
+    if old_preset.get("aspect_ratio") != new_preset.get("aspect_ratio"):
+        rules["format"] = (old_preset["aspect_ratio"], new_preset["aspect_ratio"])
+
+    # Screen to workspace and back, as the setup creates them.
+    old_pair = (old_preset.get("screen_color"), old_preset.get("workspace_color"))
+    new_pair = (new_preset.get("screen_color"), new_preset.get("workspace_color"))
+    if old_pair != new_pair:
+        rules["colorspaces"] = {
+            old_pair: new_pair,
+            old_pair[::-1]: new_pair[::-1],
+        }
+
+    # The setup names the outputs {script}_{exr_name} and {script}_{mov_name}.
+    writes = []
+    for key in ("exr_name", "mov_name"):
+        if old_preset.get(key) != new_preset.get(key):
+            writes.append((f"_{old_preset[key]}", f"_{new_preset[key]}"))
+    if writes:
+        rules["writes"] = writes
+
+    return rules
+
+
+def get_line_ending(lines):
+    """
+    Description:
+    Gets the line ending used by a node block, so inserted lines match it.
+
+    Input:
+    lines(list): The lines of the block.
+
+    Output:
+    line_ending(str): "\\r\\n" or "\\n".
+    """
+    return "\r\n" if lines and lines[0].endswith("\r\n") else "\n"
+
+
+def patch_block(node_class, lines, rules):
+    """
+    Description:
+    Patches the knobs of a node block that the setup set with the old preset.
+    Lines that don't change are kept as they are.
+
+    Input:
+    node_class(str): The class of the node.
+    lines(list): The lines of the block, from the class line to the closing brace.
+    rules(dict): The changes, as returned by get_patch_rules.
+
+    Output:
+    lines(list): The patched lines.
+    changes(list): A (knob, old value, new value) per change.
+    """
+    knobs = {}
+    for index, line in enumerate(lines):
+        knob = nk_parser_lanh.split_knob(line)
+        if knob is not None:
+            knobs[knob[0]] = (index, knob[1], knob[2])
+
+    line_ending = get_line_ending(lines)
+    updates = {}
+
+    if node_class == "Root":
+        if "fps" in rules:
+            old_fps, new_fps = rules["fps"]
+            value = knobs["fps"][1] if "fps" in knobs else f"{DEFAULT_FPS:g}"
+            if float(nk_parser_lanh.read_value(value)) == old_fps:
+                updates["fps"] = (nk_parser_lanh.read_value(value), f"{new_fps:g}")
+        if "format" in rules and "format" in knobs:
+            old_format, new_format = rules["format"]
+            value = nk_parser_lanh.read_value(knobs["format"][1])
+            if value.split(" ")[-1] == old_format:
+                updates["format"] = (value, nk_writer_lanh.get_format_value(new_format))
+
+    elif node_class == "OCIOColorSpace" and "colorspaces" in rules:
+        pair = tuple(
+            (
+                nk_parser_lanh.read_value(knobs[knob][1])
+                if knob in knobs
+                else DEFAULT_COLORSPACE
+            )
+            for knob in ("in_colorspace", "out_colorspace")
+        )
+        if pair in rules["colorspaces"]:
+            new_pair = rules["colorspaces"][pair]
+            for knob, old_value, new_value in zip(
+                ("in_colorspace", "out_colorspace"), pair, new_pair
+            ):
+                if old_value != new_value:
+                    updates[knob] = (old_value, new_value)
+
+    elif node_class == "Write" and "writes" in rules and "file" in knobs:
+        file_path = nk_parser_lanh.read_value(knobs["file"][1])
+        for old_ending, new_ending in rules["writes"]:
+            if file_path.endswith(old_ending):
+                updates["file"] = (
+                    file_path,
+                    file_path[: -len(old_ending)] + new_ending,
+                )
+                break
+
+    changes = []
+    lines = list(lines)
+    missing = []
+    for knob, (old_value, new_value) in updates.items():
+        new_line = f" {knob} {nk_writer_lanh.quote_value(new_value)}"
+        if knob in knobs:
+            index, _, ending = knobs[knob]
+            lines[index] = new_line + ending
+        else:
+            missing.append(new_line + line_ending)
+        changes.append((knob, old_value, new_value))
+
+    # Knobs nuke left out at their default go before the closing brace.
+    if missing:
+        lines[-1:-1] = missing
+
+    return lines, changes
+
+
+def patch_stream(source, target, rules):
+    """
+    Description:
+    Copies a script line by line and patches the setup nodes on the way. Only
+    the Root, OCIOColorSpace and Write blocks outside groups are held in
+    memory, every other line goes straight through.
+
+    Input:
+    source(file): The script, opened for reading.
+    target(file): The patched copy, opened for writing.
+    rules(dict): The changes, as returned by get_patch_rules.
+
+    Output:
+    changes(list): A dictionary per change, with the node, knob, old and new value.
+    """
+    changes = []
+    group_depth = 0
+    block = None
+    node_class = None
+
+    for line in source:
+        if block is not None:
+            block.append(line)
+            if line.rstrip("\r\n") != "}":
+                continue
+
+            # End of a held block, patch it and write it out.
+            lines, block_changes = patch_block(node_class, block, rules)
+            target.writelines(lines)
+            # The name knob of the Root is the script path.
+            node_name = node_class
+            for block_line in block:
+                knob = nk_parser_lanh.split_knob(block_line)
+                if knob is not None and knob[0] == "name" and node_class != "Root":
+                    node_name = nk_parser_lanh.read_value(knob[1])
+            for knob, old_value, new_value in block_changes:
+                changes.append(
+                    {
+                        "node": node_name,
+                        "knob": knob,
+                        "old": old_value,
+                        "new": new_value,
+                    }
+                )
+            block = None
+            continue
+
+        # A node starts with its class at the start of the line.
+        node_class = nk_parser_lanh.get_node_start(line)
+        if node_class in nk_parser_lanh.GROUP_CLASSES:
+            group_depth += 1
+        elif node_class in PATCH_CLASSES and group_depth == 0:
+            block = [line]
+            continue
+        elif node_class is None and line.strip() == "end_group":
+            group_depth = max(0, group_depth - 1)
+
+        target.write(line)
+
+    # An unclosed block at the end of the file is written as it was.
+    if block is not None:
+        target.writelines(block)
+
+    return changes
+
+
+def patch_script(nk_file_path, rules, dry_run=False):
+    """
+    Description:
+    Patches a script on local scratch and publishes it atomically. Scripts
+    without changes, or saved by someone while they were patched, are left
+    untouched.
+
+    Input:
+    nk_file_path(str): The script to patch.
+    rules(dict): The changes, as returned by get_patch_rules.
+    dry_run(bool): If True, the changes are listed but nothing is written.
+
+    Output:
+    result(dict): The script, its changes, whether it was patched, the error
+    and the seconds taken.
+    """
+    start = time.perf_counter()
+    result = {
+        "nuke_file": nk_file_path,
+        "changes": [],
+        "patched": False,
+        "error": "",
+    }
+
+    # Keep the encoding and line endings of the script, byte for byte.
+    open_args = {"newline": "", "encoding": "utf-8", "errors": "surrogateescape"}
+
+    try:
+        mtime = os.stat(nk_file_path).st_mtime_ns
+        with publish_lanh.Publisher() as publisher:
+            local_path = publisher.stage(nk_file_path)
+            with open(nk_file_path, "r", **open_args) as source, open(
+                local_path, "w", **open_args
+            ) as target:
+                result["changes"] = patch_stream(source, target, rules)
+
+            if dry_run or not result["changes"]:
+                publisher.discard()
+            elif os.stat(nk_file_path).st_mtime_ns != mtime:
+                publisher.discard()
+                raise ValueError("The script was saved while it was patched")
+            else:
+                result["patched"] = True
+    except (OSError, ValueError) as error:
+        result["error"] = str(error)
+        result["patched"] = False
+
+    result["seconds"] = time.perf_counter() - start
+
+    return result
+
+
+def list_scripts(shot_path, all_versions=False):
+    """
+    Description:
+    Lists the scripts of a shot to patch, the latest version of each script
+    name, or every version.
+
+    Input:
+    shot_path(str): Full path of the shot folder.
+    all_versions(bool): If True, older versions are patched too.
+
+    Output:
+    nk_file_paths(list): The sorted scripts, versions still being set up are
+    left out.
+    """
+    scripts_dir = version_index_lanh.get_scripts_dir(shot_path)
+
+    if all_versions:
+        try:
+            names = [
+                name
+                for name in os.listdir(scripts_dir)
+                if version_index_lanh.VERSION_PATTERN.match(name)
+            ]
+        except FileNotFoundError:
+            return []
+        nk_file_paths = [os.path.join(scripts_dir, name) for name in names]
+    else:
+        nk_file_paths = [
+            os.path.join(
+                scripts_dir,
+                f"{base_name}_{version_index_lanh.format_version(version)}.nk",
+            )
+            for base_name, version in version_index_lanh.get_versions(
+                scripts_dir
+            ).items()
+        ]
+
+    # Empty files are versions reserved by a setup still running.
+    return sorted(
+        nk_file_path
+        for nk_file_path in nk_file_paths
+        if os.path.isfile(nk_file_path) and os.path.getsize(nk_file_path)
+    )
+
+
+def run_patch(nk_file_paths, rules, workers=None, dry_run=False, callback=None):
+    """
+    Description:
+    Patches many scripts in parallel. Streaming the scripts is bound by the
+    file system, so it runs on threads.
+
+    Input:
+    nk_file_paths(list): The scripts to patch.
+    rules(dict): The changes, as returned by get_patch_rules.
+    workers(int): Number of threads, 4 per core by default.
+    dry_run(bool): If True, the changes are listed but nothing is written.
+    callback(function): Optional function called with each result as it finishes.
+
+    Output:
+    report(dict): The results sorted by script, and the totals.
+    """
+    if workers is None:
+        workers = min(32, (os.cpu_count() or 1) * 4)
+
+    start = time.perf_counter()
+    results = []
+    with futures.ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+        jobs = [
+            pool.submit(patch_script, nk_file_path, rules, dry_run)
+            for nk_file_path in nk_file_paths
+        ]
+        for job in futures.as_completed(jobs):
+            result = job.result()
+            results.append(result)
+            if callback:
+                callback(result)
+
+    results.sort(key=lambda result: result["nuke_file"])
+    report = {
+        "results": results,
+        "total": len(results),
+        "patched": sum(1 for result in results if result["patched"]),
+        "changed": sum(1 for result in results if result["changes"]),
+        "failed": sum(1 for result in results if result["error"]),
+        "workers": workers,
+        "seconds": time.perf_counter() - start,
+    }
+
+    return report
+
+
+def print_result(result):
+    """
+    Description:
+    Prints the changes of a patched script.
+
+    Input:
+    result(dict): A result returned by patch_script.
+
+    Output:
+    None
+    """
+    if result["error"]:
+        print(f"[FAIL] {result['nuke_file']} {result['error']}")
+        return
+    if not result["changes"]:
+        return
+
+    state = "OK  " if result["patched"] else "DRY "
+    print(f"[{state}] {result['nuke_file']}")
+    for change in result["changes"]:
+        print(
+            f"       {change['node']}.{change['knob']}: {change['old']} -> "
+            f"{change['new']}"
+        )
+
+
+def main(argv=None):
+    """
+    Description:
+    Command line entry point to apply a changed preset to existing scripts.
+
+    Input:
+    argv(list): Optional list of arguments, sys.argv by default.
+
+    Output:
+    exit_code(int): 0 if every script could be patched, 1 otherwise.
+    """
+    parser = argparse.ArgumentParser(
+        description="Apply a changed show preset to the scripts already set up."
+    )
+    parser.add_argument("paths", nargs="+", help="Show folders or shot folders.")
+    parser.add_argument(
+        "--old", required=True, help="The preset json the scripts were set up with."
+    )
+    parser.add_argument("--new", required=True, help="The preset json to apply.")
+    parser.add_argument(
+        "--depth",
+        type=int,
+        default=folder_template_lanh.DEFAULT_SHOT_DEPTH,
+        help="How many levels below a show folder shots can be.",
+    )
+    parser.add_argument("--workers", type=int, default=None)
+    parser.add_argument(
+        "--all-versions",
+        action="store_true",
+        help="Patch every version of the scripts, not only the latest.",
+    )
+    parser.add_argument(
+        "--dry-run", action="store_true", help="List the changes, write nothing."
+    )
+    parser.add_argument("--json", action="store_true", help="Print the report as json.")
+    args = parser.parse_args(argv)
+
+    rules = get_patch_rules(
+        preset_store_lanh.load_preset(args.old),
+        preset_store_lanh.load_preset(args.new),
+    )
+    if not rules:
+        print("The presets set up the same scripts, nothing to patch")
+        return 0
+
+    shot_paths = []
+    for path in args.paths:
+        if folder_template_lanh.is_shot_folder(path):
+            shot_paths.append(path)
+        else:
+            shot_paths += render_check_lanh.find_shots(path, args.depth)
+
+    nk_file_paths = []
+    for shot_path in shot_paths:
+        nk_file_paths += list_scripts(shot_path, args.all_versions)
+
+    callback = None if args.json else print_result
+    report = run_patch(
+        nk_file_paths,
+        rules,
+        workers=args.workers,
+        dry_run=args.dry_run,
+        callback=callback,
+    )
+
+    if args.json:
+        print(json.dumps(report, indent=4))
+    else:
+        print(
+            f"{report['changed']}/{report['total']} scripts to change, "
+            f"{report['patched']} patched, {report['failed']} failed "
+            f"in {report['seconds']:.1f}s"
+        )
+
+    return 0 if report["failed"] == 0 else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,209 @@
+import hashlib
+import json
+import os
+import re
+
+from . import cache_lanh, frameset_lanh
+
+# Matches "name.0001.exr" into the head, the frame number and the extension.
+FRAME_PATTERN = re.compile(r"^(?P<head>.*\D)?(?P<frame>\d+)(?P<tail>\.[^.]+)$")
+
+# Parsed results kept for the life of the session, keyed by folder and mtime.
+_MEMORY_CACHE = {}
+
+
+def frames_to_ranges(frames):
+    """
+    Description:
+    Collapses a list of frame numbers into a compact list of ranges.
+
+    Input:
+    frames(list): Frame numbers, in any order.
+
+    Output:
+    ranges(list): Sorted [first, last] pairs, e.g. [[1, 50], [52, 100]].
+    """
+    return frameset_lanh.from_frames(frames).ranges
+
+
+def format_ranges(ranges):
+    """
+    Description:
+    Formats a list of ranges with the nuke frame range syntax.
+
+    Input:
+    ranges(list): Sorted [first, last] pairs.
+
+    Output:
+    range_text(str): The ranges as text, e.g. "1-50 52-100".
+    """
+    return frameset_lanh.FrameSet(ranges).format()
+
+
+def get_frames(sequence):
+    """
+    Description:
+    Gets the frames of a sequence as a frame set.
+
+    Input:
+    sequence(dict): A sequence, as returned by the sequence index.
+
+    Output:
+    frames(FrameSet): The frames on disk, empty for a single file.
+    """
+    return frameset_lanh.FrameSet(sequence["ranges"])
+
+
+def scan_sequences(folder_path):
+    """
+    Description:
+    Groups the files of a folder into image sequences with a single scandir pass.
+    Files without a frame number are returned as single files.
+
+    Input:
+    folder_path(str): The folder to scan.
+
+    Output:
+    sequences(list): A dictionary per sequence, with the name in nuke "####"
+    notation, the frame ranges, the first and last frame and the frame count.
+    """
+    groups = {}
+    single_files = []
+
+    with os.scandir(folder_path) as entries:
+        for entry in entries:
+            if entry.name.startswith(".") or not entry.is_file():
+                continue
+
+            match = FRAME_PATTERN.match(entry.name)
+            if not match:
+                single_files.append(entry.name)
+                continue
+
+            key = (match.group("head") or "", match.group("tail"))
+            groups.setdefault(key, []).append(match.group("frame"))
+
+    sequences = []
+    for (head, tail), frame_texts in groups.items():
+        # The padding is the shortest frame number, "0001" means four.
+        padding = min(len(text) for text in frame_texts)
+        frames = [int(text) for text in frame_texts]
+        ranges = frames_to_ranges(frames)
+        sequences.append(
+            {
+                "name": f"{head}{'#' * padding}{tail}",
+                "head": head,
+                "tail": tail,
+                "padding": padding,
+                "is_sequence": True,
+                "ranges": ranges,
+                "first": ranges[0][0],
+                "last": ranges[-1][1],
+                "count": len(frames),
+            }
+        )
+
+    for file_name in single_files:
+        sequences.append(
+            {
+                "name": file_name,
+                "head": file_name,
+                "tail": "",
+                "padding": 0,
+                "is_sequence": False,
+                "ranges": [],
+                "first": None,
+                "last": None,
+                "count": 1,
+            }
+        )
+
+    sequences.sort(key=lambda sequence: sequence["name"])
+
+    return sequences
+
+
+def get_index_path(folder_path):
+    """
+    Description:
+    Gets the path of the index file of a folder, in the local cache.
+
+    Input:
+    folder_path(str): The folder that was scanned.
+
+    Output:
+    index_path(str): The json file that stores the scan of the folder.
+    """
+    folder_key = hashlib.sha1(folder_path.encode("utf-8")).hexdigest()
+    return os.path.join(
+        cache_lanh.get_cache_dir("sequence_index"), f"{folder_key}.json"
+    )
+
+
+def index_sequences(folder_path, use_cache=True):
+    """
+    Description:
+    Gets the sequences of a folder, reusing the last scan while the folder
+    mtime hasn't changed, so a repeated setup of the same shot skips the rescan.
+
+    Input:
+    folder_path(str): The folder to index.
+    use_cache(bool): If False, it always rescans the folder.
+
+    Output:
+    sequences(list): The sequences of the folder, as returned by scan_sequences.
+    """
+    folder_path = os.path.abspath(folder_path)
+    mtime = os.stat(folder_path).st_mtime_ns
+
+    if use_cache:
+        cached = _MEMORY_CACHE.get(folder_path)
+        if cached and cached[0] == mtime:
+            return cached[1]
+
+    index_path = get_index_path(folder_path)
+
+    if use_cache:
+        try:
+            with open(index_path, "r") as f:
+                index = json.load(f)
+            if index.get("path") == folder_path and index.get("mtime") == mtime:
+                _MEMORY_CACHE[folder_path] = (mtime, index["sequences"])
+                return index["sequences"]
+        except (OSError, ValueError, KeyError):
+            pass
+
+    sequences = scan_sequences(folder_path)
+    _MEMORY_CACHE[folder_path] = (mtime, sequences)
+
+    # Write next to the final file and rename, so a reader never sees half an index.
+    index = {"path": folder_path, "mtime": mtime, "sequences": sequences}
+    temp_path = f"{index_path}.{os.getpid()}.tmp"
+    try:
+        with open(temp_path, "w") as f:
+            json.dump(index, f)
+        os.replace(temp_path, index_path)
+    except OSError:
+        pass
+
+    return sequences
+
+
+def get_main_sequence(folder_path):
+    """
+    Description:
+    Gets the image sequence with the most frames in a folder.
+
+    Input:
+    folder_path(str): The folder to look into.
+
+    Output:
+    sequence(dict): The sequence, or None if the folder has no sequences.
+    """
+    sequences = [
+        sequence for sequence in index_sequences(folder_path) if sequence["is_sequence"]
+    ]
+    if not sequences:
+        return None
+
+    return max(sequences, key=lambda sequence: sequence["count"])
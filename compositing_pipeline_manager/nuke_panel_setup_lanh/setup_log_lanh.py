@@ -0,0 +1,162 @@
+import datetime
+import getpass
+import json
+import logging
+import os
+import socket
+import time
+
+from . import cache_lanh
+
+# Logger of the tool, verbose mode shows its debug messages.
+LOGGER = logging.getLogger("nuke_show_setup_manager")
+
+
+def set_verbose(verbose=True):
+    """
+    Description:
+    Shows the step by step messages of the setup, e.g. every folder created.
+
+    Input:
+    verbose(bool): True to show the debug messages, False to hide them.
+
+    Output:
+    None
+    """
+    LOGGER.setLevel(logging.DEBUG if verbose else logging.INFO)
+    if verbose and not LOGGER.handlers:
+        handler = logging.StreamHandler()
+        handler.setFormatter(logging.Formatter("%(levelname)s %(message)s"))
+        LOGGER.addHandler(handler)
+
+
+def get_log_path():
+    """
+    Description:
+    Gets the jsonl file the setup records go to. The LANH_SETUP_LOG environment
+    variable can point it to a shared file, to aggregate them across the floor.
+
+    Input:
+    None
+
+    Output:
+    log_path(str): The path of the jsonl file.
+    """
+    log_path = os.environ.get("LANH_SETUP_LOG")
+    if not log_path:
+        log_path = os.path.join(cache_lanh.get_cache_dir("logs"), "setup_log.jsonl")
+
+    return log_path
+
+
+def write_record(record, log_path=None):
+    """
+    Description:
+    Appends a record as one json line. The line goes in a single write so
+    records of parallel setups don't mix.
+
+    Input:
+    record(dict): The record to write.
+    log_path(str): The jsonl file, get_log_path() if None.
+
+    Output:
+    None
+    """
+    if log_path is None:
+        log_path = get_log_path()
+
+    line = (json.dumps(record, sort_keys=True) + "\n").encode("utf-8")
+    try:
+        file_handle = os.open(log_path, os.O_WRONLY | os.O_APPEND | os.O_CREAT, 0o644)
+        try:
+            os.write(file_handle, line)
+        finally:
+            os.close(file_handle)
+    except OSError as error:
+        LOGGER.warning(f"Could not write the setup record to {log_path}: {error}")
+
+
+class SetupTimer(object):
+    def __init__(self, shot_path, nuke_file="", backend="nuke"):
+        """
+        Description:
+        Times the stages of one shot setup, e.g. folder creation, plate scan,
+        graph build and save.
+
+        Input:
+        shot_path(str): The folder of the shot.
+        nuke_file(str): The script being set up.
+        backend(str): The backend building the script.
+
+        Output:
+        None
+        """
+        self.shot_path = shot_path
+        self.nuke_file = nuke_file
+        self.backend = backend
+        self.stages = {}
+        self.start = time.perf_counter()
+        self.last = self.start
+
+    def lap(self, stage):
+        """
+        Description:
+        Adds the time since the last lap to a stage. A stage can be timed in
+        several laps, they add up.
+
+        Input:
+        stage(str): The name of the stage that just ended.
+
+        Output:
+        seconds(float): The time of this lap.
+        """
+        now = time.perf_counter()
+        seconds = now - self.last
+        self.last = now
+        self.stages[stage] = self.stages.get(stage, 0.0) + seconds
+        LOGGER.debug(f"{stage}: {seconds:.3f}s")
+
+        return seconds
+
+    def finish(self, error=None):
+        """
+        Description:
+        Ends the setup and emits one record with the stage times to the log.
+
+        Input:
+        error(Exception): The error that stopped the setup, if any.
+
+        Output:
+        record(dict): The record that was written.
+        """
+        total = time.perf_counter() - self.start
+        record = {
+            "timestamp": datetime.datetime.now().isoformat(timespec="seconds"),
+            "host": socket.gethostname(),
+            "user": getpass.getuser(),
+            "shot_path": self.shot_path,
+            "nuke_file": self.nuke_file,
+            "backend": self.backend,
+            "stages": {
+                stage: round(seconds, 6) for stage, seconds in self.stages.items()
+            },
+            "total": round(total, 6),
+            "success": error is None,
+            "error": f"{type(error).__name__}: {error}" if error else "",
+        }
+
+        write_record(record)
+
+        if error is None:
+            LOGGER.info(f"Set up {self.nuke_file} in {total:.2f}s")
+        else:
+            LOGGER.error(
+                f"Setup of {self.shot_path} failed after {total:.2f}s: {record['error']}"
+            )
+
+        return record
+
+
+# Verbose mode can be turned on for a whole session from the environment.
+if os.environ.get("LANH_SETUP_VERBOSE"):
+    set_verbose(True)
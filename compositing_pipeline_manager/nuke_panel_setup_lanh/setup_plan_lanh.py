@@ -0,0 +1,479 @@
+import argparse
+import hashlib
+import json
+import os
+import sys
+
+from . import footage_lanh, preset_store_lanh, proxy_lanh, publish_lanh
+from . import folder_template_lanh, frameset_lanh, sequence_index_lanh
+from . import setup_log_lanh
+
+# Version of the plan layout, bumped when the graph changes so older plans
+# saved to disk aren't reused.
+PLAN_VERSION = 2
+
+# Spec keys the graph depends on. Everything else of a shot, its paths and
+# frame range, is a parameter of the plan.
+PLAN_KEYS = ("screen_color", "workspace_color", "aspect_ratio", "fps", "viewer")
+
+# Knob values starting with it are parameters, filled in per shot.
+PARAMETER_PREFIX = "$"
+
+# Plans compiled in the session, keyed by the hash of their preset.
+_PLANS = {}
+
+
+def get_plan_key(show_specifications, baked=False):
+    """
+    Description:
+    Gets the key of the plan of a preset, a hash of the spec keys the graph
+    depends on.
+
+    Input:
+    show_specifications(dict): The show specs, or the preset.
+    baked(bool): True if the colorspaces are converted with baked LUTs.
+
+    Output:
+    plan_key(str): The hex digest.
+    """
+    data = {key: show_specifications.get(key) for key in PLAN_KEYS}
+    data["baked"] = bool(baked)
+    data["version"] = PLAN_VERSION
+
+    return hashlib.sha1(json.dumps(data, sort_keys=True).encode("utf-8")).hexdigest()
+
+
+def compile_plan(show_specifications, baked=False):
+    """
+    Description:
+    Compiles the graph of a preset: the root settings and every node with its
+    knobs, position and input. Paths and frame ranges are left as parameters,
+    so the same plan sets up every shot of the show.
+
+    Input:
+    show_specifications(dict): The show specs, or the preset.
+    baked(bool): True to read baked LUTs instead of converting with OCIO.
+
+    Output:
+    plan(dict): The key, the root knobs and the nodes of the plan. It only
+    holds json types, so it can be printed and saved.
+    """
+    screen_color = show_specifications["screen_color"]
+    workspace_color = show_specifications["workspace_color"]
+
+    # Root settings, the proxy mode is only set for shots with proxies.
+    root = [
+        ("name", "$nuke_file"),
+        ("first_frame", "$first_frame"),
+        ("last_frame", "$last_frame"),
+        ("fps", float(show_specifications["fps"])),
+        ("format", "$root_format"),
+        ("proxy_type", "$proxy_type"),
+        ("proxy_scale", "$proxy_scale"),
+    ]
+
+    nodes = []
+
+    def add_node(node_class, name, knobs, xpos, ypos, input_name=None):
+        nodes.append(
+            {
+                "class": node_class,
+                "name": name,
+                "knobs": knobs,
+                "xpos": xpos,
+                "ypos": ypos,
+                "input": input_name,
+            }
+        )
+        return name
+
+    # Backdrops around the input and the two outputs.
+    for label, xpos, ypos in (
+        ("Input", -25, -75),
+        ("MOV", 250, 750),
+        ("EXR", -100, 750),
+    ):
+        add_node(
+            "BackdropNode",
+            f"Backdrop_{label}",
+            [
+                ("label", label),
+                ("note_font_size", 36),
+                ("bdwidth", 200),
+                ("bdheight", 200),
+            ],
+            xpos,
+            ypos,
+        )
+
+    # Read plate.
+    read = add_node(
+        "Read",
+        "Read1",
+        [
+            ("file", "$read_path"),
+            ("first", "$plate_first"),
+            ("last", "$plate_last"),
+            ("origfirst", "$plate_first"),
+            ("origlast", "$plate_last"),
+            ("origset", True),
+            ("raw", True),
+            ("proxy", "$proxy_path"),
+            ("on_error", "$on_error"),
+        ],
+        0,
+        0,
+    )
+
+    # Screen to workspace colorspace and back, from the baked LUTs if any.
+    previous = read
+    for index, (source, destination, direction, ypos) in enumerate(
+        (
+            (screen_color, workspace_color, "input", 100),
+            (workspace_color, screen_color, "output", 600),
+        )
+    ):
+        if baked:
+            node_class = "OCIOFileTransform"
+            knobs = [
+                ("file", f"${direction}_lut"),
+                ("label", f"{source} to {destination}"),
+            ]
+        else:
+            node_class = "OCIOColorSpace"
+            knobs = [("in_colorspace", source), ("out_colorspace", destination)]
+        previous = add_node(
+            node_class, f"{node_class}{index + 1}", knobs, 0, ypos, previous
+        )
+
+    # Remove the alpha from the final renders.
+    remove = add_node("Remove", "Remove1", [("channels", "alpha")], 0, 650, previous)
+    dot = add_node("Dot", "Dot1", [], 34, 750, remove)
+
+    # MOV branch, reformatted to HD.
+    previous = add_node("Dot", "Dot2", [], 384, 750, dot)
+    previous = add_node(
+        "Reformat", "Reformat1", [("format", "HD_1080")], 350, 850, previous
+    )
+    add_node(
+        "Write",
+        "Write1",
+        [("file", "$mov_file"), ("file_type", "mov")],
+        350,
+        900,
+        previous,
+    )
+
+    # EXR branch, at the final resolution.
+    previous = add_node(
+        "Reformat",
+        "Reformat2",
+        [("format", show_specifications["aspect_ratio"])],
+        0,
+        850,
+        dot,
+    )
+    add_node(
+        "Write",
+        "Write2",
+        [("file", "$exr_file"), ("file_type", "exr")],
+        0,
+        900,
+        previous,
+    )
+
+    # Viewer looking at the plate.
+    add_node(
+        "Viewer",
+        "Viewer1",
+        [
+            ("frame_range", "$frame_range"),
+            ("viewerProcess", show_specifications["viewer"]),
+        ],
+        200,
+        0,
+        read,
+    )
+
+    return {
+        "version": PLAN_VERSION,
+        "key": get_plan_key(show_specifications, baked),
+        "root": root,
+        "nodes": nodes,
+    }
+
+
+def get_plan(show_specifications, baked=False):
+    """
+    Description:
+    Gets the plan of a preset, compiled once per session and reused for every
+    shot with the same preset.
+
+    Input:
+    show_specifications(dict): The show specs, or the preset.
+    baked(bool): True if the colorspaces are converted with baked LUTs.
+
+    Output:
+    plan(dict): The plan, see compile_plan. It's shared, don't change it.
+    """
+    plan_key = get_plan_key(show_specifications, baked)
+    plan = _PLANS.get(plan_key)
+    if plan is None:
+        plan = compile_plan(show_specifications, baked)
+        _PLANS[plan_key] = plan
+        setup_log_lanh.LOGGER.debug(f"Compiled setup plan {plan_key[:8]}")
+
+    return plan
+
+
+def get_frame_range(show_specifications, plate_frames):
+    """
+    Description:
+    Gets the frame range of a shot. It's the plate range, unless the preset
+    has a "frame_range", which then sets the range of the root and the viewer.
+    A range outside the plate is left out, and a range that leaves plate
+    frames out of the root is logged.
+
+    Input:
+    show_specifications(dict): The show specs, or the preset.
+    plate_frames(FrameSet): The frames of the plate.
+
+    Output:
+    frames(FrameSet): The frames of the shot, the root goes from its first to
+    its last frame.
+    """
+    range_text = show_specifications.get("frame_range", "").strip()
+    if not range_text:
+        return plate_frames
+
+    frames = frameset_lanh.parse_frames(range_text)
+    if not frames & plate_frames:
+        setup_log_lanh.LOGGER.warning(
+            f"Preset frame range {frames} is outside the plate {plate_frames}, "
+            "using the plate range"
+        )
+        return plate_frames
+
+    missing = frames - plate_frames
+    if missing:
+        setup_log_lanh.LOGGER.warning(
+            f"Preset frame range {frames} has frames the plate hasn't: {missing}"
+        )
+
+    left_out = plate_frames - frames.get_span()
+    if left_out:
+        setup_log_lanh.LOGGER.warning(
+            f"Preset frame range {frames} leaves plate frames {left_out} out of "
+            "the root range"
+        )
+
+    return frames
+
+
+def get_parameters(
+    show_specifications,
+    folder_structure,
+    sequence,
+    root_format,
+    baked_luts=None,
+    proxy_path=None,
+):
+    """
+    Description:
+    Gets the values of the parameters of a plan for one shot.
+
+    Input:
+    show_specifications(dict): The show specs with the exr, mov and nuke file names.
+    folder_structure(dict): Directory of all the folders of the shot.
+    sequence(dict): The plate sequence, as returned by the sequence index.
+    root_format(str): The root format knob value, as the backend writes it.
+    baked_luts(dict): Optional "input" and "output" baked LUTs.
+    proxy_path(str): Optional proxy sequence of the plate, read in proxy mode.
+
+    Output:
+    parameters(dict): The value of every parameter, None leaves its knob out.
+    """
+    plate_folder = folder_template_lanh.get_folder_path(
+        folder_structure, "comp", "02_footage", "01_plate"
+    )
+    exr_path = folder_template_lanh.get_folder_path(
+        folder_structure, "comp", "04_renders", "02_exr"
+    )
+    mov_path = folder_template_lanh.get_folder_path(
+        folder_structure, "comp", "04_renders", "01_mov"
+    )
+    plate_frames = sequence_index_lanh.get_frames(sequence)
+    frames = get_frame_range(show_specifications, plate_frames)
+
+    # Hold the nearest frame over the gaps of the plate.
+    on_error = None
+    if plate_frames.has_gaps():
+        on_error = "nearest frame"
+        setup_log_lanh.LOGGER.warning(
+            f"{sequence['name']} is missing frames {plate_frames.get_gaps()}"
+        )
+
+    baked_luts = baked_luts or {}
+
+    return {
+        "nuke_file": footage_lanh.to_nuke_path(show_specifications["nuke_file"]),
+        "first_frame": frames.first,
+        "last_frame": frames.last,
+        "frame_range": str(frames.get_span()),
+        "plate_first": plate_frames.first,
+        "plate_last": plate_frames.last,
+        "root_format": root_format,
+        "read_path": footage_lanh.to_nuke_path(
+            os.path.join(plate_folder, sequence["name"])
+        ),
+        "proxy_path": proxy_path,
+        "proxy_type": "scale" if proxy_path else None,
+        "proxy_scale": proxy_lanh.get_proxy_scale() if proxy_path else None,
+        "on_error": on_error,
+        "mov_file": footage_lanh.to_nuke_path(
+            os.path.join(mov_path, show_specifications["mov_name"])
+        ),
+        "exr_file": footage_lanh.to_nuke_path(
+            os.path.join(exr_path, show_specifications["exr_name"])
+        ),
+        "input_lut": (
+            footage_lanh.to_nuke_path(baked_luts["input"])
+            if baked_luts.get("input")
+            else None
+        ),
+        "output_lut": (
+            footage_lanh.to_nuke_path(baked_luts["output"])
+            if baked_luts.get("output")
+            else None
+        ),
+    }
+
+
+def fill_knobs(knobs, parameters):
+    """
+    Description:
+    Replaces the parameters of a list of knobs with their values.
+
+    Input:
+    knobs(list): The (knob, value) pairs of the plan.
+    parameters(dict): The parameter values of the shot.
+
+    Output:
+    knobs(list): The (knob, value) pairs of the shot, the knobs whose
+    parameter is None are left out.
+    """
+    filled = []
+    for knob, value in knobs:
+        if isinstance(value, str) and value.startswith(PARAMETER_PREFIX):
+            value = parameters[value[len(PARAMETER_PREFIX) :]]
+            if value is None:
+                continue
+        filled.append((knob, value))
+
+    return filled
+
+
+def apply_plan(plan, parameters):
+    """
+    Description:
+    Stamps a plan onto a shot, filling in its parameters. The backends build
+    the script from the stamped nodes.
+
+    Input:
+    plan(dict): The plan, see compile_plan.
+    parameters(dict): The parameter values of the shot, see get_parameters.
+
+    Output:
+    stamped(dict): The root knobs and the nodes of the shot, each node with
+    its class, name, knobs, position and input.
+    """
+    return {
+        "root": fill_knobs(plan["root"], parameters),
+        "nodes": [
+            dict(node, knobs=fill_knobs(node["knobs"], parameters))
+            for node in plan["nodes"]
+        ],
+    }
+
+
+def save_plan(plan_path, plan):
+    """
+    Description:
+    Saves a plan to a json file, to inspect or compare it.
+
+    Input:
+    plan_path(str): The json file to write.
+    plan(dict): The plan.
+
+    Output:
+    plan_path(str): The saved file.
+    """
+    return publish_lanh.write_json(plan_path, plan, indent=4)
+
+
+def load_plan(plan_path):
+    """
+    Description:
+    Loads a saved plan. Plans of an older layout are compiled again from
+    their preset instead, so they aren't loaded.
+
+    Input:
+    plan_path(str): The json file to read.
+
+    Output:
+    plan(dict): The plan, or None if it's of an older layout.
+    """
+    with open(plan_path, "r") as f:
+        plan = json.load(f)
+
+    if plan.get("version") != PLAN_VERSION:
+        return None
+
+    return plan
+
+
+def clear_cache():
+    """
+    Description:
+    Forgets the plans compiled in the session.
+
+    Input:
+    None
+
+    Output:
+    None
+    """
+    _PLANS.clear()
+
+
+def main(argv=None):
+    """
+    Description:
+    Command line entry point, compiles the plan of a preset and prints it.
+
+    Input:
+    argv(list): Optional list of arguments, sys.argv by default.
+
+    Output:
+    exit_code(int): Always 0.
+    """
+    parser = argparse.ArgumentParser(
+        description="Compile the setup plan of a preset and print it."
+    )
+    parser.add_argument("preset", help="The preset json file.")
+    parser.add_argument(
+        "--baked", action="store_true", help="Plan the baked LUT conversions."
+    )
+    parser.add_argument("--output", help="Also save the plan to this json.")
+    args = parser.parse_args(argv)
+
+    plan = get_plan(preset_store_lanh.load_preset(args.preset), args.baked)
+    if args.output:
+        save_plan(args.output, plan)
+    print(json.dumps(plan, indent=4))
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,498 @@
+import argparse
+import hashlib
+import os
+import sqlite3
+import sys
+import time
+from concurrent import futures
+
+from . import cache_lanh, folder_template_lanh, preset_store_lanh, sequence_index_lanh
+from . import setup_log_lanh, version_index_lanh
+
+# Tables of the index. Folders are the levels above the shots, with their
+# mtime so their listing is only read again when they change. Unclassified
+# folders have no comp folder and no shots below them, like a new shot or an
+# empty sequence.
+SCHEMA = """
+CREATE TABLE IF NOT EXISTS folders (
+    path TEXT PRIMARY KEY,
+    parent TEXT,
+    mtime INTEGER
+);
+CREATE TABLE IF NOT EXISTS shots (
+    shot_path TEXT PRIMARY KEY,
+    parent TEXT,
+    show_name TEXT,
+    shot_name TEXT,
+    shot_mtime INTEGER,
+    plate_mtime INTEGER,
+    scripts_mtime INTEGER,
+    has_comp INTEGER,
+    plate_name TEXT,
+    plate_first INTEGER,
+    plate_last INTEGER,
+    plate_count INTEGER,
+    latest_script TEXT,
+    latest_version INTEGER,
+    scanned_at REAL
+);
+CREATE INDEX IF NOT EXISTS shots_parent ON shots (parent);
+CREATE TABLE IF NOT EXISTS unclassified (
+    path TEXT PRIMARY KEY,
+    parent TEXT
+);
+CREATE TABLE IF NOT EXISTS meta (
+    key TEXT PRIMARY KEY,
+    value TEXT
+);
+"""
+
+# Columns of a shot, in the order of the table.
+SHOT_COLUMNS = (
+    "shot_path",
+    "parent",
+    "show_name",
+    "shot_name",
+    "shot_mtime",
+    "plate_mtime",
+    "scripts_mtime",
+    "has_comp",
+    "plate_name",
+    "plate_first",
+    "plate_last",
+    "plate_count",
+    "latest_script",
+    "latest_version",
+    "scanned_at",
+)
+
+
+def get_index_path(show_root):
+    """
+    Description:
+    Gets the sqlite file of the shot index of a show, in the local cache.
+
+    Input:
+    show_root(str): The show folder.
+
+    Output:
+    index_path(str): The path of the sqlite file.
+    """
+    show_key = hashlib.sha1(os.path.abspath(show_root).encode("utf-8")).hexdigest()
+    return os.path.join(cache_lanh.get_cache_dir("shot_index"), f"{show_key}.sqlite")
+
+
+def connect(show_root):
+    """
+    Description:
+    Opens the shot index of a show, and creates its tables the first time.
+
+    Input:
+    show_root(str): The show folder.
+
+    Output:
+    connection(class): The sqlite3 connection.
+    """
+    connection = sqlite3.connect(get_index_path(show_root))
+    connection.row_factory = sqlite3.Row
+    connection.executescript(SCHEMA)
+
+    return connection
+
+
+def get_mtime(path):
+    """
+    Description:
+    Gets the mtime of a path in nanoseconds, 0 if it doesn't exist.
+
+    Input:
+    path(str): The path to stat.
+
+    Output:
+    mtime(int): The mtime, or 0.
+    """
+    try:
+        return os.stat(path).st_mtime_ns
+    except OSError:
+        return 0
+
+
+def list_folders(folder_path):
+    """
+    Description:
+    Lists the sub folders of a folder that can hold shots, the hidden and the
+    preset folders are skipped.
+
+    Input:
+    folder_path(str): The folder to list.
+
+    Output:
+    folder_paths(list): The sorted sub folders.
+    """
+    folder_paths = []
+    try:
+        entries = os.scandir(folder_path)
+    except OSError:
+        return folder_paths
+
+    with entries:
+        for entry in entries:
+            if (
+                entry.name.startswith(".")
+                or entry.name == preset_store_lanh.PRESET_FOLDER
+            ):
+                continue
+            if entry.is_dir():
+                folder_paths.append(entry.path)
+
+    return sorted(folder_paths)
+
+
+def get_shot_signature(shot_path):
+    """
+    Description:
+    Gets the mtimes the setup state of a shot depends on. A new comp tree,
+    plate frame or script changes one of them.
+
+    Input:
+    shot_path(str): The shot folder.
+
+    Output:
+    signature(tuple): The mtimes of the shot, plate and scripts folders.
+    """
+    plate_folder = os.path.join(shot_path, "comp", "02_footage", "01_plate")
+    scripts_dir = version_index_lanh.get_scripts_dir(shot_path)
+
+    return (get_mtime(shot_path), get_mtime(plate_folder), get_mtime(scripts_dir))
+
+
+def scan_shot(shot_path, parent, signature):
+    """
+    Description:
+    Reads the setup state of a shot, its comp tree, plate and latest script.
+
+    Input:
+    shot_path(str): The shot folder.
+    parent(str): The folder above the shot.
+    signature(tuple): The mtimes of the shot, as returned by get_shot_signature.
+
+    Output:
+    shot(dict): A row of the shots table.
+    """
+    shot_mtime, plate_mtime, scripts_mtime = signature
+    show_name = os.path.basename(parent)
+
+    shot = {
+        "shot_path": shot_path,
+        "parent": parent,
+        "show_name": show_name,
+        "shot_name": os.path.basename(shot_path),
+        "shot_mtime": shot_mtime,
+        "plate_mtime": plate_mtime,
+        "scripts_mtime": scripts_mtime,
+        "has_comp": int(folder_template_lanh.is_shot_folder(shot_path)),
+        "plate_name": None,
+        "plate_first": None,
+        "plate_last": None,
+        "plate_count": 0,
+        "latest_script": None,
+        "latest_version": 0,
+        "scanned_at": time.time(),
+    }
+
+    # The plate, through the sequence index cache.
+    if plate_mtime:
+        plate_folder = os.path.join(shot_path, "comp", "02_footage", "01_plate")
+        sequence = sequence_index_lanh.get_main_sequence(plate_folder)
+        if sequence is not None:
+            shot["plate_name"] = sequence["name"]
+            shot["plate_first"] = sequence["first"]
+            shot["plate_last"] = sequence["last"]
+            shot["plate_count"] = sequence["count"]
+
+    # The highest script version of any compositor.
+    if scripts_mtime:
+        scripts_dir = version_index_lanh.get_scripts_dir(shot_path)
+        versions = version_index_lanh.get_versions(scripts_dir)
+        if versions:
+            base_name, version = max(versions.items(), key=lambda item: item[1])
+            shot["latest_version"] = version
+            shot["latest_script"] = os.path.join(
+                scripts_dir,
+                f"{base_name}_{version_index_lanh.format_version(version)}.nk",
+            )
+
+    return shot
+
+
+def crawl_show(
+    show_root, depth=folder_template_lanh.DEFAULT_SHOT_DEPTH, workers=8, full=False
+):
+    """
+    Description:
+    Updates the shot index of a show. Folders whose mtime didn't change reuse
+    their listing from the index, and shots whose folders didn't change keep
+    their state, so a rescan mostly costs a few stats per shot.
+
+    Input:
+    show_root(str): The show folder.
+    depth(int): How many levels below the show shots can be. Folders with a
+    comp folder are shots, the others are walked into, and the ones with no
+    sub folders or on the last level are unclassified.
+    workers(int): Number of threads checking the shots.
+    full(bool): True to list and scan everything again.
+
+    Output:
+    stats(dict): The number of shots, scanned, unchanged and removed shots,
+    unclassified folders, and the seconds it took.
+    """
+    start = time.perf_counter()
+    show_root = os.path.abspath(show_root)
+    connection = connect(show_root)
+
+    try:
+        # A different depth changes which folders are shots, list everything.
+        row = connection.execute(
+            "SELECT value FROM meta WHERE key = 'depth'"
+        ).fetchone()
+        if row is None or int(row[0]) != depth:
+            full = True
+
+        known_folders = {
+            row["path"]: row["mtime"]
+            for row in connection.execute("SELECT path, mtime FROM folders")
+        }
+        known_shots = {
+            row["shot_path"]: row for row in connection.execute("SELECT * FROM shots")
+        }
+
+        known_children = {}
+        for row in connection.execute("SELECT path, parent FROM folders"):
+            known_children.setdefault(row["parent"], []).append(row["path"])
+        for shot_path, row in known_shots.items():
+            known_children.setdefault(row["parent"], []).append(shot_path)
+        for row in connection.execute("SELECT path, parent FROM unclassified"):
+            known_children.setdefault(row["parent"], []).append(row["path"])
+
+        def get_children(folder_path):
+            # Reuse the children of the index while the folder didn't change.
+            mtime = get_mtime(folder_path)
+            folder_rows.append((folder_path, os.path.dirname(folder_path), mtime))
+            if not full and known_folders.get(folder_path) == mtime:
+                return sorted(set(known_children.get(folder_path, [])))
+            return list_folders(folder_path)
+
+        # Walk the levels above the shots, only a folder with a comp folder is
+        # a shot, at any level. The folders that can't be told apart, an empty
+        # folder or one on the last level, are unclassified instead.
+        folder_rows = []
+        shot_paths = []
+        unclassified_rows = []
+        level = [show_root]
+        for level_depth in range(1, depth + 1):
+            next_level = []
+            for folder_path in level:
+                children = get_children(folder_path)
+                if not children and folder_path != show_root:
+                    unclassified_rows.append(
+                        (folder_path, os.path.dirname(folder_path))
+                    )
+                for child_path in children:
+                    if folder_template_lanh.is_shot_folder(child_path):
+                        shot_paths.append(child_path)
+                    elif level_depth < depth:
+                        next_level.append(child_path)
+                    else:
+                        unclassified_rows.append((child_path, folder_path))
+            level = next_level
+
+        # Stat the shots in parallel, and only scan the ones that changed.
+        with futures.ThreadPoolExecutor(max_workers=max(1, workers)) as pool:
+            signatures = dict(zip(shot_paths, pool.map(get_shot_signature, shot_paths)))
+
+            changed = []
+            for shot_path, signature in signatures.items():
+                known = known_shots.get(shot_path)
+                if (
+                    full
+                    or known is None
+                    or (
+                        known["shot_mtime"],
+                        known["plate_mtime"],
+                        known["scripts_mtime"],
+                    )
+                    != signature
+                ):
+                    changed.append(shot_path)
+
+            shots = list(
+                pool.map(
+                    lambda shot_path: scan_shot(
+                        shot_path, os.path.dirname(shot_path), signatures[shot_path]
+                    ),
+                    changed,
+                )
+            )
+
+        removed = [
+            shot_path for shot_path in known_shots if shot_path not in signatures
+        ]
+
+        # Write everything in one transaction.
+        with connection:
+            connection.execute(
+                "INSERT OR REPLACE INTO meta VALUES ('depth', ?)", (str(depth),)
+            )
+            connection.execute("DELETE FROM folders")
+            connection.executemany(
+                "INSERT OR REPLACE INTO folders VALUES (?, ?, ?)", folder_rows
+            )
+            connection.execute("DELETE FROM unclassified")
+            connection.executemany(
+                "INSERT OR REPLACE INTO unclassified VALUES (?, ?)", unclassified_rows
+            )
+            connection.executemany(
+                f"INSERT OR REPLACE INTO shots VALUES ({', '.join('?' * len(SHOT_COLUMNS))})",
+                [tuple(shot[column] for column in SHOT_COLUMNS) for shot in shots],
+            )
+            connection.executemany(
+                "DELETE FROM shots WHERE shot_path = ?",
+                [(shot_path,) for shot_path in removed],
+            )
+    finally:
+        connection.close()
+
+    stats = {
+        "shots": len(shot_paths),
+        "scanned": len(changed),
+        "unchanged": len(shot_paths) - len(changed),
+        "removed": len(removed),
+        "unclassified": len(unclassified_rows),
+        "seconds": time.perf_counter() - start,
+    }
+    setup_log_lanh.LOGGER.debug(
+        f"Indexed {stats['shots']} shots of {show_root}, {stats['scanned']} scanned "
+        f"in {stats['seconds']:.2f}s"
+    )
+
+    return stats
+
+
+def get_setup_state(shot):
+    """
+    Description:
+    Describes how far a shot is set up.
+
+    Input:
+    shot(dict): A shot of the index.
+
+    Output:
+    state(str): "set up v03", "folders only" or "new".
+    """
+    if shot["latest_version"]:
+        return f"set up {version_index_lanh.format_version(shot['latest_version'])}"
+    if shot["has_comp"]:
+        return "folders only"
+
+    return "new"
+
+
+def list_shots(show_root, pattern=None):
+    """
+    Description:
+    Lists the shots of a show from its index only, without touching the show
+    folders, so it's instant even for thousands of shots.
+
+    Input:
+    show_root(str): The show folder.
+    pattern(str): Optional text the shot path has to contain.
+
+    Output:
+    shots(list): A dictionary per shot, sorted by path.
+    """
+    connection = connect(os.path.abspath(show_root))
+    try:
+        query = "SELECT * FROM shots"
+        parameters = ()
+        if pattern:
+            query += " WHERE shot_path LIKE ?"
+            parameters = (f"%{pattern}%",)
+        rows = connection.execute(query + " ORDER BY shot_path", parameters).fetchall()
+    finally:
+        connection.close()
+
+    return [dict(row) for row in rows]
+
+
+def list_unclassified(show_root, pattern=None):
+    """
+    Description:
+    Lists the folders of a show the index couldn't classify, from the index
+    only, so new shots without a comp folder can still be picked.
+
+    Input:
+    show_root(str): The show folder.
+    pattern(str): Optional text the folder path has to contain.
+
+    Output:
+    folder_paths(list): The sorted folder paths.
+    """
+    connection = connect(os.path.abspath(show_root))
+    try:
+        query = "SELECT path FROM unclassified"
+        parameters = ()
+        if pattern:
+            query += " WHERE path LIKE ?"
+            parameters = (f"%{pattern}%",)
+        rows = connection.execute(query + " ORDER BY path", parameters).fetchall()
+    finally:
+        connection.close()
+
+    return [row["path"] for row in rows]
+
+
+def main(argv=None):
+    """
+    Description:
+    Command line entry point, updates the index of a show and lists its shots.
+
+    Input:
+    argv(list): Optional list of arguments, sys.argv by default.
+
+    Output:
+    exit_code(int): Always 0.
+    """
+    parser = argparse.ArgumentParser(description="Index the shots of a show.")
+    parser.add_argument("show_root", help="The show folder.")
+    parser.add_argument(
+        "--depth",
+        type=int,
+        default=folder_template_lanh.DEFAULT_SHOT_DEPTH,
+        help="How many levels below the show shots can be.",
+    )
+    parser.add_argument("--workers", type=int, default=8)
+    parser.add_argument("--full", action="store_true", help="Scan every shot again.")
+    parser.add_argument(
+        "--list", action="store_true", help="List the shots and their state."
+    )
+    args = parser.parse_args(argv)
+
+    stats = crawl_show(args.show_root, args.depth, args.workers, args.full)
+
+    if args.list:
+        for shot in list_shots(args.show_root):
+            print(f"{shot['shot_path']:<60} {get_setup_state(shot)}")
+        for folder_path in list_unclassified(args.show_root):
+            print(f"{folder_path:<60} unclassified")
+
+    print(
+        f"{stats['shots']} shots, {stats['scanned']} scanned, "
+        f"{stats['unchanged']} unchanged, {stats['removed']} removed, "
+        f"{stats['unclassified']} unclassified in {stats['seconds']:.2f}s"
+    )
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,325 +1,508 @@
-import nuke
-import os
-
-
-def setup_new_script(show_path, show_specifications):
-    """
-    Description:
-    Sets up a new nuke file with the right naming conventions and colorspaces.
-
-    Input:
-    show_path(str): The root folder of the show comp.
-    show_specifications(dir): A dictionary with all the show specs
-
-    Output:
-
-    """
-
-    # Create folder path if it doesnt exist.
-    folder_structure = create_folder_structure(show_path)
-
-    # Get the paths needed
-    exr_path = folder_structure["comp"]["04_renders"]["02_exr"]
-    mov_path = folder_structure["comp"]["04_renders"]["01_mov"]
-    nk_file_path = show_specifications["nuke_file"]
-
-    # Get the directory from the file path
-    output_dir = os.path.dirname(nk_file_path)
-
-    # Create the directory if it doesn't exist
-    # The 'exist_ok=True' flag prevents an error if the directory already exists
-    os.makedirs(output_dir, exist_ok=True)
-
-    # Clear the current script to start fresh
-    nuke.scriptClear()
-
-    # Read plate
-    footage, first_frame, last_frame = read_files(folder_structure)
-
-    # Get the root node
-    root = nuke.root()
-
-    # Set up the file values as objects.
-    aspect_ratio = show_specifications["aspect_ratio"]
-    # color_space = show_specifications['color_space']
-    # frame_range = show_specifications['frame_range']
-    fps = show_specifications["fps"]
-
-    # Set project format
-    root["format"].setValue(aspect_ratio)
-
-    # Set frame range
-    root["first_frame"].setValue(int(first_frame))
-    root["last_frame"].setValue(int(last_frame))
-
-    # Set FPS
-    root["fps"].setValue(float(fps))
-
-    nuke.createNode("Viewer")
-
-    # Set up the viewe settings
-    set_up_viewer_color(show_specifications)
-
-    # footage = nuke.createNode('Constant')
-    footage.hideControlPanel()
-
-    # Create an OCIO input color space.
-    ocio_input = nuke.createNode("OCIOColorSpace")
-    ocio_input["in_colorspace"].setValue(show_specifications["screen_color"])
-    ocio_input["out_colorspace"].setValue(show_specifications["workspace_color"])
-    ocio_input.setXpos(footage.xpos())
-    ocio_input.setYpos(footage.ypos() + 100)
-    ocio_input.setInput(0, footage)
-    ocio_input.hideControlPanel()
-
-    # Set the Backdrop for the input.
-    input_backdrop = nuke.createNode("BackdropNode")
-    input_backdrop["label"].setValue("Input")
-    input_backdrop["note_font_size"].setValue(36)
-    input_backdrop.setXpos(footage.xpos() - 25)
-    input_backdrop.setYpos(footage.ypos() - 75)
-    input_backdrop["bdwidth"].setValue(200)
-    input_backdrop["bdheight"].setValue(200)
-    input_backdrop.hideControlPanel()
-
-    # Change the colorspace back to screen colorspace
-    ocio_output = nuke.createNode("OCIOColorSpace")
-    ocio_output["in_colorspace"].setValue(show_specifications["workspace_color"])
-    ocio_output["out_colorspace"].setValue(show_specifications["screen_color"])
-    ocio_output.setXpos(ocio_input.xpos())
-    ocio_output.setYpos(ocio_input.ypos() + 500)
-    ocio_output.setInput(0, ocio_input)
-    ocio_output.hideControlPanel()
-
-    # Remove the Alpha from the final renders.
-    remove_alpha = nuke.createNode("Remove")
-    remove_alpha["channels"].setValue("Alpha")
-    remove_alpha.setXpos(ocio_output.xpos())
-    remove_alpha.setYpos(ocio_output.ypos() + 50)
-    remove_alpha.setInput(0, ocio_output)
-    remove_alpha.hideControlPanel()
-
-    # Create dots to adjust the reformat of the HD.
-    dot1 = nuke.createNode("Dot")
-    dot1.setXpos(remove_alpha.xpos() + 34)
-    dot1.setYpos(remove_alpha.ypos() + 100)
-    dot1.setInput(0, remove_alpha)
-    dot1.hideControlPanel()
-
-    dot2 = nuke.createNode("Dot")
-    dot2.setXpos(dot1.xpos() + 350)
-    dot2.setYpos(dot1.ypos())
-    dot2.setInput(0, dot1)
-    dot2.hideControlPanel()
-
-    # Reformat both to HD playblast
-    reformat_hd = nuke.createNode("Reformat")
-    reformat_hd["format"].setValue("HD_1080")
-    reformat_hd.setYpos(dot2.ypos() + 100)
-    reformat_hd.setXpos(dot2.xpos() - 34)
-    reformat_hd.setInput(0, dot2)
-    reformat_hd.hideControlPanel()
-
-    # Set up the correct paths for the files
-    mov_path_file = os.path.join(mov_path, show_specifications["mov_name"])
-    mov_norm_path = os.path.normpath(mov_path_file)
-    mov_correct_path = mov_norm_path.replace(os.path.sep, "/")
-    exr_path_file = os.path.join(exr_path, show_specifications["exr_name"])
-    exr_norm_path = os.path.normpath(exr_path_file)
-    exr_correct_path = exr_norm_path.replace(os.path.sep, "/")
-
-    # Create a Write node for mov
-    write_mov_node = nuke.createNode("Write")
-    write_mov_node["file"].setValue(mov_correct_path)
-    write_mov_node["file_type"].setValue("mov")
-    write_mov_node.setYpos(reformat_hd.ypos() + 50)
-    write_mov_node.setXpos(reformat_hd.xpos())
-    write_mov_node.setInput(0, reformat_hd)
-    write_mov_node.hideControlPanel()
-
-    # Create MOV background
-    backdrop_mov = nuke.createNode("BackdropNode")
-    backdrop_mov["label"].setValue("MOV")
-    backdrop_mov["note_font_size"].setValue(36)
-    backdrop_mov.setXpos(reformat_hd.xpos() - 100)
-    backdrop_mov.setYpos(reformat_hd.ypos() - 100)
-    backdrop_mov["bdwidth"].setValue(200)
-    backdrop_mov["bdheight"].setValue(200)
-    backdrop_mov.hideControlPanel()
-
-    # Reformat to final resolution.
-    reformat = nuke.createNode("Reformat")
-    reformat.setXpos(dot1.xpos() - 34)
-    reformat.setYpos(dot1.ypos() + 100)
-    reformat.setInput(0, dot1)
-    reformat.hideControlPanel()
-
-    # Create a Write node for exr
-    write_exr_node = nuke.createNode("Write")
-    write_exr_node["file"].setValue(exr_correct_path)
-    write_exr_node["file_type"].setValue("exr")
-    write_exr_node.setInput(0, reformat)
-    write_exr_node.setYpos(reformat.ypos() + 50)
-    write_exr_node.setXpos(reformat.xpos())
-    write_exr_node.hideControlPanel()
-
-    # Create exr background
-    backdrop_exr = nuke.createNode("BackdropNode")
-    backdrop_exr["label"].setValue("EXR")
-    backdrop_exr["note_font_size"].setValue(36)
-    backdrop_exr.setXpos(reformat.xpos() - 100)
-    backdrop_exr.setYpos(reformat.ypos() - 100)
-    backdrop_exr["bdwidth"].setValue(200)
-    backdrop_exr["bdheight"].setValue(200)
-    backdrop_exr.hideControlPanel()
-
-    # Now, you can safely save the Nuke file
-    nuke.scriptSaveAs(nk_file_path)
-
-    return
-
-
-# Searchs, verifys and if not creates a folder strucuture and deletes the rest.
-def create_folder_structure(shot_path):
-    """
-    Description:
-    Verifies the folder you selected and goes and verifies folder, creates if it doesn't exist and
-    deletes the rest.
-
-    Input:
-    root_path (str): the folder path directory of the root project.
-
-    Output:
-    folder_strucutre (dir): Directory of all the folders needed.
-    """
-    # Establish the folders and values needed to create.
-    folder_structure = {}
-    comp_root_folders = ["01_scripts", "02_footage", "03_assets", "04_renders"]
-
-    footage_comp_folder = ["01_plate", "02_ref_mov", "03_onset_ref", "04_LUT"]
-
-    render_comp_folder = ["01_mov", "02_exr"]
-
-    # Create the comp folder if it doesn't exist.
-    comp_path = os.path.join(shot_path, "comp")
-    os.makedirs(comp_path, exist_ok=True)
-    print(f"Created main comp directory: {comp_path}")
-    folder_structure["comp"] = {}
-
-    # Loop through the comp folders creating the folders in comp_root_folders.
-    for required_folder in comp_root_folders:
-        folder_path = os.path.join(comp_path, required_folder)
-        os.makedirs(folder_path, exist_ok=True)
-        print(f"Verified or created: {folder_path}")
-
-        # Specific sub-folder creation for '02_footage'
-        if required_folder == "02_footage":
-            folder_structure["comp"][required_folder] = {}
-            for sub_folder in footage_comp_folder:
-                sub_path = os.path.join(folder_path, sub_folder)
-                os.makedirs(sub_path, exist_ok=True)
-                print(f"  Created footage subfolder: {sub_path}")
-                folder_structure["comp"][required_folder][sub_folder] = sub_path
-
-        elif required_folder == "04_renders":
-            folder_structure["comp"][required_folder] = {}
-            for sub_folder in render_comp_folder:
-                sub_path = os.path.join(folder_path, sub_folder)
-                os.makedirs(sub_path, exist_ok=True)
-                print(f"  Created footage subfolder: {sub_path}")
-                folder_structure["comp"][required_folder][sub_folder] = sub_path
-
-        else:
-            # Adds it to a dictionary for non-footage folders
-            folder_structure["comp"][required_folder] = folder_path
-
-    return folder_structure
-
-
-def read_files(show_path):
-    """
-    Description:
-    It reads the files from the show path and ingests it into nuke.
-
-    Input:
-    show_path(dict): A dictionary with the folder structure of the show.
-
-    Output:
-    read_node(dict): A node in nuke with the read information.
-    first_frame(int): The first frame of the plate.
-    last_frame(int): The last frame of the plate.
-    """
-    # Set the path to my read folder.
-    footage_path_folder = show_path["comp"]["02_footage"]["01_plate"]
-
-    # Get the sequence information directly from the folder
-    sequence = nuke.getFileNameList(footage_path_folder)
-    sequence_info = sequence[0]  # e.g., 'test.####.exr 1-50'
-
-    # Parse the sequence info
-    parts = sequence_info.split()
-    footage_name = parts[0]  # 'test.####.exr'
-    range_part = parts[1]  # '1-50'
-
-    # Get the frame range
-    first_frame, last_frame = map(int, range_part.split("-"))
-
-    # Build the full path
-    file_path = os.path.join(footage_path_folder, footage_name)
-
-    # Normalize path to Nuke standards
-    norm_path = os.path.normpath(file_path)
-    nuke_read_path = norm_path.replace(os.path.sep, "/")
-
-    # Setting the read file.
-    read_node = nuke.createNode("Read")
-    read_node["file"].setValue(nuke_read_path)
-    read_node["raw"].setValue(True)  # Should be boolean, not string
-
-    # Manually set the frame range on the Read node
-    read_node["first"].setValue(first_frame)
-    read_node["last"].setValue(last_frame)
-
-    # Force reload
-    read_node["reload"].execute()
-
-    return read_node, first_frame, last_frame
-
-
-def set_up_viewer_color(show_specifications):
-    """
-    Description:
-    Sets up the viewer color space.
-
-    Input:
-    show_specifications(dict): Its a dictionary with a key of ['viewer'], with a color string.
-
-    Output:
-    viewer (dict): nuke viewer node with the adjusted viewer settings.
-    """
-    # Set up the viewer Color.
-    viewer_color = show_specifications["viewer"]
-
-    # Get the active viewer instance
-    viewer = nuke.activeViewer()
-
-    # Get the viewer node and set the viewerProcess knob
-    viewer.node()["viewerProcess"].setValue(viewer_color)
-
-    return viewer
-
-
-def main(show_path, specs):
-    """
-    Description:
-    Creates a Nuke Script with the specifications passed through.
-
-    Input:
-    show_path (str): Is the path to the shot folder.
-    specs (dic): All the specifications of the show.
-    """
-    # show_path = 'C:/Users/Luis Alejandro/Documents/test'
-    # Run the Main function
-    setup_new_script(show_path, specs)
-
-    return
+import os
+
+from . import colorspace_lanh, exr_probe_lanh, folder_template_lanh, footage_lanh
+from . import nk_writer_lanh, proxy_lanh, publish_lanh, sequence_index_lanh
+from . import setup_log_lanh, setup_plan_lanh, version_index_lanh
+
+try:
+    import nuke
+except ImportError:
+    # The nk backend writes scripts without a nuke session.
+    nuke = None
+
+# "nuke" builds the graph in the live session, "nk" writes the .nk text directly.
+BACKENDS = ("nuke", "nk")
+
+
+def setup_new_script(show_path, show_specifications, backend="nuke"):
+    """
+    Description:
+    Sets up a new nuke file with the right naming conventions and colorspaces.
+
+    Input:
+    show_path(str): The root folder of the show comp.
+    show_specifications(dir): A dictionary with all the show specs
+    backend(str): "nuke" to build the script in the nuke session, or "nk" to
+    write the .nk file directly without nuke.
+
+    Output:
+
+    """
+    if backend not in BACKENDS:
+        raise ValueError(f"Unknown backend {backend!r}, use one of {BACKENDS}")
+
+    if backend == "nuke" and nuke is None:
+        raise RuntimeError("The nuke backend needs a nuke session, use the nk backend")
+
+    # Both backends share the filesystem stages, only the script build differs.
+    prepared = prepare_shot(show_path, show_specifications, backend=backend)
+    finish_setup(prepared)
+
+    return
+
+
+class SetupCancelled(Exception):
+    """
+    Description:
+    Raised when a setup is cancelled between two stages.
+    """
+
+
+def prepare_shot(
+    show_path, show_specifications, cancel_event=None, progress=None, backend="nuke"
+):
+    """
+    Description:
+    Runs the filesystem stages of the setup of specs from build_shot_specs,
+    the folder creation, the colorspace bake, the footage indexing, the plate
+    header probe and the proxies. It doesn't touch nuke, so it can run on a
+    background thread.
+
+    Input:
+    show_path(str): The root folder of the show comp.
+    show_specifications(dir): A dictionary with all the show specs
+    cancel_event(object): Optional threading.Event, the setup stops when it's set.
+    progress(function): Optional function called with the stage name and the
+    fraction of the setup done.
+    backend(str): "nuke" or "nk", the backend finish_setup builds the script
+    with.
+
+    Output:
+    prepared(dict): The shot path, specs, folder structure, plate sequence,
+    footage, baked LUTs, proxy path, backend and the SetupTimer, to pass to
+    finish_setup.
+    """
+    # Time every stage and log one record per setup.
+    timer = setup_log_lanh.SetupTimer(
+        show_path, show_specifications.get("nuke_file", ""), backend
+    )
+
+    def check_cancelled():
+        if cancel_event is not None and cancel_event.is_set():
+            raise SetupCancelled(f"Setup of {show_path} was cancelled")
+
+    try:
+        check_cancelled()
+
+        # The colorspaces were checked by build_shot_specs, before the version.
+        config = colorspace_lanh.get_config()
+
+        # Create folder path if it doesnt exist.
+        folder_structure = create_folder_structure(
+            show_path, show_specifications.get("folder_template")
+        )
+
+        # Create the script directory if it doesn't exist
+        os.makedirs(os.path.dirname(show_specifications["nuke_file"]), exist_ok=True)
+        timer.lap("folders")
+
+        # Bake the colorspace conversions, when the preset asks for it.
+        baked_luts = colorspace_lanh.bake_colorspaces(
+            show_specifications,
+            config,
+            colorspace_lanh.get_lut_folder(show_path, folder_structure),
+        )
+        timer.lap("colorspace_bake")
+        if progress:
+            progress("folders", 0.4)
+        check_cancelled()
+
+        # Index every footage folder at once, read_files reuses the plate index.
+        footage = footage_lanh.scan_footage(folder_structure)
+        plate_folder = folder_template_lanh.get_folder_path(
+            folder_structure, "comp", "02_footage", "01_plate"
+        )
+        sequence = sequence_index_lanh.get_main_sequence(plate_folder)
+        if sequence is None:
+            raise ValueError(f"No image sequence found in {plate_folder}")
+        timer.lap("plate_scan")
+        check_cancelled()
+
+        # Read the plate format from the EXR headers.
+        plate_probe = exr_probe_lanh.probe_plate(plate_folder, sequence)
+        timer.lap("plate_probe")
+        if progress:
+            progress("plate_scan", 0.7)
+        check_cancelled()
+
+        # Make the half and quarter proxies, when the preset asks for them.
+        proxy_path = None
+        if show_specifications.get("make_proxies"):
+            proxy_path = proxy_lanh.make_plate_proxies(
+                plate_folder, sequence, cancel_event=cancel_event
+            )
+            timer.lap("proxies")
+            check_cancelled()
+    except Exception as error:
+        version_index_lanh.release_version(show_specifications["nuke_file"])
+        timer.finish(error)
+        raise
+
+    prepared = {
+        "show_path": show_path,
+        "show_specifications": show_specifications,
+        "folder_structure": folder_structure,
+        "sequence": sequence,
+        "plate_probe": plate_probe,
+        "footage": footage,
+        "baked_luts": baked_luts,
+        "proxy_path": proxy_path,
+        "backend": backend,
+        "timer": timer,
+    }
+
+    return prepared
+
+
+def finish_setup(prepared):
+    """
+    Description:
+    Builds and saves the script from a prepared shot. The nuke backend calls
+    nuke, so it has to run on nuke's main thread, the nk backend writes the
+    text directly.
+
+    Input:
+    prepared(dict): The prepared shot, as returned by prepare_shot.
+
+    Output:
+    None
+    """
+    timer = prepared["timer"]
+    try:
+        if prepared.get("backend") == "nk":
+            nk_writer_lanh.write_prepared_script(prepared, timer)
+        else:
+            build_script_in_nuke(prepared, timer)
+    except Exception as error:
+        version_index_lanh.release_version(prepared["show_specifications"]["nuke_file"])
+        timer.finish(error)
+        raise
+
+    timer.finish()
+
+
+def cancel_prepared(prepared):
+    """
+    Description:
+    Drops a prepared shot that won't be built, its script version is released.
+
+    Input:
+    prepared(dict): The prepared shot, as returned by prepare_shot.
+
+    Output:
+    None
+    """
+    show_specifications = prepared["show_specifications"]
+    version_index_lanh.release_version(show_specifications["nuke_file"])
+    prepared["timer"].finish(
+        SetupCancelled(f"Setup of {prepared['show_path']} was cancelled")
+    )
+
+
+def build_script_in_nuke(prepared, timer):
+    """
+    Description:
+    Builds the new script in the nuke session and saves it.
+
+    Input:
+    prepared(dict): The prepared shot, as returned by prepare_shot.
+    timer(class): The SetupTimer of the setup, to time every stage.
+
+    Output:
+    None
+    """
+    if nuke is None:
+        raise RuntimeError("The nuke backend needs a nuke session, use the nk backend")
+
+    show_specifications = prepared["show_specifications"]
+    nk_file_path = show_specifications["nuke_file"]
+
+    # Time spent queued for the main thread after the background stages.
+    timer.lap("main_thread_wait")
+
+    # Clear the current script to start fresh
+    nuke.scriptClear()
+
+    # The graph of the preset is compiled once, only the shot values change.
+    baked_luts = prepared.get("baked_luts")
+    plan = setup_plan_lanh.get_plan(show_specifications, baked=bool(baked_luts))
+    parameters = setup_plan_lanh.get_parameters(
+        show_specifications,
+        prepared["folder_structure"],
+        prepared["sequence"],
+        get_plate_format(show_specifications["aspect_ratio"], prepared["plate_probe"]),
+        baked_luts,
+        prepared.get("proxy_path"),
+    )
+    stamped = setup_plan_lanh.apply_plan(plan, parameters)
+
+    # Set the project format, frame range, fps and proxy mode.
+    root = nuke.root()
+    for knob, value in stamped["root"]:
+        root[knob].setValue(value)
+
+    # Create the Read, colorspace, output and viewer nodes of the plan.
+    create_planned_nodes(stamped["nodes"])
+
+    # Read the other plates, the references and the LUTs of the shot.
+    create_planned_nodes(
+        footage_lanh.plan_footage_nodes(prepared["footage"], parameters["read_path"])
+    )
+
+    # Now, you can safely save the Nuke file
+    timer.lap("graph_build")
+    save_script(nk_file_path)
+    timer.lap("save")
+
+    return
+
+
+def create_planned_nodes(planned_nodes):
+    """
+    Description:
+    Creates nodes laid out ahead of time, e.g. by a setup plan or by
+    footage_lanh.plan_footage_nodes. Each node is connected to its planned
+    input, nodes without one stand alone.
+
+    Input:
+    planned_nodes(list): A dictionary per node with its class, name, knobs,
+    position and optional input name.
+
+    Output:
+    nodes(list): The created nodes.
+    """
+    nodes = []
+    nodes_by_name = {}
+    for planned in planned_nodes:
+        node = nuke.createNode(planned["class"])
+
+        # createNode connects new nodes to the selected one.
+        node.setInput(0, nodes_by_name.get(planned.get("input")))
+        node["name"].setValue(planned["name"])
+        for knob, value in planned["knobs"]:
+            node[knob].setValue(value)
+        node.setXpos(planned["xpos"])
+        node.setYpos(planned["ypos"])
+
+        # Reads pick up the length of movies when they reload.
+        if planned["class"] == "Read":
+            node["reload"].execute()
+        node.hideControlPanel()
+        nodes.append(node)
+        nodes_by_name[planned["name"]] = node
+
+    return nodes
+
+
+def save_script(nk_file_path):
+    """
+    Description:
+    Saves the script on local scratch and renames it into place, so the share
+    never has a half written script. Nuke versions without scriptSaveToTemp
+    save straight to the share.
+
+    Input:
+    nk_file_path(str): The script to save, its version is already reserved.
+
+    Output:
+    None
+    """
+    # The session takes the final name, the temp save doesn't change it.
+    root = nuke.root()
+    root["name"].setValue(nk_file_path)
+
+    if not hasattr(nuke, "scriptSaveToTemp"):
+        # The version was reserved with an empty file, save over it.
+        nuke.scriptSaveAs(nk_file_path, overwrite=1)
+        return
+
+    with publish_lanh.Publisher() as publisher:
+        nuke.scriptSaveToTemp(publisher.stage(nk_file_path))
+    root.setModified(False)
+
+
+# Searchs, verifys and if not creates a folder strucuture from the show template.
+def create_folder_structure(shot_path, folder_template=None, dry_run=False):
+    """
+    Description:
+    Verifies the folder you selected against the folder template of the show and
+    creates only the folders that don't exist.
+
+    Input:
+    shot_path (str): the folder path directory of the shot.
+    folder_template (dict): The folder layout of the show, the default one if None.
+    dry_run (bool): If True, it only returns the folders that would be created.
+
+    Output:
+    folder_strucutre (dir): Directory of all the folders needed, or the list of
+    missing folders on a dry run.
+    """
+    return folder_template_lanh.create_folder_structure(
+        shot_path, folder_template, dry_run=dry_run
+    )
+
+
+def read_files(show_path, proxy_path=None):
+    """
+    Description:
+    It reads the files from the show path and ingests it into nuke.
+
+    Input:
+    show_path(dict): A dictionary with the folder structure of the show.
+    proxy_path(str): Optional proxy sequence of the plate, read in proxy mode.
+
+    Output:
+    read_node(dict): A node in nuke with the read information.
+    first_frame(int): The first frame of the plate.
+    last_frame(int): The last frame of the plate.
+    """
+    # Set the path to my read folder.
+    footage_path_folder = folder_template_lanh.get_folder_path(
+        show_path, "comp", "02_footage", "01_plate"
+    )
+
+    # Get the sequence with the most frames from the folder index.
+    sequence = sequence_index_lanh.get_main_sequence(footage_path_folder)
+    if sequence is None:
+        raise ValueError(f"No image sequence found in {footage_path_folder}")
+
+    footage_name = sequence["name"]  # 'test.####.exr'
+
+    # Get the frame range
+    frames = sequence_index_lanh.get_frames(sequence)
+    first_frame = frames.first
+    last_frame = frames.last
+
+    # Build the full path
+    file_path = os.path.join(footage_path_folder, footage_name)
+
+    # Normalize path to Nuke standards
+    norm_path = os.path.normpath(file_path)
+    nuke_read_path = norm_path.replace(os.path.sep, "/")
+
+    # Setting the read file.
+    read_node = nuke.createNode("Read")
+    read_node["file"].setValue(nuke_read_path)
+    read_node["raw"].setValue(True)  # Should be boolean, not string
+    if proxy_path:
+        read_node["proxy"].setValue(proxy_path)
+
+    # Manually set the frame range on the Read node
+    read_node["first"].setValue(first_frame)
+    read_node["last"].setValue(last_frame)
+
+    # Hold the nearest frame over the gaps of the plate.
+    if frames.has_gaps():
+        read_node["on_error"].setValue("nearest frame")
+        setup_log_lanh.LOGGER.warning(
+            f"{footage_name} is missing frames {frames.get_gaps()}"
+        )
+
+    # Force reload
+    read_node["reload"].execute()
+
+    return read_node, first_frame, last_frame
+
+
+def get_plate_format(aspect_ratio, plate_probe):
+    """
+    Description:
+    Picks the nuke format that matches the plate, and adds one if nuke doesn't
+    have it. It warns when the plate isn't in the preset format.
+
+    Input:
+    aspect_ratio(str): The format of the preset.
+    plate_probe(dict): The probe of the plate, or None to use the preset format.
+
+    Output:
+    format_name(str): The name of the nuke format for the root.
+    """
+    if plate_probe is None:
+        return aspect_ratio
+
+    width = plate_probe["width"]
+    height = plate_probe["height"]
+    pixel_aspect = plate_probe["pixel_aspect"]
+
+    formats = [
+        (
+            format_obj.name(),
+            format_obj.width(),
+            format_obj.height(),
+            format_obj.pixelAspect(),
+        )
+        for format_obj in nuke.formats()
+    ]
+    format_name = exr_probe_lanh.find_format(width, height, pixel_aspect, formats)
+    if format_name is None:
+        format_name = exr_probe_lanh.get_plate_format_name(width, height)
+        nuke.addFormat(f"{width} {height} {pixel_aspect:g} {format_name}")
+
+    exr_probe_lanh.check_preset_format(format_name, plate_probe, aspect_ratio)
+
+    return format_name
+
+
+def build_shot_specs(shot_path, compers_name, preset, version=None):
+    """
+    Description:
+    Builds the specs dictionary for a shot, with the script and output names
+    following the show naming convention. The next free version of the script
+    is reserved, so a new setup never overwrites an existing script. The
+    colorspaces are checked first, so a wrong name reserves nothing.
+
+    Input:
+    shot_path(str): Full path of the shot folder.
+    compers_name(str): The name of the compositor to add to the file name.
+    preset(dict): The show specifications, as saved in the preset json.
+    version(int): Optional version to use instead of reserving the next one.
+
+    Output:
+    specs(dict): A copy of the preset with the exr, mov and nuke file names set.
+    """
+    specs = dict(preset)
+
+    # Grab the last two folders for the naming convention.
+    dir_list = os.path.normpath(shot_path).split(os.path.sep)
+    show_name, shot_number = dir_list[-2:]
+
+    # Check the colorspaces before the version reserves anything on disk.
+    colorspace_lanh.check_colorspaces(preset)
+
+    # Reserve the next version of the script.
+    base_name = f"{show_name}_{shot_number}_comp_{compers_name}"
+    scripts_dir = version_index_lanh.get_scripts_dir(shot_path)
+    if version is None:
+        version, nk_file_path = version_index_lanh.reserve_version(
+            scripts_dir, base_name
+        )
+    else:
+        nk_file_path = os.path.join(
+            scripts_dir, f"{base_name}_{version_index_lanh.format_version(version)}.nk"
+        )
+
+    # Set the naming files for the shows and outputs, on the same version.
+    file_name = os.path.splitext(os.path.basename(nk_file_path))[0]
+
+    specs["version"] = version
+    specs["exr_name"] = f"{file_name}_{preset['exr_name']}"
+    specs["mov_name"] = f"{file_name}_{preset['mov_name']}"
+    specs["nuke_file"] = nk_file_path
+
+    return specs
+
+
+def main(show_path, specs):
+    """
+    Description:
+    Creates a Nuke Script with the specifications passed through.
+
+    Input:
+    show_path (str): Is the path to the shot folder.
+    specs (dic): All the specifications of the show.
+    """
+    # show_path = 'C:/Users/Luis Alejandro/Documents/test'
+    # Run the Main function
+    setup_new_script(show_path, specs)
+
+    return
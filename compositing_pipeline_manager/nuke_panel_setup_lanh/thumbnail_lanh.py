@@ -0,0 +1,462 @@
+import hashlib
+import os
+import threading
+from concurrent import futures
+
+from . import cache_lanh, exr_probe_lanh, proxy_lanh, publish_lanh
+from . import sequence_index_lanh, setup_log_lanh
+
+try:
+    import numpy
+    import OpenEXR
+    import Imath
+except ImportError:
+    # Previews are optional, the panel shows the shot path without them.
+    numpy = OpenEXR = Imath = None
+
+# Width of the thumbnails, in pixels.
+THUMBNAIL_WIDTH = 256
+
+# Number of frames of a filmstrip, the first, the last and evenly in between.
+FILMSTRIP_FRAMES = 5
+
+# Size the thumbnail cache is kept under, LANH_THUMBNAIL_CACHE_MB changes it.
+MAX_CACHE_MB = 200
+
+# Extension of the cached thumbnails, binary PPM that Qt loads directly.
+THUMBNAIL_EXTENSION = ".ppm"
+
+# Worker pool of the previews, created on first use.
+_THUMBNAIL_POOL = None
+
+# Previews being made, so a shot clicked twice is only made once.
+_PENDING = {}
+_PENDING_LOCK = threading.Lock()
+
+# A lock per frame being decoded, so a frame is never decoded twice at once.
+_FRAME_LOCKS = {}
+_FRAME_LOCKS_LOCK = threading.Lock()
+
+
+def has_dependencies():
+    """
+    Description:
+    Checks that NumPy and the OpenEXR bindings are installed.
+
+    Input:
+    None
+
+    Output:
+    available(bool): True if previews can be made.
+    """
+    return numpy is not None
+
+
+def get_max_cache_bytes():
+    """
+    Description:
+    Gets the size the thumbnail cache is kept under.
+
+    Input:
+    None
+
+    Output:
+    max_bytes(int): The size limit of the cache, in bytes.
+    """
+    max_mb = float(os.environ.get("LANH_THUMBNAIL_CACHE_MB", MAX_CACHE_MB))
+    return int(max_mb * 1024 * 1024)
+
+
+def get_thumbnail_key(frame_path, stat, width):
+    """
+    Description:
+    Gets the cache key of a thumbnail, from the frame path, its mtime and size
+    and the thumbnail width, so a new version of the frame gets a new key.
+
+    Input:
+    frame_path(str): The image frame.
+    stat(object): The os.stat of the frame.
+    width(int): The thumbnail width.
+
+    Output:
+    key(str): The cache key.
+    """
+    text = f"{os.path.abspath(frame_path)}|{stat.st_mtime_ns}|{stat.st_size}|{width}"
+    return hashlib.sha1(text.encode("utf-8")).hexdigest()
+
+
+def get_cached_path(key):
+    """
+    Description:
+    Gets the path of a cached thumbnail.
+
+    Input:
+    key(str): The cache key.
+
+    Output:
+    cached_path(str): The thumbnail file in the cache.
+    """
+    return os.path.join(
+        cache_lanh.get_cache_dir("thumbnails"), f"{key}{THUMBNAIL_EXTENSION}"
+    )
+
+
+def touch(cached_path):
+    """
+    Description:
+    Marks a cached thumbnail as used, the least recently used ones are evicted
+    first.
+
+    Input:
+    cached_path(str): The thumbnail file in the cache.
+
+    Output:
+    found(bool): True if the thumbnail is in the cache.
+    """
+    try:
+        os.utime(cached_path)
+    except OSError:
+        return False
+
+    return True
+
+
+def evict_cache(max_bytes=None):
+    """
+    Description:
+    Removes the least recently used thumbnails until the cache fits its size.
+
+    Input:
+    max_bytes(int): The size limit, get_max_cache_bytes() by default.
+
+    Output:
+    removed(int): The number of thumbnails removed.
+    """
+    if max_bytes is None:
+        max_bytes = get_max_cache_bytes()
+
+    entries = []
+    total = 0
+    with os.scandir(cache_lanh.get_cache_dir("thumbnails")) as scan:
+        for entry in scan:
+            if not entry.name.endswith(THUMBNAIL_EXTENSION):
+                continue
+            try:
+                stat = entry.stat()
+            except OSError:
+                continue
+            entries.append((stat.st_mtime, stat.st_size, entry.path))
+            total += stat.st_size
+
+    removed = 0
+    for _, size, path in sorted(entries):
+        if total <= max_bytes:
+            break
+        publish_lanh.remove_file(path)
+        total -= size
+        removed += 1
+
+    return removed
+
+
+def write_ppm(ppm_path, pixels):
+    """
+    Description:
+    Writes an 8 bit RGB image as a binary PPM, renamed into place once complete.
+
+    Input:
+    ppm_path(str): The file to write.
+    pixels(array): The (height, width, 3) uint8 image.
+
+    Output:
+    None
+    """
+    height, width = pixels.shape[:2]
+    data = f"P6\n{width} {height}\n255\n".encode("ascii") + pixels.tobytes()
+
+    hidden_path = publish_lanh.get_hidden_path(ppm_path)
+    try:
+        with open(hidden_path, "wb") as f:
+            f.write(data)
+        os.replace(hidden_path, ppm_path)
+    except Exception:
+        publish_lanh.remove_file(hidden_path)
+        raise
+
+
+def read_ppm(ppm_path):
+    """
+    Description:
+    Reads a binary PPM written by write_ppm.
+
+    Input:
+    ppm_path(str): The file to read.
+
+    Output:
+    pixels(array): The (height, width, 3) uint8 image.
+    """
+    with open(ppm_path, "rb") as f:
+        data = f.read()
+
+    # Header of three lines: the magic, the size and the max value.
+    magic, size, max_value, pixels = data.split(b"\n", 3)
+    width, height = (int(value) for value in size.split())
+
+    return numpy.frombuffer(pixels, dtype=numpy.uint8).reshape(height, width, 3)
+
+
+def read_rgb(frame_path):
+    """
+    Description:
+    Reads the colour channels of an EXR frame. Frames without RGB show their
+    first channel in grey.
+
+    Input:
+    frame_path(str): The EXR frame.
+
+    Output:
+    channels(list): The three 2D float32 arrays, red, green and blue.
+    """
+    exr_file = OpenEXR.InputFile(frame_path)
+    try:
+        header = exr_file.header()
+        data_window = header["dataWindow"]
+        width = data_window.max.x - data_window.min.x + 1
+        height = data_window.max.y - data_window.min.y + 1
+
+        names = ["R", "G", "B"]
+        if not all(name in header["channels"] for name in names):
+            names = [sorted(header["channels"])[0]] * 3
+
+        float_type = Imath.PixelType(Imath.PixelType.FLOAT)
+        buffers = exr_file.channels(names, float_type)
+    finally:
+        exr_file.close()
+
+    return [
+        numpy.frombuffer(buffer, dtype=numpy.float32).reshape(height, width)
+        for buffer in buffers
+    ]
+
+
+def render_thumbnail(frame_path, width=THUMBNAIL_WIDTH):
+    """
+    Description:
+    Decodes a frame and shrinks it to a thumbnail. The pixels get a plain 2.2
+    gamma for display, not the show LUT.
+
+    Input:
+    frame_path(str): The EXR frame.
+    width(int): The thumbnail width, the frame is shrunk by whole factors.
+
+    Output:
+    pixels(array): The (height, width, 3) uint8 thumbnail.
+    """
+    channels = read_rgb(frame_path)
+
+    factor = max(1, -(-channels[0].shape[1] // width))
+    channels = [proxy_lanh.resample(channel, factor) for channel in channels]
+
+    pixels = numpy.stack(channels, axis=-1)
+    pixels = numpy.nan_to_num(pixels, nan=0.0, posinf=1.0, neginf=0.0)
+    pixels = numpy.clip(pixels, 0.0, 1.0) ** (1.0 / 2.2)
+
+    return (pixels * 255.0 + 0.5).astype(numpy.uint8)
+
+
+def get_frame_lock(key):
+    """
+    Description:
+    Gets the lock of a frame being decoded.
+
+    Input:
+    key(str): The cache key of the frame.
+
+    Output:
+    lock(object): The threading.Lock of the frame.
+    """
+    with _FRAME_LOCKS_LOCK:
+        return _FRAME_LOCKS.setdefault(key, threading.Lock())
+
+
+def get_thumbnail(frame_path, width=THUMBNAIL_WIDTH, decode_path=None):
+    """
+    Description:
+    Gets the cached thumbnail of a frame, and makes it if it isn't cached.
+
+    Input:
+    frame_path(str): The EXR frame, the thumbnail is cached for it.
+    width(int): The thumbnail width.
+    decode_path(str): Optional smaller copy of the frame to decode instead,
+    e.g. its proxy.
+
+    Output:
+    cached_path(str): The thumbnail file in the cache.
+    """
+    key = get_thumbnail_key(frame_path, os.stat(frame_path), width)
+    cached_path = get_cached_path(key)
+    if touch(cached_path):
+        return cached_path
+
+    with get_frame_lock(key):
+        # Another worker may have made it while this one waited.
+        if touch(cached_path):
+            return cached_path
+
+        write_ppm(cached_path, render_thumbnail(decode_path or frame_path, width))
+        setup_log_lanh.LOGGER.debug(f"Cached thumbnail of {frame_path}")
+
+    with _FRAME_LOCKS_LOCK:
+        _FRAME_LOCKS.pop(key, None)
+    evict_cache()
+
+    return cached_path
+
+
+def get_frame_thumbnail(plate_folder, sequence, frame, width=THUMBNAIL_WIDTH):
+    """
+    Description:
+    Gets the thumbnail of a plate frame, decoded from its quarter proxy when
+    it's up to date.
+
+    Input:
+    plate_folder(str): The plate folder.
+    sequence(dict): The plate sequence, as returned by the sequence index.
+    frame(int): The frame number.
+    width(int): The thumbnail width.
+
+    Output:
+    cached_path(str): The thumbnail file in the cache.
+    """
+    frame_path = exr_probe_lanh.get_frame_path(plate_folder, sequence, frame)
+    proxy_path = exr_probe_lanh.get_frame_path(
+        proxy_lanh.get_proxy_folder(plate_folder, "quarter"), sequence, frame
+    )
+    if not proxy_lanh.is_up_to_date(frame_path, proxy_path):
+        proxy_path = None
+
+    return get_thumbnail(frame_path, width, proxy_path)
+
+
+def get_filmstrip(plate_folder, sequence, width=THUMBNAIL_WIDTH):
+    """
+    Description:
+    Gets the cached filmstrip of a plate, its frame thumbnails side by side.
+    Each frame thumbnail is cached too, so frames are decoded only once.
+
+    Input:
+    plate_folder(str): The plate folder.
+    sequence(dict): The plate sequence, as returned by the sequence index.
+    width(int): The width of each frame of the strip.
+
+    Output:
+    cached_path(str): The filmstrip file in the cache.
+    """
+    frames = exr_probe_lanh.sample_frames(sequence, FILMSTRIP_FRAMES - 2)
+    frame_paths = [
+        get_frame_thumbnail(plate_folder, sequence, frame, width) for frame in frames
+    ]
+
+    # The strip is keyed by its frame thumbnails, themselves keyed by mtime.
+    text = "|".join(os.path.basename(path) for path in frame_paths)
+    cached_path = get_cached_path(
+        f"strip_{hashlib.sha1(text.encode('utf-8')).hexdigest()}"
+    )
+    if touch(cached_path):
+        return cached_path
+
+    # Frames of another size are padded to the tallest one.
+    thumbnails = [read_ppm(path) for path in frame_paths]
+    height = max(thumbnail.shape[0] for thumbnail in thumbnails)
+    strip = numpy.concatenate(
+        [
+            numpy.pad(thumbnail, ((0, height - thumbnail.shape[0]), (0, 0), (0, 0)))
+            for thumbnail in thumbnails
+        ],
+        axis=1,
+    )
+    write_ppm(cached_path, strip)
+    evict_cache()
+
+    return cached_path
+
+
+def get_preview(plate_folder, filmstrip=False, width=THUMBNAIL_WIDTH):
+    """
+    Description:
+    Gets the preview of the plate of a shot, the thumbnail of its middle frame
+    or its filmstrip.
+
+    Input:
+    plate_folder(str): The plate folder of the shot.
+    filmstrip(bool): If True, the filmstrip instead of a single thumbnail.
+    width(int): The thumbnail width.
+
+    Output:
+    cached_path(str): The preview file in the cache, or None if the shot has
+    no EXR plate or the dependencies are missing.
+    """
+    if not has_dependencies():
+        return None
+
+    try:
+        sequence = sequence_index_lanh.get_main_sequence(plate_folder)
+    except FileNotFoundError:
+        return None
+    if sequence is None or not sequence["name"].lower().endswith(".exr"):
+        return None
+
+    if filmstrip:
+        return get_filmstrip(plate_folder, sequence, width)
+
+    frames = exr_probe_lanh.sample_frames(sequence, 1)
+    return get_frame_thumbnail(plate_folder, sequence, frames[len(frames) // 2], width)
+
+
+def get_pool():
+    """
+    Description:
+    Gets the worker pool of the previews, created on first use.
+
+    Input:
+    None
+
+    Output:
+    pool(class): A ThreadPoolExecutor for the previews.
+    """
+    global _THUMBNAIL_POOL
+    if _THUMBNAIL_POOL is None:
+        _THUMBNAIL_POOL = futures.ThreadPoolExecutor(max_workers=2)
+
+    return _THUMBNAIL_POOL
+
+
+def request_preview(plate_folder, filmstrip=False, width=THUMBNAIL_WIDTH):
+    """
+    Description:
+    Makes the preview of a plate on a background worker, so the panel never
+    waits on a decode. A preview already being made is shared.
+
+    Input:
+    plate_folder(str): The plate folder of the shot.
+    filmstrip(bool): If True, the filmstrip instead of a single thumbnail.
+    width(int): The thumbnail width.
+
+    Output:
+    job(object): A future of the cached preview path, as get_preview.
+    """
+    key = (plate_folder, filmstrip, width)
+    with _PENDING_LOCK:
+        job = _PENDING.get(key)
+        if job is None:
+            job = get_pool().submit(get_preview, plate_folder, filmstrip, width)
+            _PENDING[key] = job
+
+    def forget(done_job):
+        with _PENDING_LOCK:
+            if _PENDING.get(key) is done_job:
+                del _PENDING[key]
+
+    job.add_done_callback(forget)
+
+    return job
@@ -0,0 +1,207 @@
+import os
+import re
+import threading
+
+from . import setup_log_lanh
+
+# Script names end with the version, e.g. show_sh010_comp_alex_v03.nk.
+VERSION_PATTERN = re.compile(r"^(?P<base>.+)_v(?P<version>\d+)\.nk$")
+
+# Digits of the version number, v01.
+VERSION_PADDING = 2
+
+# Per scripts folder: its mtime when scanned and the latest version per base name.
+_VERSION_CACHE = {}
+_CACHE_LOCK = threading.Lock()
+
+
+def get_scripts_dir(shot_path):
+    """
+    Description:
+    Gets the folder the scripts of a shot are saved in.
+
+    Input:
+    shot_path(str): Full path of the shot folder.
+
+    Output:
+    scripts_dir(str): The comp/01_scripts folder of the shot.
+    """
+    return os.path.join(shot_path, "comp", "01_scripts")
+
+
+def format_version(version):
+    """
+    Description:
+    Formats a version number the way it goes in the file names.
+
+    Input:
+    version(int): The version number.
+
+    Output:
+    version_text(str): The version, e.g. v03.
+    """
+    return f"v{version:0{VERSION_PADDING}d}"
+
+
+def scan_versions(scripts_dir):
+    """
+    Description:
+    Lists the scripts folder once and keeps the latest version of every
+    script base name.
+
+    Input:
+    scripts_dir(str): The scripts folder of a shot.
+
+    Output:
+    versions(dict): The latest version number per base name, e.g.
+    {"show_sh010_comp_alex": 3}.
+    """
+    versions = {}
+    try:
+        entries = os.scandir(scripts_dir)
+    except FileNotFoundError:
+        return versions
+
+    with entries:
+        for entry in entries:
+            match = VERSION_PATTERN.match(entry.name)
+            if not match:
+                continue
+            base = match.group("base")
+            version = int(match.group("version"))
+            if version > versions.get(base, 0):
+                versions[base] = version
+
+    return versions
+
+
+def get_versions(scripts_dir, use_cache=True):
+    """
+    Description:
+    Gets the version index of a scripts folder. It's only scanned again when
+    the folder changed, so shots with hundreds of versions stay cheap.
+
+    Input:
+    scripts_dir(str): The scripts folder of a shot.
+    use_cache(bool): False to always scan the folder.
+
+    Output:
+    versions(dict): The latest version number per base name.
+    """
+    try:
+        mtime = os.stat(scripts_dir).st_mtime_ns
+    except FileNotFoundError:
+        return {}
+
+    with _CACHE_LOCK:
+        cached = _VERSION_CACHE.get(scripts_dir)
+        if use_cache and cached and cached["mtime"] == mtime:
+            return dict(cached["versions"])
+
+    versions = scan_versions(scripts_dir)
+    with _CACHE_LOCK:
+        _VERSION_CACHE[scripts_dir] = {"mtime": mtime, "versions": versions}
+
+    return dict(versions)
+
+
+def get_latest_version(scripts_dir, base_name):
+    """
+    Description:
+    Gets the latest version of a script.
+
+    Input:
+    scripts_dir(str): The scripts folder of a shot.
+    base_name(str): The script name without the version.
+
+    Output:
+    version(int): The latest version, 0 if there is none.
+    """
+    return get_versions(scripts_dir).get(base_name, 0)
+
+
+def reserve_version(scripts_dir, base_name):
+    """
+    Description:
+    Reserves the next free version of a script by creating its empty .nk file.
+    The file is created exclusively, so two setups of the same shot running
+    at the same time never get the same version.
+
+    Input:
+    scripts_dir(str): The scripts folder of a shot.
+    base_name(str): The script name without the version.
+
+    Output:
+    version(int): The reserved version.
+    nk_file_path(str): The reserved script, to save over.
+    """
+    os.makedirs(scripts_dir, exist_ok=True)
+
+    version = get_latest_version(scripts_dir, base_name) + 1
+    while True:
+        nk_file_path = os.path.join(
+            scripts_dir, f"{base_name}_{format_version(version)}.nk"
+        )
+        try:
+            file_handle = os.open(nk_file_path, os.O_CREAT | os.O_EXCL | os.O_WRONLY)
+        except FileExistsError:
+            # Taken since the index was read, try the next one.
+            version += 1
+            continue
+        os.close(file_handle)
+        break
+
+    # Keep the index up to date without scanning the folder again.
+    with _CACHE_LOCK:
+        cached = _VERSION_CACHE.get(scripts_dir)
+        if cached is not None:
+            cached["versions"][base_name] = max(
+                version, cached["versions"].get(base_name, 0)
+            )
+            cached["mtime"] = os.stat(scripts_dir).st_mtime_ns
+
+    setup_log_lanh.LOGGER.debug(f"Reserved {nk_file_path}")
+
+    return version, nk_file_path
+
+
+def release_version(nk_file_path):
+    """
+    Description:
+    Frees a reserved version when its setup failed, if nothing was saved in it.
+
+    Input:
+    nk_file_path(str): The reserved script.
+
+    Output:
+    released(bool): True if the reservation was removed.
+    """
+    try:
+        if os.path.getsize(nk_file_path) > 0:
+            return False
+        os.remove(nk_file_path)
+    except OSError:
+        return False
+
+    # Drop the index of the folder, the latest version may have gone back.
+    with _CACHE_LOCK:
+        _VERSION_CACHE.pop(os.path.dirname(nk_file_path), None)
+
+    setup_log_lanh.LOGGER.debug(f"Released {nk_file_path}")
+
+    return True
+
+
+def clear_cache():
+    """
+    Description:
+    Forgets the version index of every scripts folder.
+
+    Input:
+    None
+
+    Output:
+    None
+    """
+    with _CACHE_LOCK:
+        _VERSION_CACHE.clear()
@@ -0,0 +1,866 @@
+import argparse
+import collections
+import ctypes
+import ctypes.util
+import hashlib
+import json
+import os
+import select
+import signal
+import struct
+import sys
+import threading
+import time
+from concurrent import futures
+from concurrent.futures.process import BrokenProcessPool
+
+from . import batch_setup_lanh, cache_lanh, folder_template_lanh, preset_store_lanh
+from . import publish_lanh
+from . import sequence_index_lanh, setup_log_lanh, shot_index_lanh
+
+# Folders from a shot down to its plate folder.
+PLATE_PARTS = ("comp", "02_footage", "01_plate")
+
+# Seconds a plate has to stay the same before its shot is set up.
+DEFAULT_SETTLE = 30.0
+
+# Seconds between two scans of the show without inotify.
+DEFAULT_POLL = 10.0
+
+# Seconds between two safety scans with inotify, in case events were lost.
+RESCAN_INTERVAL = 600.0
+
+# Version of the state file, bumped when its keys change.
+STATE_VERSION = 1
+
+# Inotify flags and events, from linux/inotify.h.
+IN_NONBLOCK = 0o4000
+IN_CLOEXEC = 0o2000000
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ONLYDIR = 0x01000000
+IN_ISDIR = 0x40000000
+
+# Events of a watched folder: frames landing, renamed or removed, and new folders.
+WATCH_MASK = (
+    IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE | IN_ONLYDIR
+)
+
+# Header of an inotify event: watch, mask, cookie and name length.
+EVENT_HEADER = struct.Struct("iIII")
+
+
+class Inotify(object):
+    def __init__(self):
+        """
+        Description:
+        Watches folders with the linux inotify API, through the C library, so
+        no extra package is needed.
+
+        Input:
+        None
+
+        Output:
+        None
+        """
+        self.libc = ctypes.CDLL(
+            ctypes.util.find_library("c") or "libc.so.6", use_errno=True
+        )
+        self.libc.inotify_add_watch.argtypes = [
+            ctypes.c_int,
+            ctypes.c_char_p,
+            ctypes.c_uint32,
+        ]
+        self.fd = self.libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self.fd < 0:
+            errno = ctypes.get_errno()
+            raise OSError(errno, os.strerror(errno))
+
+    def add_watch(self, folder_path, mask=WATCH_MASK):
+        """
+        Description:
+        Watches a folder, watching it again returns the same watch.
+
+        Input:
+        folder_path(str): The folder to watch.
+        mask(int): The events to watch.
+
+        Output:
+        watch(int): The watch descriptor.
+        """
+        watch = self.libc.inotify_add_watch(self.fd, os.fsencode(folder_path), mask)
+        if watch < 0:
+            errno = ctypes.get_errno()
+            raise OSError(errno, os.strerror(errno), folder_path)
+
+        return watch
+
+    def read_events(self, timeout):
+        """
+        Description:
+        Waits for events and reads every event queued.
+
+        Input:
+        timeout(float): Seconds to wait for the first event.
+
+        Output:
+        events(list): A (watch, mask, name) tuple per event.
+        """
+        readable, _, _ = select.select([self.fd], [], [], timeout)
+        if not readable:
+            return []
+
+        try:
+            data = os.read(self.fd, 64 * 1024)
+        except BlockingIOError:
+            return []
+
+        events = []
+        offset = 0
+        while offset + EVENT_HEADER.size <= len(data):
+            watch, mask, _, length = EVENT_HEADER.unpack_from(data, offset)
+            offset += EVENT_HEADER.size
+            name = os.fsdecode(data[offset : offset + length].rstrip(b"\0"))
+            offset += length
+            events.append((watch, mask, name))
+
+        return events
+
+    def close(self):
+        """
+        Description:
+        Stops every watch.
+
+        Input:
+        None
+
+        Output:
+        None
+        """
+        if self.fd >= 0:
+            os.close(self.fd)
+            self.fd = -1
+
+
+def get_inotify():
+    """
+    Description:
+    Gets an inotify instance, when the system has one.
+
+    Input:
+    None
+
+    Output:
+    inotify(class): The Inotify, or None outside of linux.
+    """
+    if not sys.platform.startswith("linux"):
+        return None
+
+    try:
+        return Inotify()
+    except (OSError, AttributeError) as error:
+        setup_log_lanh.LOGGER.warning(f"No inotify, scanning the show instead: {error}")
+        return None
+
+
+def get_state_path(show_root):
+    """
+    Description:
+    Gets the json file of the watch state of a show, in the local cache.
+
+    Input:
+    show_root(str): The show folder.
+
+    Output:
+    state_path(str): The path of the json file.
+    """
+    show_key = hashlib.sha1(os.path.abspath(show_root).encode("utf-8")).hexdigest()
+    return os.path.join(cache_lanh.get_cache_dir("watch"), f"{show_key}.json")
+
+
+def load_state(show_root):
+    """
+    Description:
+    Loads the watch state of a show, the plate every shot was last set up
+    with.
+
+    Input:
+    show_root(str): The show folder.
+
+    Output:
+    state(dict): The state, or None if the show was never watched.
+    """
+    try:
+        with open(get_state_path(show_root), "r") as f:
+            state = json.load(f)
+    except (OSError, ValueError):
+        return None
+
+    if state.get("version") != STATE_VERSION:
+        return None
+
+    return state
+
+
+def save_state(show_root, state):
+    """
+    Description:
+    Saves the watch state of a show, through local scratch like every other
+    save, so a watcher stopped mid save never leaves a broken state.
+
+    Input:
+    show_root(str): The show folder.
+    state(dict): The state.
+
+    Output:
+    None
+    """
+    publish_lanh.write_json(get_state_path(show_root), state, indent=4)
+
+
+def get_plate_folder(shot_path):
+    """
+    Description:
+    Gets the plate folder of a shot.
+
+    Input:
+    shot_path(str): The shot folder.
+
+    Output:
+    plate_folder(str): The plate folder.
+    """
+    return os.path.join(shot_path, *PLATE_PARTS)
+
+
+def get_plate_signature(shot_path):
+    """
+    Description:
+    Gets what identifies the plate of a shot, its main sequence name, range
+    and frame count. A plate still landing changes its count.
+
+    Input:
+    shot_path(str): The shot folder.
+
+    Output:
+    signature(list): The name, first, last and count, or None if the shot
+    has no plate.
+    """
+    sequence = sequence_index_lanh.get_main_sequence(get_plate_folder(shot_path))
+    if sequence is None:
+        return None
+
+    return [sequence["name"], sequence["first"], sequence["last"], sequence["count"]]
+
+
+class PlateWatcher(object):
+    def __init__(
+        self,
+        show_root,
+        compositor,
+        preset=None,
+        depth=folder_template_lanh.DEFAULT_SHOT_DEPTH,
+        workers=2,
+        settle=DEFAULT_SETTLE,
+        poll=DEFAULT_POLL,
+        backend="nk",
+        use_inotify=True,
+        callback=None,
+    ):
+        """
+        Description:
+        Watches the plate folders of a show and sets up every shot whose plate
+        landed or changed, once the plate stopped growing. The setups run on a
+        pool of a few worker processes, and the plate each shot was set up
+        with is kept in the watch state, so a restart only sets up the shots
+        whose plate changed while it was stopped.
+
+        Input:
+        show_root(str): The show folder.
+        compositor(str): The name of the compositor for the file names.
+        preset(dict): Optional preset used instead of the show level file.
+        depth(int): How many levels below the show shots can be, folders
+        with a comp folder are shots at any level.
+        workers(int): Number of setups running at once.
+        settle(float): Seconds a plate has to stay the same.
+        poll(float): Seconds between two scans without inotify.
+        backend(str): "nk" to write the scripts without nuke, or "nuke".
+        use_inotify(bool): False to scan the show instead of watching it.
+        callback(function): Optional function called with each setup result.
+
+        Output:
+        None
+        """
+        self.show_root = os.path.abspath(show_root)
+        self.compositor = compositor
+        self.preset = preset
+        self.depth = depth
+        self.workers = max(1, workers)
+        self.settle = settle
+        self.poll = poll
+        self.backend = backend
+        self.callback = callback
+
+        self.inotify = get_inotify() if use_inotify else None
+        self.watches = {}
+        self.watched = set()
+        self.shots = set()
+        self.pending = {}
+        self.ready = collections.deque()
+        self.running = {}
+        self.suspects = set()
+        self.last_scan = 0.0
+        self.state = load_state(self.show_root)
+
+    def get_shot_path(self, folder_path):
+        """
+        Description:
+        Gets the shot a folder belongs to, the first folder down from the
+        show that is a shot, one with a comp folder.
+
+        Input:
+        folder_path(str): A folder below the show.
+
+        Output:
+        shot_path(str): The shot folder, or None for the folders above the
+        shots.
+        """
+        parts = os.path.relpath(folder_path, self.show_root).split(os.path.sep)
+        if parts == ["."]:
+            return None
+
+        for level in range(1, min(len(parts), self.depth) + 1):
+            shot_path = os.path.join(self.show_root, *parts[:level])
+            if shot_path in self.shots or folder_template_lanh.is_shot_folder(
+                shot_path
+            ):
+                return shot_path
+
+        return None
+
+    def add_watch(self, folder_path):
+        """
+        Description:
+        Watches a folder. When the system runs out of watches, the watcher
+        falls back to scanning the show.
+
+        Input:
+        folder_path(str): The folder to watch.
+
+        Output:
+        watched(bool): True if the folder is watched.
+        """
+        if self.inotify is None:
+            return False
+        if folder_path in self.watched:
+            return True
+
+        try:
+            watch = self.inotify.add_watch(folder_path)
+        except OSError as error:
+            if not os.path.isdir(folder_path):
+                return False
+            setup_log_lanh.LOGGER.warning(
+                f"Could not watch {folder_path}, scanning the show instead: {error}"
+            )
+            self.inotify.close()
+            self.inotify = None
+            return False
+
+        self.watches[watch] = folder_path
+        self.watched.add(folder_path)
+
+        return True
+
+    def watch_folder(self, folder_path, check=False):
+        """
+        Description:
+        Watches a folder above the shots, its sub folders, and the shots
+        below them. Folders on the last level without a comp folder are only
+        watched themselves, until they get one and become shots.
+
+        Input:
+        folder_path(str): The show or a folder between it and the shots.
+        check(bool): True to check the plates of the shots found, for folders
+        that appeared while watching.
+
+        Output:
+        None
+        """
+        if not self.add_watch(folder_path):
+            return
+
+        level = len(os.path.relpath(folder_path, self.show_root).split(os.path.sep))
+        if folder_path == self.show_root:
+            level = 0
+
+        if level >= self.depth:
+            return
+
+        for child_path in shot_index_lanh.list_folders(folder_path):
+            if folder_template_lanh.is_shot_folder(child_path):
+                self.watch_shot(child_path, check)
+            else:
+                self.watch_folder(child_path, check)
+
+    def watch_shot(self, shot_path, check=False):
+        """
+        Description:
+        Watches the folders of a shot down to its plate folder, as far as they
+        exist, so the plate folder is watched as soon as it's made.
+
+        Input:
+        shot_path(str): The shot folder.
+        check(bool): True to check the plate when its folder is watched.
+
+        Output:
+        None
+        """
+        folder_path = shot_path
+        if not self.add_watch(folder_path):
+            return
+        self.shots.add(shot_path)
+        for part in PLATE_PARTS:
+            folder_path = os.path.join(folder_path, part)
+            if not self.add_watch(folder_path):
+                return
+
+        if check:
+            self.mark_dirty(shot_path, activity=True)
+
+    def handle_events(self, events):
+        """
+        Description:
+        Handles the events of the watched folders: new folders are watched,
+        and a change in a plate folder checks the plate of its shot.
+
+        Input:
+        events(list): The (watch, mask, name) tuples read from inotify.
+
+        Output:
+        None
+        """
+        for watch, mask, name in events:
+            if mask & IN_Q_OVERFLOW:
+                # Events were lost, scan the whole show on the next loop.
+                self.last_scan = 0.0
+                continue
+
+            folder_path = self.watches.get(watch)
+            if folder_path is None:
+                continue
+            if mask & IN_IGNORED:
+                del self.watches[watch]
+                self.watched.discard(folder_path)
+                self.shots.discard(folder_path)
+                continue
+
+            shot_path = self.get_shot_path(folder_path)
+            if shot_path is None:
+                # A folder above the shots, watch what was made in it.
+                if mask & IN_ISDIR and mask & (IN_CREATE | IN_MOVED_TO):
+                    child_path = os.path.join(folder_path, name)
+                    if self.get_shot_path(child_path) is None:
+                        self.watch_folder(child_path, check=True)
+                    else:
+                        self.watch_shot(child_path, check=True)
+            elif folder_path == get_plate_folder(shot_path):
+                self.mark_dirty(shot_path, activity=True)
+            else:
+                self.watch_shot(shot_path, check=True)
+
+    def mark_dirty(self, shot_path, signature=None, activity=False):
+        """
+        Description:
+        Notes that the plate of a shot may have changed. The shot waits until
+        its plate stopped changing for the settle time.
+
+        Input:
+        shot_path(str): The shot folder.
+        signature(list): The plate signature if it's already known.
+        activity(bool): True when files of the plate were just written, which
+        restarts the settle time. The plate isn't listed then, a landing plate
+        would be listed once per frame, check_pending lists it once settled.
+
+        Output:
+        None
+        """
+        now = time.monotonic()
+        pending = self.pending.get(shot_path)
+
+        if activity:
+            if pending is None:
+                self.pending[shot_path] = {"signature": None, "changed": now}
+            else:
+                pending["changed"] = now
+            return
+
+        if signature is None:
+            signature = get_plate_signature(shot_path)
+        if signature is None:
+            self.pending.pop(shot_path, None)
+            return
+
+        if pending is None:
+            known = self.state["shots"].get(shot_path)
+            if known is not None and known["plate"] == signature:
+                return
+            self.pending[shot_path] = {"signature": signature, "changed": now}
+        elif pending["signature"] is None:
+            # The events keep the settle time, the scan only fills the plate in.
+            pending["signature"] = signature
+        elif pending["signature"] != signature:
+            pending["signature"] = signature
+            pending["changed"] = now
+
+    def scan_show(self):
+        """
+        Description:
+        Updates the shot index of the show, which only scans the shots whose
+        folders changed, and checks the plates that changed against the state.
+        The first scan of a show takes the shots already set up as done.
+
+        Input:
+        None
+
+        Output:
+        None
+        """
+        self.last_scan = time.monotonic()
+        shot_index_lanh.crawl_show(self.show_root, self.depth)
+        shots = shot_index_lanh.list_shots(self.show_root)
+
+        first_scan = self.state is None
+        if first_scan:
+            self.state = {"version": STATE_VERSION, "shots": {}}
+
+        for shot in shots:
+            if not shot["plate_count"]:
+                continue
+            signature = [
+                shot["plate_name"],
+                shot["plate_first"],
+                shot["plate_last"],
+                shot["plate_count"],
+            ]
+            if first_scan and shot["latest_script"]:
+                self.state["shots"][shot["shot_path"]] = {
+                    "plate": signature,
+                    "nuke_file": shot["latest_script"],
+                    "success": True,
+                    "error": "",
+                    "time": time.time(),
+                }
+            else:
+                self.mark_dirty(shot["shot_path"], signature)
+
+        if first_scan:
+            save_state(self.show_root, self.state)
+
+    def check_pending(self):
+        """
+        Description:
+        Queues the shots whose plate stopped changing for the settle time.
+
+        Input:
+        None
+
+        Output:
+        None
+        """
+        now = time.monotonic()
+        queued = set(shot_path for shot_path, _ in self.ready)
+        queued |= set(shot_path for shot_path, _ in self.running.values())
+
+        for shot_path, pending in list(self.pending.items()):
+            if now - pending["changed"] < self.settle or shot_path in queued:
+                continue
+
+            # Look once more, a plate still landing restarts the wait. Plates
+            # seen through inotify have no signature yet, no event during the
+            # settle time already means they stopped changing.
+            signature = get_plate_signature(shot_path)
+            if signature is None:
+                del self.pending[shot_path]
+                continue
+            if pending["signature"] is not None and signature != pending["signature"]:
+                pending["signature"] = signature
+                pending["changed"] = now
+                continue
+
+            del self.pending[shot_path]
+            known = self.state["shots"].get(shot_path)
+            if known is None or known["plate"] != signature:
+                self.ready.append((shot_path, signature))
+
+    def submit_ready(self, pool):
+        """
+        Description:
+        Starts the queued setups while there are free workers, the rest wait
+        in the queue. Suspects of a crashed worker run alone.
+
+        Input:
+        pool(class): The executor of the setups.
+
+        Output:
+        None
+        """
+        while self.ready and len(self.running) < self.workers:
+            shot_path, signature = self.ready[0]
+            if any(path in self.suspects for path, _ in self.running.values()) or (
+                shot_path in self.suspects and self.running
+            ):
+                break
+            self.ready.popleft()
+            try:
+                preset = preset_store_lanh.resolve_preset(
+                    shot_path, self.show_root, base=self.preset
+                )
+            except (OSError, ValueError) as error:
+                self.finish(
+                    shot_path,
+                    signature,
+                    {
+                        "shot_path": shot_path,
+                        "compositor": self.compositor,
+                        "nuke_file": "",
+                        "success": False,
+                        "error": f"{type(error).__name__}: {error}",
+                        "seconds": 0.0,
+                    },
+                )
+                continue
+
+            future = pool.submit(
+                batch_setup_lanh.setup_shot,
+                shot_path,
+                self.compositor,
+                preset,
+                self.backend,
+            )
+            self.running[future] = (shot_path, signature)
+
+    def collect_finished(self, wait=False):
+        """
+        Description:
+        Records the setups that finished. A worker that dies breaks the pool:
+        a setup that ran alone fails, the setups that ran together are queued
+        again as suspects, to run one at a time.
+
+        Input:
+        wait(bool): True to wait for every running setup.
+
+        Output:
+        broken(bool): True if the pool broke and has to be replaced.
+        """
+        if not self.running:
+            return False
+
+        done, _ = futures.wait(list(self.running), timeout=None if wait else 0)
+        if any(isinstance(future.exception(), BrokenProcessPool) for future in done):
+            # The other setups of a broken pool fail too, wait for all of them.
+            done, _ = futures.wait(list(self.running))
+
+        broken = []
+        for future in done:
+            shot_path, signature = self.running.pop(future)
+            if isinstance(future.exception(), BrokenProcessPool):
+                broken.append((shot_path, signature))
+            else:
+                self.finish(shot_path, signature, future.result())
+
+        if len(broken) == 1:
+            shot_path, signature = broken[0]
+            self.finish(
+                shot_path,
+                signature,
+                batch_setup_lanh.get_crash_result(shot_path, self.compositor),
+            )
+        else:
+            for shot_path, signature in broken:
+                self.suspects.add(shot_path)
+                self.ready.appendleft((shot_path, signature))
+
+        return bool(broken)
+
+    def finish(self, shot_path, signature, result):
+        """
+        Description:
+        Records the plate a shot was set up with, failed setups too, so they
+        are only tried again when their plate changes.
+
+        Input:
+        shot_path(str): The shot folder.
+        signature(list): The plate signature the shot was set up with.
+        result(dict): The result of the setup.
+
+        Output:
+        None
+        """
+        self.state["shots"][shot_path] = {
+            "plate": signature,
+            "nuke_file": result["nuke_file"],
+            "success": result["success"],
+            "error": result["error"],
+            "time": time.time(),
+        }
+        save_state(self.show_root, self.state)
+        self.suspects.discard(shot_path)
+
+        if result["success"]:
+            setup_log_lanh.LOGGER.info(f"Set up {shot_path} for {signature[0]}")
+        else:
+            setup_log_lanh.LOGGER.warning(
+                f"Could not set up {shot_path}: {result['error']}"
+            )
+        if self.callback:
+            self.callback(result)
+
+    def is_idle(self):
+        """
+        Description:
+        Tells if no shot is waiting, queued or being set up.
+
+        Input:
+        None
+
+        Output:
+        idle(bool): True if there is nothing to do.
+        """
+        return not (self.pending or self.ready or self.running)
+
+    def run(self, stop_event=None, once=False):
+        """
+        Description:
+        Watches the show until it's stopped. The show is scanned once at the
+        start, for the plates that landed while nothing was watching.
+
+        Input:
+        stop_event(class): Optional threading.Event that stops the watcher.
+        once(bool): True to stop once the shots found are set up, instead of
+        watching.
+
+        Output:
+        None
+        """
+        stop_event = stop_event or threading.Event()
+        self.scan_show()
+        if not once:
+            self.watch_folder(self.show_root)
+
+        pool = batch_setup_lanh.create_pool(self.workers)
+        try:
+            while not stop_event.is_set():
+                if once and self.is_idle():
+                    break
+
+                # Wait for events, or scan the show when there is no inotify.
+                if self.inotify is not None and not once:
+                    self.handle_events(self.inotify.read_events(1.0))
+                    if time.monotonic() - self.last_scan > RESCAN_INTERVAL:
+                        self.scan_show()
+                else:
+                    stop_event.wait(min(1.0, self.poll))
+                    if not once and time.monotonic() - self.last_scan > self.poll:
+                        self.scan_show()
+
+                self.check_pending()
+                self.submit_ready(pool)
+                if self.collect_finished():
+                    # A worker died and took the pool with it, start a new one.
+                    pool.shutdown()
+                    pool = batch_setup_lanh.create_pool(self.workers)
+        finally:
+            # Let the running setups finish, their scripts are reserved.
+            self.collect_finished(wait=True)
+            pool.shutdown()
+            if self.inotify is not None:
+                self.inotify.close()
+
+
+def main(argv=None):
+    """
+    Description:
+    Command line entry point, watches a show and sets up the shots whose
+    plates land.
+
+    Input:
+    argv(list): Optional list of arguments, sys.argv by default.
+
+    Output:
+    exit_code(int): Always 0.
+    """
+    parser = argparse.ArgumentParser(
+        description="Set up the shots of a show as their plates land."
+    )
+    parser.add_argument("show_root", help="The show folder.")
+    parser.add_argument(
+        "--compositor", required=True, help="The name in the new script names."
+    )
+    parser.add_argument(
+        "--preset", help="A preset json used instead of the show preset."
+    )
+    parser.add_argument(
+        "--depth",
+        type=int,
+        default=folder_template_lanh.DEFAULT_SHOT_DEPTH,
+        help="How many levels below the show shots can be.",
+    )
+    parser.add_argument("--workers", type=int, default=2, help="Setups at once.")
+    parser.add_argument(
+        "--settle",
+        type=float,
+        default=DEFAULT_SETTLE,
+        help="Seconds a plate has to stay the same before its shot is set up.",
+    )
+    parser.add_argument(
+        "--poll",
+        type=float,
+        default=DEFAULT_POLL,
+        help="Seconds between two scans when inotify isn't used.",
+    )
+    parser.add_argument("--backend", choices=["nk", "nuke"], default="nk")
+    parser.add_argument(
+        "--no-inotify",
+        action="store_true",
+        help="Scan the show instead of watching it.",
+    )
+    parser.add_argument(
+        "--once",
+        action="store_true",
+        help="Set up the shots waiting for it and stop, instead of watching.",
+    )
+    args = parser.parse_args(argv)
+
+    preset = preset_store_lanh.load_preset(args.preset) if args.preset else None
+    watcher = PlateWatcher(
+        args.show_root,
+        args.compositor,
+        preset=preset,
+        depth=args.depth,
+        workers=args.workers,
+        settle=args.settle,
+        poll=args.poll,
+        backend=args.backend,
+        use_inotify=not args.no_inotify,
+        callback=batch_setup_lanh.print_result,
+    )
+
+    # Stop cleanly when the service manager stops the watcher.
+    stop_event = threading.Event()
+    signal.signal(signal.SIGTERM, lambda signum, frame: stop_event.set())
+
+    try:
+        watcher.run(stop_event, once=args.once)
+    except KeyboardInterrupt:
+        pass
+
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -1,10 +1,24 @@
-from setuptools import setup, find_packages
-
-setup(
-    name="compositing_pipeline_manager",
-    version="1.00",
-    author="Alex Negrete",
-    author_email="l@mail.com",
-    packages=find_packages(),
-    long_description=open("README.md").read(),
-)
+from setuptools import setup, find_packages
+
+setup(
+    name="compositing_pipeline_manager",
+    version="1.00",
+    author="Alex Negrete",
+    author_email="l@mail.com",
+    packages=find_packages(),
+    long_description=open("README.md").read(),
+    entry_points={
+        "console_scripts": [
+            "nuke_shot_batch=nuke_panel_setup_lanh.batch_setup_lanh:main",
+            "nuke_shot_import_time=nuke_panel_setup_lanh.import_time_lanh:main",
+            "nuke_render_check=nuke_panel_setup_lanh.render_check_lanh:main",
+            "nuke_shot_index=nuke_panel_setup_lanh.shot_index_lanh:main",
+            "nuke_plate_proxy=nuke_panel_setup_lanh.proxy_lanh:main",
+            "nuke_script_patch=nuke_panel_setup_lanh.script_patch_lanh:main",
+            "nuke_script_index=nuke_panel_setup_lanh.script_index_lanh:main",
+            "nuke_render_jobs=nuke_panel_setup_lanh.render_jobs_lanh:main",
+            "nuke_setup_plan=nuke_panel_setup_lanh.setup_plan_lanh:main",
+            "nuke_shot_watch=nuke_panel_setup_lanh.watch_lanh:main",
+        ],
+    },
+)
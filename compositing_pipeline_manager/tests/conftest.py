@@ -0,0 +1,31 @@
+import os
+import sys
+
+import pytest
+
+# The package and the stand-ins of the nuke and OCIO modules, so the tests run
+# without nuke.
+PACKAGE_ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+STUBS_FOLDER = os.path.join(PACKAGE_ROOT, "benchmarks", "stubs")
+for path in (PACKAGE_ROOT, STUBS_FOLDER):
+    if path not in sys.path:
+        sys.path.insert(0, path)
+
+
+@pytest.fixture(autouse=True)
+def cache_dir(tmp_path, monkeypatch):
+    """
+    Description:
+    Points the local caches of every test to its own folder.
+
+    Input:
+    tmp_path(str): The temporary folder of the test.
+    monkeypatch(class): The pytest monkeypatch fixture.
+
+    Output:
+    cache_dir(str): The cache folder.
+    """
+    cache_dir = str(tmp_path / "lanh_cache")
+    monkeypatch.setenv("LANH_CACHE_DIR", cache_dir)
+
+    return cache_dir
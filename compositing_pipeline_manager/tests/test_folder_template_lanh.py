@@ -0,0 +1,73 @@
+import copy
+import os
+
+import pytest
+
+from nuke_panel_setup_lanh import colorspace_lanh, folder_template_lanh, footage_lanh
+
+
+def get_nested_template():
+    template = copy.deepcopy(folder_template_lanh.DEFAULT_FOLDER_TEMPLATE)
+    template["comp"]["02_footage"]["01_plate"] = {"proxy": {"half": {}}}
+    template["comp"]["02_footage"]["04_LUT"] = {"show": {}}
+
+    return template
+
+
+def test_nested_required_folders_resolve_to_paths(tmp_path):
+    shot_path = str(tmp_path / "sh010")
+    folder_structure = folder_template_lanh.create_folder_structure(
+        shot_path, get_nested_template()
+    )
+
+    plate_folder = os.path.join(shot_path, "comp", "02_footage", "01_plate")
+    assert (
+        folder_template_lanh.get_folder_path(
+            folder_structure, "comp", "02_footage", "01_plate"
+        )
+        == plate_folder
+    )
+    assert os.path.isdir(os.path.join(plate_folder, "proxy", "half"))
+    assert colorspace_lanh.get_lut_folder(shot_path, folder_structure) == os.path.join(
+        shot_path, "comp", "02_footage", "04_LUT"
+    )
+
+    # Footage folders with sub folders are scanned too.
+    names = [name for name, _ in footage_lanh.get_footage_folders(folder_structure)]
+    assert names == ["01_plate", "02_ref_mov", "03_onset_ref", "04_LUT"]
+
+
+def test_plan_only_lists_missing_folders(tmp_path):
+    shot_path = str(tmp_path / "sh010")
+    template = get_nested_template()
+    folder_template_lanh.create_folder_structure(shot_path, template)
+    os.rmdir(os.path.join(shot_path, "comp", "02_footage", "01_plate", "proxy", "half"))
+
+    missing = folder_template_lanh.create_folder_structure(
+        shot_path, template, dry_run=True
+    )
+
+    assert missing == [
+        os.path.join(shot_path, "comp", "02_footage", "01_plate", "proxy", "half")
+    ]
+
+
+def test_new_shot_of_a_new_sequence(tmp_path):
+    shot_path = str(tmp_path / "sq020" / "sh010")
+    folder_template_lanh.create_folder_structure(shot_path)
+
+    assert folder_template_lanh.is_shot_folder(shot_path)
+    assert folder_template_lanh.create_folder_structure(shot_path, dry_run=True) == []
+
+
+def test_validate_template():
+    template = get_nested_template()
+    del template["comp"]["04_renders"]["02_exr"]
+    with pytest.raises(ValueError):
+        folder_template_lanh.validate_template(template)
+
+    for name in (".", "a/b", ""):
+        template = get_nested_template()
+        template["comp"][name] = {}
+        with pytest.raises(ValueError):
+            folder_template_lanh.validate_template(template)
@@ -0,0 +1,50 @@
+import pytest
+
+from nuke_panel_setup_lanh import frameset_lanh
+
+
+def test_parse_and_format_round_trip():
+    for range_text in ("1001-1100", "1-50 52-100", "1-99x2", "5", ""):
+        assert frameset_lanh.parse_frames(range_text).format() == range_text
+
+
+def test_parse_merges_overlapping_ranges():
+    frames = frameset_lanh.parse_frames("10-20, 1-5 4-12")
+
+    assert frames.ranges == [[1, 20]]
+    assert len(frames) == 20
+
+
+def test_parse_rejects_bad_ranges():
+    for range_text in ("abc", "10-1", "1-10x0"):
+        with pytest.raises(frameset_lanh.FrameSetError):
+            frameset_lanh.parse_frames(range_text)
+
+
+def test_gaps_and_span():
+    frames = frameset_lanh.from_frames([1, 2, 3, 7, 8, 10])
+
+    assert frames.has_gaps()
+    assert frames.get_gaps().format() == "4-6 9"
+    assert frames.get_span() == frameset_lanh.from_range(1, 10)
+    assert frames.get_frame(3) == 7
+    with pytest.raises(IndexError):
+        frames.get_frame(6)
+
+
+def test_set_operations():
+    left = frameset_lanh.parse_frames("1-10 20-30")
+    right = frameset_lanh.parse_frames("5-25")
+
+    assert (left | right).format() == "1-30"
+    assert (left - right).format() == "1-4 26-30"
+    assert (left & right).format() == "5-10 20-25"
+    assert 20 in left and 15 not in left
+
+
+def test_stepped_range():
+    frames = frameset_lanh.from_range(1, 9, step=2)
+
+    assert list(frames) == [1, 3, 5, 7, 9]
+    assert frames.format() == "1-9x2"
+    assert frameset_lanh.from_frames([1, 3]).format() == "1 3"
@@ -0,0 +1,71 @@
+import io
+
+from nuke_panel_setup_lanh import nk_parser_lanh
+
+# Nuke writes the nodes of a group after it, up to end_group, at the same
+# indent as the others.
+SCRIPT = """#! nuke -nx
+version 12.2 v1
+Root {
+ inputs 0
+ name /shows/show/sh010/comp/01_scripts/show_sh010_comp_me_v01.nk
+ fps 24
+}
+Read {
+ inputs 0
+ file "/shows/show/sh010/plate.####.exr"
+ name Read1
+}
+Group {
+ name Group1
+}
+Input {
+ inputs 0
+ name Input1
+}
+Grade {
+ white {{curve x1 1
+   x10 2}}
+ name Grade1
+}
+end_group
+Write {
+ file {/shows/show/sh010/out.%04d.exr}
+ name Write1
+}
+"""
+
+
+def test_iter_nodes_reads_classes_names_and_groups():
+    nodes = list(nk_parser_lanh.iter_nodes(io.StringIO(SCRIPT)))
+
+    assert [(node["class"], node["name"], node["group"]) for node in nodes] == [
+        ("Root", "/shows/show/sh010/comp/01_scripts/show_sh010_comp_me_v01.nk", ""),
+        ("Read", "Read1", ""),
+        ("Group", "Group1", ""),
+        ("Input", "Input1", "Group1"),
+        ("Grade", "Grade1", "Group1"),
+        ("Write", "Write1", ""),
+    ]
+    assert [node["line"] for node in nodes] == [3, 8, 13, 16, 20, 26]
+
+
+def test_iter_nodes_unquotes_values_and_filters_knobs():
+    nodes = {
+        node["name"]: node
+        for node in nk_parser_lanh.iter_nodes(io.StringIO(SCRIPT), knobs={"file"})
+    }
+
+    assert nodes["Read1"]["knobs"] == {"file": "/shows/show/sh010/plate.####.exr"}
+    assert nodes["Write1"]["knobs"] == {"file": "/shows/show/sh010/out.%04d.exr"}
+    assert nodes["Grade1"]["knobs"] == {}
+
+
+def test_iter_nodes_cuts_multi_line_values():
+    nodes = {
+        node["class"]: node for node in nk_parser_lanh.iter_nodes(io.StringIO(SCRIPT))
+    }
+
+    assert nodes["Grade"]["knobs"]["white"] == "{{curve x1 1"
+    assert nodes["Grade"]["knobs"]["name"] == "Grade1"
+    assert nodes["Root"]["knobs"]["fps"] == "24"
@@ -0,0 +1,66 @@
+import pytest
+
+numpy = pytest.importorskip("numpy")
+Imath = pytest.importorskip("Imath")
+
+from nuke_panel_setup_lanh import proxy_lanh
+
+
+def make_box(min_x, min_y, max_x, max_y):
+    return Imath.Box2i(Imath.V2i(min_x, min_y), Imath.V2i(max_x, max_y))
+
+
+@pytest.mark.parametrize(
+    "window",
+    [
+        (0, 0, 99, 49),
+        (1, 1, 100, 50),
+        (-3, -3, 100, 60),
+        (-1, 3, 6, 8),
+        (5, 5, 5, 5),
+    ],
+)
+@pytest.mark.parametrize("factor", [2, 4])
+def test_resample_matches_scaled_window(window, factor):
+    box = make_box(*window)
+    width = box.max.x - box.min.x + 1
+    height = box.max.y - box.min.y + 1
+    pixels = numpy.ones((height, width), dtype=numpy.float32)
+
+    resampled = proxy_lanh.resample(pixels, factor, (box.min.x, box.min.y))
+    scaled = proxy_lanh.scale_box(box, factor)
+
+    assert resampled.shape == (
+        scaled.max.y - scaled.min.y + 1,
+        scaled.max.x - scaled.min.x + 1,
+    )
+    assert numpy.allclose(resampled, 1.0)
+
+
+def test_scale_box_rounds_outwards():
+    scaled = proxy_lanh.scale_box(make_box(1, -3, 100, 50), 2)
+
+    assert (scaled.min.x, scaled.min.y, scaled.max.x, scaled.max.y) == (0, -2, 50, 25)
+
+
+def test_chained_scale_matches_direct_scale():
+    box = make_box(-3, 1, 101, 57)
+    half = proxy_lanh.scale_box(box, 2)
+    quarter = proxy_lanh.scale_box(half, 2)
+    direct = proxy_lanh.scale_box(box, 4)
+
+    assert (quarter.min.x, quarter.min.y, quarter.max.x, quarter.max.y) == (
+        direct.min.x,
+        direct.min.y,
+        direct.max.x,
+        direct.max.y,
+    )
+
+
+def test_resample_averages_aligned_blocks():
+    # A window starting at x=1 pairs the first pixel with the padding before it.
+    pixels = numpy.array([[2.0, 4.0, 6.0]], dtype=numpy.float32)
+
+    resampled = proxy_lanh.resample(pixels, 2, (1, 0))
+
+    assert resampled.tolist() == [[2.0, 5.0]]
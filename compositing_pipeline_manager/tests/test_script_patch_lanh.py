@@ -0,0 +1,116 @@
+import io
+
+from nuke_panel_setup_lanh import script_patch_lanh
+
+OLD_PRESET = {
+    "fps": 24,
+    "aspect_ratio": "HD_1080",
+    "screen_color": "sRGB",
+    "workspace_color": "scene_linear",
+    "exr_name": "comp.%04d.exr",
+    "mov_name": "comp.mov",
+}
+
+NEW_PRESET = dict(
+    OLD_PRESET, fps=25, screen_color="rec709", exr_name="comp_v2.%04d.exr"
+)
+
+SCRIPT = """#! nuke -nx
+version 12.2 v1
+Root {
+ inputs 0
+ name /shows/show/sh010/comp/01_scripts/show_sh010_comp_me_v01.nk
+ fps 24
+ format "1920 1080 0 0 1920 1080 1 HD_1080"
+}
+Read {
+ inputs 0
+ file /shows/show/sh010/plate.####.exr
+ name Read1
+}
+OCIOColorSpace {
+ in_colorspace sRGB
+ out_colorspace scene_linear
+ name INPUT_COLORSPACE
+}
+Group {
+ name Group1
+}
+OCIOColorSpace {
+ in_colorspace sRGB
+ name Inner
+}
+end_group
+OCIOColorSpace {
+ in_colorspace scene_linear
+ out_colorspace sRGB
+ name OUTPUT_COLORSPACE
+}
+Write {
+ file "/shows/show/sh010/comp/04_renders/02_exr/show_sh010_comp_me_v01_comp.%04d.exr"
+ name WriteEXR
+}
+"""
+
+
+def patch_text(text, rules):
+    target = io.StringIO(newline="")
+    changes = script_patch_lanh.patch_stream(
+        io.StringIO(text, newline=""), target, rules
+    )
+
+    return target.getvalue(), changes
+
+
+def test_no_rules_copies_the_script_as_is():
+    for text in (SCRIPT, SCRIPT.replace("\n", "\r\n")):
+        patched, changes = patch_text(text, {})
+
+        assert patched == text
+        assert changes == []
+
+
+def test_patches_the_setup_nodes_only():
+    rules = script_patch_lanh.get_patch_rules(OLD_PRESET, NEW_PRESET)
+
+    patched, changes = patch_text(SCRIPT, rules)
+
+    assert [(change["node"], change["knob"]) for change in changes] == [
+        ("Root", "fps"),
+        ("INPUT_COLORSPACE", "in_colorspace"),
+        ("OUTPUT_COLORSPACE", "out_colorspace"),
+        ("WriteEXR", "file"),
+    ]
+    assert " fps 25\n" in patched
+    assert "show_sh010_comp_me_v01_comp_v2.%04d.exr" in patched
+    # The node inside the group keeps its colorspace.
+    assert "OCIOColorSpace {\n in_colorspace sRGB\n name Inner\n}" in patched
+    assert len(patched.splitlines()) == len(SCRIPT.splitlines())
+
+
+def test_patch_round_trip():
+    rules = script_patch_lanh.get_patch_rules(OLD_PRESET, NEW_PRESET)
+    back_rules = script_patch_lanh.get_patch_rules(NEW_PRESET, OLD_PRESET)
+
+    for text in (SCRIPT, SCRIPT.replace("\n", "\r\n")):
+        patched, _ = patch_text(text, rules)
+        restored, changes = patch_text(patched, back_rules)
+
+        assert restored == text
+        assert len(changes) == 4
+
+
+def test_default_knobs_are_added():
+    text = SCRIPT.replace(" fps 24\n", "").replace(" out_colorspace scene_linear\n", "")
+    rules = script_patch_lanh.get_patch_rules(
+        OLD_PRESET, dict(OLD_PRESET, fps=30, workspace_color="ACEScg")
+    )
+
+    patched, changes = patch_text(text, rules)
+
+    assert " fps 30\n}" in patched
+    assert " out_colorspace ACEScg\n name INPUT_COLORSPACE\n" not in patched
+    assert ("INPUT_COLORSPACE", "out_colorspace", "scene_linear", "ACEScg") in [
+        (change["node"], change["knob"], change["old"], change["new"])
+        for change in changes
+    ]
@@ -0,0 +1,73 @@
+import os
+
+from nuke_panel_setup_lanh import shot_index_lanh
+
+
+def make_show(tmp_path, *paths):
+    show_root = tmp_path / "show"
+    for path in paths:
+        os.makedirs(os.path.join(str(show_root), path), exist_ok=True)
+
+    return show_root
+
+
+def get_states(show_root):
+    shots = {
+        shot["shot_path"][len(str(show_root)) + 1 :]: shot_index_lanh.get_setup_state(
+            shot
+        )
+        for shot in shot_index_lanh.list_shots(str(show_root))
+    }
+    unclassified = [
+        folder_path[len(str(show_root)) + 1 :]
+        for folder_path in shot_index_lanh.list_unclassified(str(show_root))
+    ]
+
+    return shots, unclassified
+
+
+def test_show_shot_layout(tmp_path):
+    show_root = make_show(
+        tmp_path,
+        "sh010/comp/01_scripts",
+        "sh020",
+        "sh030/editorial",
+        "presets",
+    )
+    (show_root / "sh010" / "comp" / "01_scripts" / "show_sh010_comp_me_v02.nk").touch()
+
+    stats = shot_index_lanh.crawl_show(str(show_root))
+    shots, unclassified = get_states(show_root)
+
+    assert stats["shots"] == 1
+    assert shots == {"sh010": "set up v02"}
+    assert unclassified == ["sh020", "sh030/editorial"]
+
+
+def test_show_sequence_shot_layout(tmp_path):
+    show_root = make_show(
+        tmp_path,
+        "sq010/sh010/comp",
+        "sq010/sh020/comp",
+        "sq010/sh030",
+        "sq020",
+    )
+
+    shot_index_lanh.crawl_show(str(show_root))
+    shots, unclassified = get_states(show_root)
+
+    assert shots == {"sq010/sh010": "folders only", "sq010/sh020": "folders only"}
+    assert unclassified == ["sq010/sh030", "sq020"]
+
+
+def test_rescan_picks_up_new_shots(tmp_path):
+    show_root = make_show(tmp_path, "sq010/sh010/comp", "sq010/sh020")
+    shot_index_lanh.crawl_show(str(show_root))
+
+    make_show(tmp_path, "sq010/sh020/comp")
+    stats = shot_index_lanh.crawl_show(str(show_root))
+    shots, unclassified = get_states(show_root)
+
+    assert stats["unchanged"] == 1
+    assert sorted(shots) == ["sq010/sh010", "sq010/sh020"]
+    assert unclassified == []